@@ -200,39 +200,47 @@ class RiotAPI:
             print(f"Error fetching match history: {response.status_code}")
             return []
 
-    def get_match_details(self, match_id):
+    def get_match_details(self, match_id, typed=False):
         """
         Get detailed match data.
 
         Args:
             match_id (str): Match ID
+            typed (bool): Decode into a riot_models.Match (gdansk-league/scripts on PYTHONPATH)
 
         Returns:
-            dict: Detailed match data
+            dict: Detailed match data (riot_models.Match when typed)
         """
         url = f"https://{self.continent}.api.riotgames.com/lol/match/v5/matches/{match_id}"
         response = requests.get(url, headers=self.headers)
 
         if response.status_code == 200:
+            if typed:
+                from riot_models import decode_match
+                return decode_match(response.content)
             return response.json()
         else:
             print(f"Error fetching match details: {response.status_code}")
             return None
 
-    def get_match_timeline(self, match_id):
+    def get_match_timeline(self, match_id, typed=False):
         """
         Get match timeline with event data.
 
         Args:
             match_id (str): Match ID
+            typed (bool): Decode into a riot_models.Timeline (gdansk-league/scripts on PYTHONPATH)
 
         Returns:
-            dict: Timeline data with events (kills, deaths, objectives)
+            dict: Timeline data with events (kills, deaths, objectives) (riot_models.Timeline when typed)
         """
         url = f"https://{self.continent}.api.riotgames.com/lol/match/v5/matches/{match_id}/timeline"
         response = requests.get(url, headers=self.headers)
 
         if response.status_code == 200:
+            if typed:
+                from riot_models import decode_timeline
+                return decode_timeline(response.content)
             return response.json()
         else:
             print(f"Error fetching match timeline: {response.status_code}")
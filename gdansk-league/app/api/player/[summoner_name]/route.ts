@@ -30,6 +30,13 @@ export async function GET(
       )
     }
 
+    // Mark the profile as viewed so the refresh daemon prioritises it. Awaited because a
+    // serverless function may be frozen as soon as the response is sent; failures are ignored.
+    const { error: viewError } = await db.rpc('record_player_view', { p_player_id: player.id })
+    if (viewError) {
+      console.error('Failed to record player view:', viewError)
+    }
+
     // Get top 3 champions for current season
     const { data: seasonalChampions } = await db
       .from('player_champion_stats')
@@ -0,0 +1,59 @@
+-- Migration: Add refresh scheduling state for the continuous refresh daemon
+-- Created: 2026-10-19
+-- Purpose: Let scripts/refresh_daemon.py order work by staleness, recent play and site views
+
+-- ============================================================================
+-- Activity signals on players
+-- ============================================================================
+
+ALTER TABLE players
+ADD COLUMN IF NOT EXISTS last_viewed_at TIMESTAMP WITH TIME ZONE;
+
+ALTER TABLE players
+ADD COLUMN IF NOT EXISTS last_match_at TIMESTAMP WITH TIME ZONE;
+
+COMMENT ON COLUMN players.last_viewed_at IS 'Last time the player profile was opened on the site';
+COMMENT ON COLUMN players.last_match_at IS 'Start time of the most recent ranked game seen by the refresh jobs';
+
+-- ============================================================================
+-- Table: player_refresh_state
+-- Purpose: Last successful run of each refresh job per player
+-- Jobs: rank, matches, icons, mastery
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS player_refresh_state (
+  player_id UUID NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+  job TEXT NOT NULL,
+  last_run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+  PRIMARY KEY (player_id, job),
+  CONSTRAINT valid_refresh_job CHECK (job IN ('rank', 'matches', 'icons', 'mastery'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_refresh_state_job ON player_refresh_state(job, last_run_at);
+
+COMMENT ON TABLE player_refresh_state IS 'Last run of each refresh job per player, used to prioritise the stalest players first';
+
+ALTER TABLE player_refresh_state ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Only service role can modify refresh state"
+  ON player_refresh_state FOR ALL
+  USING (auth.role() = 'service_role');
+
+-- ============================================================================
+-- Function: record_player_view
+-- Purpose: Called by the profile API route (anon key) to mark a profile as viewed
+-- A player's view time moves at most once per 15 minutes, so repeated calls cannot
+-- keep re-raising their refresh priority (the daemon's view bonus is capped at 24h)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION record_player_view(p_player_id UUID)
+RETURNS VOID AS $$
+BEGIN
+  UPDATE players SET last_viewed_at = NOW()
+  WHERE id = p_player_id
+    AND (last_viewed_at IS NULL OR last_viewed_at < NOW() - INTERVAL '15 minutes');
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION record_player_view(UUID) TO anon, authenticated;
@@ -0,0 +1,14 @@
+-- Migration: Track summoner-v4 revisionDate per player
+-- Created: 2026-10-19
+-- Purpose: Skip league, mastery and match refreshes for players whose summoner has not changed
+
+ALTER TABLE players
+ADD COLUMN IF NOT EXISTS summoner_revision_date BIGINT;
+
+ALTER TABLE player_refresh_state
+ADD COLUMN IF NOT EXISTS revision_date BIGINT;
+
+COMMENT ON COLUMN players.summoner_revision_date IS 'revisionDate (epoch ms) seen by the last rank refresh; icon refreshes only read it';
+COMMENT ON COLUMN player_refresh_state.revision_date IS 'players.summoner_revision_date at the time this job last ran';
+
+-- Note: Existing players have NULL revision and are refreshed in full once before skipping kicks in
@@ -0,0 +1,41 @@
+-- Migration: Full-resolution position tracks per match
+-- Created: 2026-10-19
+-- Purpose: Keep every timeline frame (x, y, level, gold, xp, CS) for all ten participants
+-- in one compact blob per match instead of one snapshot row per participant per minute
+
+-- ============================================================================
+-- Table: match_position_tracks
+-- Purpose: Delta-encoded, zlib-compressed per-minute tracks (scripts/position_tracks.py)
+-- Storage: ~3 KB per match (vs ~200 KB as match_timeline_snapshots rows)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS match_position_tracks (
+  match_id TEXT PRIMARY KEY,
+  encoding_version SMALLINT NOT NULL DEFAULT 1,
+  frame_count SMALLINT NOT NULL,
+  frame_interval_ms INTEGER NOT NULL DEFAULT 60000,
+  tracks BYTEA NOT NULL,
+
+  -- Metadata
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE match_position_tracks IS 'Per-minute participant tracks for a match, one blob per match';
+COMMENT ON COLUMN match_position_tracks.encoding_version IS 'position_tracks.py blob version';
+COMMENT ON COLUMN match_position_tracks.tracks IS 'Header + delta-encoded int16/int32 arrays (x, y, level, current/total gold, xp, minions, jungle minions) per participant';
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE match_position_tracks ENABLE ROW LEVEL SECURITY;
+
+-- Public read access
+CREATE POLICY "Allow public read access to match position tracks"
+  ON match_position_tracks FOR SELECT
+  USING (true);
+
+-- Only service role can insert/update/delete
+CREATE POLICY "Only service role can modify match position tracks"
+  ON match_position_tracks FOR ALL
+  USING (auth.role() = 'service_role');
@@ -0,0 +1,41 @@
+-- Migration: Lean match_events storage
+-- Created: 2026-10-19
+-- Purpose: Store kill/building/monster events as typed columns plus a compact damage summary
+-- instead of repeating the whole Riot event (victimDamageDealt/Received arrays) in event_data
+
+-- ============================================================================
+-- Table: match_events
+-- Migration 006 dropped match_events in favour of match_analytics_summary, and this
+-- migration does not bring it back. Installs that still have the table from 005 (and
+-- load it with scripts/fetch_match_timeline.py) gain the lean columns; elsewhere this
+-- is a no-op. The 005 constraints and RLS policies are left as they are.
+-- ============================================================================
+
+DO $$
+BEGIN
+  IF to_regclass('public.match_events') IS NULL THEN
+    RAISE NOTICE 'match_events does not exist (dropped by 006), skipping';
+    RETURN;
+  END IF;
+
+  ALTER TABLE match_events ADD COLUMN IF NOT EXISTS team_id SMALLINT;
+  ALTER TABLE match_events ADD COLUMN IF NOT EXISTS bounty SMALLINT;
+  ALTER TABLE match_events ADD COLUMN IF NOT EXISTS shutdown_bounty SMALLINT;
+  ALTER TABLE match_events ADD COLUMN IF NOT EXISTS kill_streak_length SMALLINT;
+  ALTER TABLE match_events ADD COLUMN IF NOT EXISTS building_type TEXT;
+  ALTER TABLE match_events ADD COLUMN IF NOT EXISTS lane_type TEXT;
+  ALTER TABLE match_events ADD COLUMN IF NOT EXISTS tower_type TEXT;
+  ALTER TABLE match_events ADD COLUMN IF NOT EXISTS monster_type TEXT;
+  ALTER TABLE match_events ADD COLUMN IF NOT EXISTS monster_sub_type TEXT;
+  ALTER TABLE match_events ADD COLUMN IF NOT EXISTS damage_summary JSONB;
+
+  -- Lets scripts/compact_match_events.py find rows still carrying the raw event
+  CREATE INDEX IF NOT EXISTS idx_match_events_uncompacted ON match_events(id) WHERE event_data IS NOT NULL;
+
+  COMMENT ON COLUMN match_events.team_id IS 'BUILDING_KILL: team that lost the building; ELITE_MONSTER_KILL: killer team';
+  COMMENT ON COLUMN match_events.damage_summary IS 'CHAMPION_KILL only: {received|dealt: {participant_id: [physical, magic, true]}} (0 = minions/turrets/monsters)';
+  COMMENT ON COLUMN match_events.event_data IS 'Raw Riot event, only written in full storage mode; NULL once compacted';
+END $$;
+
+-- Note: Run scripts/compact_match_events.py to move existing rows to the lean columns,
+-- then VACUUM FULL match_events to return the freed space
@@ -0,0 +1,48 @@
+-- Migration: Precomputed death/kill heatmap tiles per player
+-- Created: 2026-10-19
+-- Purpose: Serve X-Ray heatmaps as ready-made grids instead of binning every death in the browser
+
+-- ============================================================================
+-- Table: player_heatmap_tiles
+-- Purpose: 2D histograms of event positions per player, role and side at a few resolutions
+-- Maintained incrementally by scripts/update_heatmap_tiles.py
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS player_heatmap_tiles (
+  player_puuid TEXT NOT NULL,
+  kind TEXT NOT NULL, -- 'deaths' or 'kills'
+  role TEXT NOT NULL, -- 'ALL' or TOP/JUNGLE/MID/ADC/SUPPORT
+  side TEXT NOT NULL, -- 'all', 'blue' or 'red'
+  resolution SMALLINT NOT NULL, -- Grid is resolution x resolution over the 15000x15000 map
+
+  counts INTEGER[] NOT NULL, -- Row-major, row 0 = lowest y (bottom of the map)
+  total INTEGER NOT NULL DEFAULT 0, -- Sum of counts
+  games INTEGER NOT NULL DEFAULT 0, -- Matches folded into this tile
+
+  -- Highest match_analytics_summary.id already counted (incremental updates)
+  last_analytics_id BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (player_puuid, kind, role, side, resolution),
+  CONSTRAINT valid_heatmap_kind CHECK (kind IN ('deaths', 'kills')),
+  CONSTRAINT valid_heatmap_side CHECK (side IN ('all', 'blue', 'red')),
+  CONSTRAINT valid_heatmap_counts CHECK (cardinality(counts) = resolution * resolution)
+);
+
+COMMENT ON TABLE player_heatmap_tiles IS 'Per-player event position histograms (deaths/kills) by role, side and grid resolution';
+COMMENT ON COLUMN player_heatmap_tiles.counts IS 'resolution*resolution cell counts, index = row * resolution + column, cell = floor(coord * resolution / 15000)';
+COMMENT ON COLUMN player_heatmap_tiles.last_analytics_id IS 'Highest match_analytics_summary.id included in counts';
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE player_heatmap_tiles ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access to heatmap tiles"
+  ON player_heatmap_tiles FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify heatmap tiles"
+  ON player_heatmap_tiles FOR ALL
+  USING (auth.role() = 'service_role');
@@ -0,0 +1,39 @@
+-- Migration: Cached death hotspots per player
+-- Created: 2026-10-19
+-- Purpose: Serve recurring death spots to the Insights tab without scanning raw deaths per request
+
+-- ============================================================================
+-- Table: player_death_hotspots
+-- Purpose: Top death clusters over a player's ranked history (scripts/update_death_hotspots.py)
+-- Recomputed only when latest_match_id changes
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS player_death_hotspots (
+  player_puuid TEXT PRIMARY KEY,
+  latest_match_id TEXT NOT NULL, -- Most recent analytics match included
+  deaths_analyzed INTEGER NOT NULL DEFAULT 0,
+
+  -- [{x, y, radius, count, games, share, avg_minute, min_minute, max_minute, top_killers: [{champion, count}]}]
+  hotspots JSONB NOT NULL DEFAULT '[]'::jsonb,
+
+  -- Clustering parameters used (eps_distance, eps_time_ms, min_samples, min_games)
+  params JSONB,
+  computed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE player_death_hotspots IS 'Recurring death spots per player, cached per latest ingested match';
+COMMENT ON COLUMN player_death_hotspots.hotspots IS 'Clusters sorted by death count; share is the fraction of all analysed deaths';
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE player_death_hotspots ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access to death hotspots"
+  ON player_death_hotspots FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify death hotspots"
+  ON player_death_hotspots FOR ALL
+  USING (auth.role() = 'service_role');
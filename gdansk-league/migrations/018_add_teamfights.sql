@@ -0,0 +1,51 @@
+-- Migration: Teamfight detection results
+-- Created: 2026-10-19
+-- Purpose: Store kill clusters (teamfights) per match and per-player teamfight involvement
+-- so season-level teamfight metrics do not need the timelines again
+
+-- ============================================================================
+-- Table: match_teamfights
+-- Purpose: Teamfights of a match for all ten participants (scripts/timeline_stages.py TeamfightStage)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS match_teamfights (
+  match_id TEXT PRIMARY KEY,
+  fight_count SMALLINT NOT NULL DEFAULT 0,
+
+  -- [{start_ms, end_ms, x, y, kills: [[timestamp, killer_id, victim_id, [assist ids]]],
+  --   blue: [participant ids], red: [...], blue_kills, red_kills, winner: 100|200|0, gold_swing}]
+  fights JSONB NOT NULL DEFAULT '[]'::jsonb,
+
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE match_teamfights IS 'CHAMPION_KILL events grouped into fights by time (15s gap) and position (2500 units)';
+COMMENT ON COLUMN match_teamfights.fights IS 'gold_swing = kill + shutdown bounty gold won by blue minus red';
+
+ALTER TABLE match_teamfights ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access to match teamfights"
+  ON match_teamfights FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify match teamfights"
+  ON match_teamfights FOR ALL
+  USING (auth.role() = 'service_role');
+
+-- ============================================================================
+-- Per-player teamfight involvement on match_stats
+-- ============================================================================
+
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS teamfights SMALLINT;
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS teamfights_participated SMALLINT;
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS teamfights_won SMALLINT;
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS teamfight_kills SMALLINT;
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS teamfight_deaths SMALLINT;
+
+COMMENT ON COLUMN match_stats.teamfights IS 'Teamfights in the match';
+COMMENT ON COLUMN match_stats.teamfights_participated IS 'Teamfights the player killed, died or assisted in';
+COMMENT ON COLUMN match_stats.teamfights_won IS 'Participated teamfights won by the player''s team (more kills)';
+
+-- Note: Existing rows keep NULL until the match is re-ingested: repopulate_ranked_data.py updates
+-- the timeline columns of rows it already has, and the refresh daemon re-ingests a player's
+-- recent matches whose teamfights column is still NULL
@@ -0,0 +1,28 @@
+-- Migration: Lane-opponent differentials at 10 and 15 minutes
+-- Created: 2026-10-19
+-- Purpose: Early-game comparisons and percentiles from indexed match_stats columns
+-- (scripts/timeline_stages.py LaneDiffStage)
+
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS gold_diff_at_10 INTEGER;
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS xp_diff_at_10 INTEGER;
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS cs_diff_at_10 SMALLINT;
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS gold_diff_at_15 INTEGER;
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS xp_diff_at_15 INTEGER;
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS cs_diff_at_15 SMALLINT;
+
+-- Percentiles are taken per role
+CREATE INDEX IF NOT EXISTS idx_match_stats_role_gold_diff_10 ON match_stats(role, gold_diff_at_10) WHERE gold_diff_at_10 IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_match_stats_role_gold_diff_15 ON match_stats(role, gold_diff_at_15) WHERE gold_diff_at_15 IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_match_stats_role_cs_diff_10 ON match_stats(role, cs_diff_at_10) WHERE cs_diff_at_10 IS NOT NULL;
+
+COMMENT ON COLUMN match_stats.gold_diff_at_10 IS 'Total gold minus the lane opponent''s (same teamPosition, enemy team) at 10:00';
+COMMENT ON COLUMN match_stats.xp_diff_at_10 IS 'XP minus the lane opponent''s at 10:00';
+COMMENT ON COLUMN match_stats.cs_diff_at_10 IS 'Lane + jungle minions minus the lane opponent''s at 10:00';
+COMMENT ON COLUMN match_stats.gold_diff_at_15 IS 'Total gold minus the lane opponent''s at 15:00 (NULL if the game ended earlier)';
+COMMENT ON COLUMN match_stats.xp_diff_at_15 IS 'XP minus the lane opponent''s at 15:00';
+COMMENT ON COLUMN match_stats.cs_diff_at_15 IS 'Lane + jungle minions minus the lane opponent''s at 15:00';
+
+-- Note: Existing rows keep NULL until the match is re-ingested. repopulate_ranked_data.py updates
+-- the diff columns of rows it already has, and the refresh daemon re-ingests each player's recent
+-- matches (MATCHES_PER_RUN) whose timeline columns are still NULL, so the per-role percentile
+-- indexes fill in from those; older matches outside a player's recent history stay NULL
@@ -0,0 +1,97 @@
+-- Migration: Ward placement data and vision aggregates
+-- Created: 2026-10-19
+-- Purpose: Keep WARD_PLACED / WARD_KILL events per player and serve vision X-Ray views
+-- (ward density, ward timing) from precomputed aggregates instead of raw timelines
+
+-- ============================================================================
+-- Ward events per player on match_analytics_summary
+-- (scripts/timeline_stages.py WardStage)
+-- ============================================================================
+
+ALTER TABLE match_analytics_summary ADD COLUMN IF NOT EXISTS wards_placed JSONB; -- [{timestamp, type, x, y}]
+ALTER TABLE match_analytics_summary ADD COLUMN IF NOT EXISTS wards_killed JSONB; -- [{timestamp, type, x, y}]
+
+COMMENT ON COLUMN match_analytics_summary.wards_placed IS 'Wards placed by the player; x/y interpolated from the per-minute frame positions (events carry no position)';
+COMMENT ON COLUMN match_analytics_summary.wards_killed IS 'Wards cleared by the player; x/y interpolated like wards_placed';
+
+-- Ward aggregates follow wards_seq instead of id: re-ingest fills the ward columns of rows that
+-- already exist (and keep their id), so the row is moved past the aggregates' watermarks then
+CREATE SEQUENCE IF NOT EXISTS match_analytics_wards_seq;
+
+ALTER TABLE match_analytics_summary ADD COLUMN IF NOT EXISTS wards_seq BIGINT NOT NULL
+  DEFAULT nextval('match_analytics_wards_seq');
+
+CREATE INDEX IF NOT EXISTS idx_match_analytics_wards_seq
+  ON match_analytics_summary(player_puuid, wards_seq);
+
+COMMENT ON COLUMN match_analytics_summary.wards_seq IS 'Assigned on insert and again when the ward columns of a row without wards are filled';
+
+CREATE OR REPLACE FUNCTION bump_wards_seq()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.wards_seq := nextval('match_analytics_wards_seq');
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS match_analytics_wards_filled ON match_analytics_summary;
+CREATE TRIGGER match_analytics_wards_filled
+  BEFORE UPDATE OF wards_placed, wards_killed ON match_analytics_summary
+  FOR EACH ROW
+  WHEN (OLD.wards_placed IS NULL AND OLD.wards_killed IS NULL
+        AND (NEW.wards_placed IS NOT NULL OR NEW.wards_killed IS NOT NULL))
+  EXECUTE FUNCTION bump_wards_seq();
+
+-- ============================================================================
+-- Ward density grids reuse player_heatmap_tiles (kind = 'wards_placed')
+-- ============================================================================
+
+ALTER TABLE player_heatmap_tiles DROP CONSTRAINT IF EXISTS valid_heatmap_kind;
+ALTER TABLE player_heatmap_tiles ADD CONSTRAINT valid_heatmap_kind CHECK (kind IN ('deaths', 'kills', 'wards_placed'));
+
+COMMENT ON COLUMN player_heatmap_tiles.last_analytics_id IS 'Highest match_analytics_summary.id included in counts (wards_seq for kind = wards_placed)';
+
+-- ============================================================================
+-- Table: player_ward_timing
+-- Purpose: When a player places / clears wards, per role and ward type
+-- Maintained incrementally by scripts/update_ward_timing.py
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS player_ward_timing (
+  player_puuid TEXT NOT NULL,
+  kind TEXT NOT NULL, -- 'placed' or 'killed'
+  role TEXT NOT NULL, -- 'ALL' or TOP/JUNGLE/MID/ADC/SUPPORT
+  ward_type TEXT NOT NULL, -- 'ALL' or YELLOW_TRINKET/CONTROL_WARD/SIGHT_WARD/BLUE_TRINKET/...
+
+  counts INTEGER[] NOT NULL, -- 45 one-minute buckets of game time, the last one is 44:00+
+  total INTEGER NOT NULL DEFAULT 0, -- Sum of counts
+  games INTEGER NOT NULL DEFAULT 0, -- Matches with at least one counted ward
+
+  -- Highest match_analytics_summary.wards_seq already counted (incremental updates)
+  last_wards_seq BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (player_puuid, kind, role, ward_type),
+  CONSTRAINT valid_ward_timing_kind CHECK (kind IN ('placed', 'killed'))
+);
+
+COMMENT ON TABLE player_ward_timing IS 'Per-player histograms of ward placement / ward clear times by role and ward type';
+COMMENT ON COLUMN player_ward_timing.counts IS 'Index = floor(timestamp / 60000), capped at 44';
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE player_ward_timing ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access to ward timing"
+  ON player_ward_timing FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify ward timing"
+  ON player_ward_timing FOR ALL
+  USING (auth.role() = 'service_role');
+
+-- Note: Existing analytics rows keep NULL wards until the match is re-ingested (repopulate_ranked_data.py
+-- or the refresh daemon, which fills the timeline columns of stored rows); filling them assigns a new
+-- wards_seq, so the next update_heatmap_tiles.py / update_ward_timing.py run counts them
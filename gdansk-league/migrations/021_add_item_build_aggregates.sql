@@ -0,0 +1,149 @@
+-- Migration: Item build paths and first-core timing
+-- Created: 2026-10-19
+-- Purpose: Keep each player's final build order and aggregate build paths / first-core timings
+-- per champion, role and tier, so "how do higher-ranked players build" never needs raw item events
+
+-- ============================================================================
+-- Per-player build on match_stats (scripts/timeline_stages.py ItemBuildStage)
+-- ============================================================================
+
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS build_order JSONB; -- [[item_id, timestamp_ms or null], ...]
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS build_path TEXT; -- '6610>3121>2502'
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS first_core_ms INTEGER;
+
+COMMENT ON COLUMN match_stats.build_order IS 'Final inventory (no consumables) in purchase order, undone purchases removed';
+COMMENT ON COLUMN match_stats.build_path IS 'First three completed items (Data Dragon items with components and no upgrades, scripts/item_data.py) excluding starters, support items and boots; NULL without item data for the patch';
+COMMENT ON COLUMN match_stats.first_core_ms IS 'Game time the first build_path item was bought';
+
+-- ============================================================================
+-- Table: aggregated_matches
+-- Purpose: Matches already folded into each incremental aggregate (prevents double counting)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS aggregated_matches (
+  aggregate TEXT NOT NULL, -- 'builds', ...
+  match_id TEXT NOT NULL,
+  counted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (aggregate, match_id)
+);
+
+COMMENT ON TABLE aggregated_matches IS 'Matches counted by each increment_* function; a match already listed is ignored';
+
+-- ============================================================================
+-- Table: champion_build_paths
+-- Purpose: Games / wins per build path, by patch, champion, role and lobby tier
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS champion_build_paths (
+  patch TEXT NOT NULL, -- '15.20'
+  champion_id INTEGER NOT NULL,
+  role TEXT NOT NULL, -- TOP/JUNGLE/MID/ADC/SUPPORT
+  tier TEXT NOT NULL, -- 'ALL' or the lobby tier (IRON ... CHALLENGER)
+  path TEXT NOT NULL,
+
+  games INTEGER NOT NULL DEFAULT 0,
+  wins INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (patch, champion_id, role, tier, path)
+);
+
+CREATE INDEX IF NOT EXISTS idx_build_paths_champion
+  ON champion_build_paths(champion_id, role, tier, patch, games DESC);
+
+COMMENT ON TABLE champion_build_paths IS 'Build path counters from all ten participants of ingested matches';
+COMMENT ON COLUMN champion_build_paths.tier IS 'Solo/Duo tier of the tracked player whose ingest found the match (lobby tier proxy)';
+
+-- ============================================================================
+-- Table: champion_core_timings
+-- Purpose: First-core purchase time histogram, by patch, champion, role and lobby tier
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS champion_core_timings (
+  patch TEXT NOT NULL,
+  champion_id INTEGER NOT NULL,
+  role TEXT NOT NULL,
+  tier TEXT NOT NULL,
+
+  games INTEGER NOT NULL DEFAULT 0,
+  wins INTEGER NOT NULL DEFAULT 0,
+  counts INTEGER[] NOT NULL, -- 40 one-minute buckets, the last one is 39:00+
+  sum_ms BIGINT NOT NULL DEFAULT 0, -- Average = sum_ms / games
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (patch, champion_id, role, tier)
+);
+
+COMMENT ON TABLE champion_core_timings IS 'Histogram of first completed (non-boot, non-component) item purchase times';
+
+-- ============================================================================
+-- Function: increment_build_stats
+-- Purpose: Fold one match's increments (scripts/match_aggregates.py build_stats_increments)
+-- Returns FALSE when the match was already counted
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION increment_build_stats(p_match_id TEXT, p_paths JSONB, p_timings JSONB)
+RETURNS BOOLEAN AS $$
+BEGIN
+  INSERT INTO aggregated_matches (aggregate, match_id) VALUES ('builds', p_match_id)
+  ON CONFLICT DO NOTHING;
+  IF NOT FOUND THEN
+    RETURN FALSE;
+  END IF;
+
+  INSERT INTO champion_build_paths (patch, champion_id, role, tier, path, games, wins)
+  SELECT patch, champion_id, role, tier, path, games, wins
+  FROM jsonb_to_recordset(p_paths)
+    AS r(patch TEXT, champion_id INTEGER, role TEXT, tier TEXT, path TEXT, games INTEGER, wins INTEGER)
+  ON CONFLICT (patch, champion_id, role, tier, path) DO UPDATE SET
+    games = champion_build_paths.games + EXCLUDED.games,
+    wins = champion_build_paths.wins + EXCLUDED.wins,
+    updated_at = NOW();
+
+  INSERT INTO champion_core_timings (patch, champion_id, role, tier, games, wins, counts, sum_ms)
+  SELECT patch, champion_id, role, tier, games, wins,
+         ARRAY(SELECT jsonb_array_elements_text(counts)::INTEGER), sum_ms
+  FROM jsonb_to_recordset(p_timings)
+    AS r(patch TEXT, champion_id INTEGER, role TEXT, tier TEXT, games INTEGER, wins INTEGER, counts JSONB, sum_ms BIGINT)
+  ON CONFLICT (patch, champion_id, role, tier) DO UPDATE SET
+    games = champion_core_timings.games + EXCLUDED.games,
+    wins = champion_core_timings.wins + EXCLUDED.wins,
+    counts = ARRAY(SELECT a + b FROM unnest(champion_core_timings.counts, EXCLUDED.counts) AS t(a, b)),
+    sum_ms = champion_core_timings.sum_ms + EXCLUDED.sum_ms,
+    updated_at = NOW();
+
+  RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE aggregated_matches ENABLE ROW LEVEL SECURITY;
+ALTER TABLE champion_build_paths ENABLE ROW LEVEL SECURITY;
+ALTER TABLE champion_core_timings ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Only service role can modify aggregated matches"
+  ON aggregated_matches FOR ALL
+  USING (auth.role() = 'service_role');
+
+CREATE POLICY "Allow public read access to champion build paths"
+  ON champion_build_paths FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify champion build paths"
+  ON champion_build_paths FOR ALL
+  USING (auth.role() = 'service_role');
+
+CREATE POLICY "Allow public read access to champion core timings"
+  ON champion_core_timings FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify champion core timings"
+  ON champion_core_timings FOR ALL
+  USING (auth.role() = 'service_role');
+
+-- Note: Matches stored before this migration are counted by scripts/backfill_match_aggregates.py,
+-- which re-fetches them (two requests per match) and skips matches already counted
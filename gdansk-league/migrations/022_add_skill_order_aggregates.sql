@@ -0,0 +1,84 @@
+-- Migration: Skill orders per player and per champion
+-- Created: 2026-10-19
+-- Purpose: Compare a player's skill order with stronger players' from precomputed counters
+
+-- ============================================================================
+-- Per-player skill order on match_stats (scripts/timeline_stages.py SkillOrderStage)
+-- ============================================================================
+
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS skill_order VARCHAR(18); -- 'QEWQQRQEQEREEWW', one char per level
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS skill_max_order VARCHAR(3); -- 'QEW'
+
+COMMENT ON COLUMN match_stats.skill_order IS 'Ability levelled at each champion level (Q/W/E/R), up to level 18';
+COMMENT ON COLUMN match_stats.skill_max_order IS 'Order Q, W and E were maxed; NULL if the game ended before level 9';
+
+-- ============================================================================
+-- Table: champion_skill_orders
+-- Purpose: Games / wins per skill sequence, by patch, champion, role and lobby tier
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS champion_skill_orders (
+  patch TEXT NOT NULL,
+  champion_id INTEGER NOT NULL,
+  role TEXT NOT NULL,
+  tier TEXT NOT NULL, -- 'ALL' or the lobby tier
+  kind TEXT NOT NULL, -- 'start' (first three levels) or 'max' (max order)
+  sequence VARCHAR(3) NOT NULL,
+
+  games INTEGER NOT NULL DEFAULT 0,
+  wins INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (patch, champion_id, role, tier, kind, sequence),
+  CONSTRAINT valid_skill_order_kind CHECK (kind IN ('start', 'max'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_skill_orders_champion
+  ON champion_skill_orders(champion_id, role, tier, kind, patch, games DESC);
+
+COMMENT ON TABLE champion_skill_orders IS 'Skill start / max order counters from all ten participants of ingested matches';
+
+-- ============================================================================
+-- Function: increment_skill_orders
+-- Purpose: Fold one match's increments (scripts/match_aggregates.py skill_order_increments)
+-- Returns FALSE when the match was already counted
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION increment_skill_orders(p_match_id TEXT, p_orders JSONB)
+RETURNS BOOLEAN AS $$
+BEGIN
+  INSERT INTO aggregated_matches (aggregate, match_id) VALUES ('skill_orders', p_match_id)
+  ON CONFLICT DO NOTHING;
+  IF NOT FOUND THEN
+    RETURN FALSE;
+  END IF;
+
+  INSERT INTO champion_skill_orders (patch, champion_id, role, tier, kind, sequence, games, wins)
+  SELECT patch, champion_id, role, tier, kind, sequence, games, wins
+  FROM jsonb_to_recordset(p_orders)
+    AS r(patch TEXT, champion_id INTEGER, role TEXT, tier TEXT, kind TEXT, sequence TEXT, games INTEGER, wins INTEGER)
+  ON CONFLICT (patch, champion_id, role, tier, kind, sequence) DO UPDATE SET
+    games = champion_skill_orders.games + EXCLUDED.games,
+    wins = champion_skill_orders.wins + EXCLUDED.wins,
+    updated_at = NOW();
+
+  RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE champion_skill_orders ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access to champion skill orders"
+  ON champion_skill_orders FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify champion skill orders"
+  ON champion_skill_orders FOR ALL
+  USING (auth.role() = 'service_role');
+
+-- Note: Matches stored before this migration are counted by scripts/backfill_match_aggregates.py,
+-- which re-fetches them (two requests per match) and skips matches already counted
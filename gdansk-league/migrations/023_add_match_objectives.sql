@@ -0,0 +1,82 @@
+-- Migration: Objective ledger per match and team
+-- Created: 2026-10-19
+-- Purpose: Team-level objective control (dragons and soul, voidgrubs, herald, baron, atakhan,
+-- plates, towers, inhibitors) with timestamps, extracted once at ingest
+-- (scripts/timeline_stages.py ObjectiveStage)
+
+-- ============================================================================
+-- Table: match_objectives
+-- Purpose: One row per match and team; counts are indexed columns, the full ledger is in events
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS match_objectives (
+  match_id TEXT NOT NULL,
+  team_id SMALLINT NOT NULL, -- 100 (blue side) or 200 (red side)
+  win BOOLEAN NOT NULL,
+  season INTEGER,
+  patch TEXT,
+  match_date TIMESTAMP,
+
+  dragons TEXT[] NOT NULL DEFAULT '{}', -- Elemental dragons in kill order: {'WATER', 'AIR', ...}
+  dragon_ms INTEGER[] NOT NULL DEFAULT '{}', -- Kill time of each dragon
+  elder_dragons SMALLINT NOT NULL DEFAULT 0,
+  soul TEXT, -- Soul element if this team took the soul
+  soul_ms INTEGER,
+  soul_rift TEXT, -- Soul element of the map (same for both teams)
+
+  voidgrubs SMALLINT NOT NULL DEFAULT 0,
+  heralds SMALLINT NOT NULL DEFAULT 0,
+  barons SMALLINT NOT NULL DEFAULT 0,
+  atakhans SMALLINT NOT NULL DEFAULT 0,
+  plates SMALLINT NOT NULL DEFAULT 0, -- Turret plates taken from the enemy
+  towers SMALLINT NOT NULL DEFAULT 0, -- Enemy towers destroyed
+  inhibitors SMALLINT NOT NULL DEFAULT 0, -- Enemy inhibitors destroyed
+
+  first_dragon BOOLEAN NOT NULL DEFAULT FALSE,
+  first_herald BOOLEAN NOT NULL DEFAULT FALSE,
+  first_baron BOOLEAN NOT NULL DEFAULT FALSE,
+  first_tower BOOLEAN NOT NULL DEFAULT FALSE,
+
+  -- [[timestamp, kind, detail, killer_id]], kind = dragon/voidgrub/herald/baron/atakhan/plate/tower/inhibitor
+  events JSONB NOT NULL DEFAULT '[]'::jsonb,
+
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (match_id, team_id),
+  CONSTRAINT valid_objective_team CHECK (team_id IN (100, 200))
+);
+
+-- Side-based objective stats across seasons
+CREATE INDEX IF NOT EXISTS idx_match_objectives_season_side ON match_objectives(season, team_id);
+CREATE INDEX IF NOT EXISTS idx_match_objectives_patch_side ON match_objectives(patch, team_id);
+
+COMMENT ON TABLE match_objectives IS 'Objective control per match and team; detail is the dragon type, lane or tower type';
+
+-- ============================================================================
+-- Per-player objective participation on match_stats
+-- ============================================================================
+
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS objective_takedowns SMALLINT;
+ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS objective_participation REAL;
+
+COMMENT ON COLUMN match_stats.objective_takedowns IS 'Epic monsters, towers and inhibitors the player killed or assisted on';
+COMMENT ON COLUMN match_stats.objective_participation IS 'objective_takedowns / team objectives (plates excluded)';
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE match_objectives ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access to match objectives"
+  ON match_objectives FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify match objectives"
+  ON match_objectives FOR ALL
+  USING (auth.role() = 'service_role');
+
+-- Note: Existing matches get a ledger when they are re-ingested, and the stored match_stats rows
+-- get objective_takedowns/objective_participation in the same pass (repopulate_ranked_data.py
+-- updates the timeline columns of existing rows; the refresh daemon re-ingests a player's recent
+-- matches whose timeline columns are still NULL)
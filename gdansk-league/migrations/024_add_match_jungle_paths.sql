@@ -0,0 +1,59 @@
+-- Migration: Jungle pathing summaries
+-- Created: 2026-10-19
+-- Purpose: Camp paths and gank attempts per jungler, reconstructed at ingest from the
+-- per-minute frames (scripts/jungle_pathing.py, zones from scripts/map_zones.py)
+
+-- ============================================================================
+-- Table: match_jungle_paths
+-- Purpose: One row per match and jungler (teamPosition JUNGLE)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS match_jungle_paths (
+  match_id TEXT NOT NULL,
+  participant_id SMALLINT NOT NULL,
+  team_id SMALLINT NOT NULL,
+  champion_id INTEGER NOT NULL,
+  puuid TEXT,
+
+  -- Camps cleared in the first 15 minutes in order: own camps upper case, enemy camps lower case
+  -- BL blue buff, GR gromp, WO wolves, RA raptors, RE red buff, KR krugs, SC scuttle, DR dragon, BA baron
+  path TEXT,
+
+  ganks JSONB NOT NULL DEFAULT '[]'::jsonb, -- [[timestamp, 'top'|'mid'|'bot', success]]
+  gank_count SMALLINT NOT NULL DEFAULT 0,
+  successful_ganks SMALLINT NOT NULL DEFAULT 0,
+  first_gank_ms INTEGER,
+  ganks_top SMALLINT NOT NULL DEFAULT 0,
+  ganks_mid SMALLINT NOT NULL DEFAULT 0,
+  ganks_bot SMALLINT NOT NULL DEFAULT 0,
+
+  -- Share of frames per zone
+  own_jungle_share REAL,
+  enemy_jungle_share REAL,
+  river_share REAL,
+  lane_share REAL,
+
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (match_id, participant_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_jungle_paths_puuid ON match_jungle_paths(puuid);
+CREATE INDEX IF NOT EXISTS idx_jungle_paths_champion ON match_jungle_paths(champion_id, team_id);
+
+COMMENT ON TABLE match_jungle_paths IS 'Jungle camp path and gank attempts from minute frames (positions are per-minute samples, so paths are approximate)';
+COMMENT ON COLUMN match_jungle_paths.ganks IS 'Lane visits (2:30-20:00) with an enemy champion within 2000 units; success = jungler took part in a kill within -60s/+30s';
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE match_jungle_paths ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access to match jungle paths"
+  ON match_jungle_paths FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify match jungle paths"
+  ON match_jungle_paths FOR ALL
+  USING (auth.role() = 'service_role');
@@ -0,0 +1,88 @@
+-- Migration: Lane matchup counters
+-- Created: 2026-10-19
+-- Purpose: Matchup win rates and lane diffs per champion pair as precomputed counters, so a
+-- matchup lookup is one primary-key read instead of a grouped scan over match_stats
+
+-- ============================================================================
+-- Table: champion_matchups
+-- Purpose: Games / wins and lane diff moments per champion vs. lane opponent
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS champion_matchups (
+  patch TEXT NOT NULL,
+  role TEXT NOT NULL, -- TOP/JUNGLE/MID/ADC/SUPPORT
+  champion_id INTEGER NOT NULL,
+  opponent_champion_id INTEGER NOT NULL,
+  tier TEXT NOT NULL, -- 'ALL' or the lobby tier
+
+  games INTEGER NOT NULL DEFAULT 0,
+  wins INTEGER NOT NULL DEFAULT 0,
+
+  -- Ordered as scripts/match_aggregates.py MATCHUP_DIFFS:
+  -- gold/xp/cs diff at 10, gold/xp/cs diff at 15
+  diff_counts INTEGER[] NOT NULL, -- Games the diff exists for (games that reached the minute)
+  diff_sums BIGINT[] NOT NULL, -- Mean = diff_sums / diff_counts
+  diff_squares BIGINT[] NOT NULL, -- Variance = diff_squares / diff_counts - mean^2
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (patch, role, champion_id, opponent_champion_id, tier)
+);
+
+CREATE INDEX IF NOT EXISTS idx_matchups_champion
+  ON champion_matchups(champion_id, role, tier, patch, games DESC);
+
+COMMENT ON TABLE champion_matchups IS 'Lane matchup counters from all ten participants of ingested matches (both sides of every lane)';
+COMMENT ON COLUMN champion_matchups.diff_sums IS 'Sums of gold/xp/cs diff at 10 and 15 minutes vs. the lane opponent (MATCHUP_DIFFS order)';
+
+-- ============================================================================
+-- Function: increment_matchups
+-- Purpose: Fold one match's increments (scripts/match_aggregates.py matchup_increments)
+-- Returns FALSE when the match was already counted
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION increment_matchups(p_match_id TEXT, p_matchups JSONB)
+RETURNS BOOLEAN AS $$
+BEGIN
+  INSERT INTO aggregated_matches (aggregate, match_id) VALUES ('matchups', p_match_id)
+  ON CONFLICT DO NOTHING;
+  IF NOT FOUND THEN
+    RETURN FALSE;
+  END IF;
+
+  INSERT INTO champion_matchups (patch, role, champion_id, opponent_champion_id, tier, games, wins,
+                                 diff_counts, diff_sums, diff_squares)
+  SELECT patch, role, champion_id, opponent_champion_id, tier, games, wins,
+         ARRAY(SELECT jsonb_array_elements_text(diff_counts)::INTEGER),
+         ARRAY(SELECT jsonb_array_elements_text(diff_sums)::BIGINT),
+         ARRAY(SELECT jsonb_array_elements_text(diff_squares)::BIGINT)
+  FROM jsonb_to_recordset(p_matchups)
+    AS r(patch TEXT, role TEXT, champion_id INTEGER, opponent_champion_id INTEGER, tier TEXT,
+         games INTEGER, wins INTEGER, diff_counts JSONB, diff_sums JSONB, diff_squares JSONB)
+  ON CONFLICT (patch, role, champion_id, opponent_champion_id, tier) DO UPDATE SET
+    games = champion_matchups.games + EXCLUDED.games,
+    wins = champion_matchups.wins + EXCLUDED.wins,
+    diff_counts = ARRAY(SELECT a + b FROM unnest(champion_matchups.diff_counts, EXCLUDED.diff_counts) AS t(a, b)),
+    diff_sums = ARRAY(SELECT a + b FROM unnest(champion_matchups.diff_sums, EXCLUDED.diff_sums) AS t(a, b)),
+    diff_squares = ARRAY(SELECT a + b FROM unnest(champion_matchups.diff_squares, EXCLUDED.diff_squares) AS t(a, b)),
+    updated_at = NOW();
+
+  RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE champion_matchups ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access to champion matchups"
+  ON champion_matchups FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify champion matchups"
+  ON champion_matchups FOR ALL
+  USING (auth.role() = 'service_role');
+
+-- Note: Matches stored before this migration are counted by scripts/backfill_match_aggregates.py,
+-- which re-fetches them (two requests per match) and skips matches already counted
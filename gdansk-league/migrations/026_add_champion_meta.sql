@@ -0,0 +1,146 @@
+-- Migration: Per-patch champion meta and cached participant ranks
+-- Created: 2026-10-19
+-- Purpose: Pick rates, win rates and role distribution per champion and patch from all ten
+-- participants of ingested matches, bucketed by each participant's own Solo/Duo tier
+
+-- ============================================================================
+-- Table: participant_ranks
+-- Purpose: Solo/Duo tier of (untracked) match participants, cached at ingest
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS participant_ranks (
+  puuid TEXT PRIMARY KEY,
+  tier TEXT NOT NULL, -- IRON ... CHALLENGER or UNRANKED
+  division TEXT, -- I-IV, NULL for master+ and unranked
+  lp INTEGER DEFAULT 0,
+  fetched_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE participant_ranks IS 'league-v4 tier of match participants; refetched after 14 days (scripts/participant_ranks.py)';
+
+-- ============================================================================
+-- Table: champion_meta
+-- Purpose: Games / wins per champion and role, by patch and participant tier
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS champion_meta (
+  patch TEXT NOT NULL,
+  tier TEXT NOT NULL, -- 'ALL' or the participant's own tier (UNRANKED included)
+  champion_id INTEGER NOT NULL,
+  role TEXT NOT NULL, -- TOP/JUNGLE/MID/ADC/SUPPORT (MID when teamPosition is missing, as in match_stats)
+
+  games INTEGER NOT NULL DEFAULT 0,
+  wins INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (patch, tier, champion_id, role)
+);
+
+COMMENT ON TABLE champion_meta IS 'Champion pick counters from all ten participants of ingested matches';
+
+-- ============================================================================
+-- Table: champion_meta_totals
+-- Purpose: Participants counted per patch and tier (pick rate denominator)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS champion_meta_totals (
+  patch TEXT NOT NULL,
+  tier TEXT NOT NULL,
+
+  picks INTEGER NOT NULL DEFAULT 0, -- Participants counted; games = picks / 10 for tier 'ALL'
+  last_game_creation BIGINT NOT NULL DEFAULT 0, -- Newest game counted (ms), orders patches
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (patch, tier)
+);
+
+-- ============================================================================
+-- Function: increment_champion_meta
+-- Purpose: Fold one match's increments (scripts/match_aggregates.py champion_meta_increments)
+-- Returns FALSE when the match was already counted
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION increment_champion_meta(p_match_id TEXT, p_picks JSONB, p_totals JSONB)
+RETURNS BOOLEAN AS $$
+BEGIN
+  INSERT INTO aggregated_matches (aggregate, match_id) VALUES ('champion_meta', p_match_id)
+  ON CONFLICT DO NOTHING;
+  IF NOT FOUND THEN
+    RETURN FALSE;
+  END IF;
+
+  INSERT INTO champion_meta (patch, tier, champion_id, role, games, wins)
+  SELECT patch, tier, champion_id, role, SUM(games), SUM(wins)
+  FROM jsonb_to_recordset(p_picks)
+    AS r(patch TEXT, tier TEXT, champion_id INTEGER, role TEXT, games INTEGER, wins INTEGER)
+  GROUP BY patch, tier, champion_id, role
+  ON CONFLICT (patch, tier, champion_id, role) DO UPDATE SET
+    games = champion_meta.games + EXCLUDED.games,
+    wins = champion_meta.wins + EXCLUDED.wins,
+    updated_at = NOW();
+
+  INSERT INTO champion_meta_totals (patch, tier, picks, last_game_creation)
+  SELECT patch, tier, picks, game_creation
+  FROM jsonb_to_recordset(p_totals)
+    AS r(patch TEXT, tier TEXT, picks INTEGER, game_creation BIGINT)
+  ON CONFLICT (patch, tier) DO UPDATE SET
+    picks = champion_meta_totals.picks + EXCLUDED.picks,
+    last_game_creation = GREATEST(champion_meta_totals.last_game_creation, EXCLUDED.last_game_creation),
+    updated_at = NOW();
+
+  RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- View: champion_meta_latest
+-- Purpose: Pick rate, win rate and role share per champion on the newest patch (one query)
+-- ============================================================================
+
+CREATE OR REPLACE VIEW champion_meta_latest AS
+SELECT
+  m.patch,
+  m.tier,
+  m.champion_id,
+  m.role,
+  m.games,
+  m.wins,
+  ROUND(m.wins::NUMERIC / NULLIF(m.games, 0) * 100, 2) AS win_rate,
+  -- Share of games in the tier bucket (10 picks per game)
+  ROUND(m.games::NUMERIC * 10 / NULLIF(t.picks, 0) * 100, 2) AS pick_rate,
+  ROUND(m.games::NUMERIC / SUM(m.games) OVER (PARTITION BY m.tier, m.champion_id) * 100, 2) AS role_share
+FROM champion_meta m
+JOIN champion_meta_totals t ON t.patch = m.patch AND t.tier = m.tier
+WHERE m.patch = (
+  SELECT patch FROM champion_meta_totals WHERE tier = 'ALL' ORDER BY last_game_creation DESC LIMIT 1
+);
+
+COMMENT ON VIEW champion_meta_latest IS 'champion_meta rates for the patch of the newest counted game';
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE participant_ranks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE champion_meta ENABLE ROW LEVEL SECURITY;
+ALTER TABLE champion_meta_totals ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Only service role can modify participant ranks"
+  ON participant_ranks FOR ALL
+  USING (auth.role() = 'service_role');
+
+CREATE POLICY "Allow public read access to champion meta"
+  ON champion_meta FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify champion meta"
+  ON champion_meta FOR ALL
+  USING (auth.role() = 'service_role');
+
+CREATE POLICY "Allow public read access to champion meta totals"
+  ON champion_meta_totals FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify champion meta totals"
+  ON champion_meta_totals FOR ALL
+  USING (auth.role() = 'service_role');
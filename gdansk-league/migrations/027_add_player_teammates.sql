@@ -0,0 +1,103 @@
+-- Migration: Teammate co-occurrence index
+-- Created: 2026-10-19
+-- Purpose: Games and wins together for every pair of tracked players seen on the same team,
+-- so "who does X duo with" and synergy queries are an index lookup instead of a match scan
+
+-- ============================================================================
+-- Table: player_teammates
+-- Purpose: Sparse adjacency list of tracked players (one row per direction of each pair)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS player_teammates (
+  puuid TEXT NOT NULL,
+  teammate_puuid TEXT NOT NULL,
+
+  games INTEGER NOT NULL DEFAULT 0,
+  wins INTEGER NOT NULL DEFAULT 0,
+  first_game_creation BIGINT NOT NULL, -- ms
+  last_game_creation BIGINT NOT NULL, -- ms
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (puuid, teammate_puuid),
+  CONSTRAINT distinct_teammates CHECK (puuid <> teammate_puuid)
+);
+
+-- "Who does X play with most" without sorting all of X's rows
+CREATE INDEX IF NOT EXISTS idx_player_teammates_games
+  ON player_teammates(puuid, games DESC);
+
+COMMENT ON TABLE player_teammates IS 'Both directions of every tracked pair that shared a team in an ingested ranked match';
+COMMENT ON COLUMN player_teammates.games IS 'Same-team games of a pair; includes solo-queued games that happened to match them together';
+
+-- ============================================================================
+-- Table: teammate_pair_matches
+-- Purpose: Which (match, pair) combinations are already counted. Keyed per pair rather than
+-- per match (aggregated_matches), so when a player joins the roster later, re-ingesting a
+-- match they shared with tracked players still adds the new pairs
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS teammate_pair_matches (
+  match_id TEXT NOT NULL,
+  puuid TEXT NOT NULL,
+  teammate_puuid TEXT NOT NULL,
+
+  PRIMARY KEY (match_id, puuid, teammate_puuid)
+);
+
+-- ============================================================================
+-- Function: increment_teammates
+-- Purpose: Fold one match's increments (scripts/match_aggregates.py teammate_increments)
+-- Returns FALSE when every pair of the match was already counted
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION increment_teammates(p_match_id TEXT, p_pairs JSONB)
+RETURNS BOOLEAN AS $$
+DECLARE
+  v_counted INTEGER;
+BEGIN
+  WITH pairs AS (
+    SELECT puuid, teammate_puuid, games, wins, game_creation
+    FROM jsonb_to_recordset(p_pairs)
+      AS r(puuid TEXT, teammate_puuid TEXT, games INTEGER, wins INTEGER, game_creation BIGINT)
+  ),
+  new_pairs AS (
+    INSERT INTO teammate_pair_matches (match_id, puuid, teammate_puuid)
+    SELECT p_match_id, puuid, teammate_puuid FROM pairs
+    ON CONFLICT DO NOTHING
+    RETURNING puuid, teammate_puuid
+  )
+  INSERT INTO player_teammates (puuid, teammate_puuid, games, wins, first_game_creation, last_game_creation)
+  SELECT pairs.puuid, pairs.teammate_puuid, pairs.games, pairs.wins, pairs.game_creation, pairs.game_creation
+  FROM pairs
+  JOIN new_pairs USING (puuid, teammate_puuid)
+  ON CONFLICT (puuid, teammate_puuid) DO UPDATE SET
+    games = player_teammates.games + EXCLUDED.games,
+    wins = player_teammates.wins + EXCLUDED.wins,
+    first_game_creation = LEAST(player_teammates.first_game_creation, EXCLUDED.first_game_creation),
+    last_game_creation = GREATEST(player_teammates.last_game_creation, EXCLUDED.last_game_creation),
+    updated_at = NOW();
+
+  GET DIAGNOSTICS v_counted = ROW_COUNT;
+  RETURN v_counted > 0;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE player_teammates ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access to player teammates"
+  ON player_teammates FOR SELECT
+  USING (true);
+
+CREATE POLICY "Only service role can modify player teammates"
+  ON player_teammates FOR ALL
+  USING (auth.role() = 'service_role');
+
+ALTER TABLE teammate_pair_matches ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Only service role can modify teammate pair matches"
+  ON teammate_pair_matches FOR ALL
+  USING (auth.role() = 'service_role');
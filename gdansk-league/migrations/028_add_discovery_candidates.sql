@@ -0,0 +1,97 @@
+-- Migration: Player discovery candidates
+-- Created: 2026-10-19
+-- Purpose: Persisted seen set and frontier of the co-participant crawler (scripts/discover_players.py)
+
+-- ============================================================================
+-- Table: discovery_candidates
+-- Purpose: Every PUUID the crawler has seen, with the local-player signals
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS discovery_candidates (
+  puuid TEXT PRIMARY KEY,
+  game_name TEXT,
+  tag_line TEXT,
+
+  depth SMALLINT NOT NULL, -- 0 = tracked player, n = co-participant of a depth n-1 player
+  co_play INTEGER NOT NULL DEFAULT 0, -- Same-team games with expanded (local) players
+  local_hint BOOLEAN NOT NULL DEFAULT FALSE, -- Gdańsk-area tag line or name
+  discovered_from TEXT, -- PUUID of the player whose matches surfaced this one
+
+  status TEXT NOT NULL DEFAULT 'pending', -- pending, expanded, promoted
+  first_seen_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  last_seen_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  expanded_at TIMESTAMP WITH TIME ZONE,
+
+  CONSTRAINT valid_discovery_status CHECK (status IN ('pending', 'expanded', 'promoted'))
+);
+
+-- Frontier: pending candidates breadth-first, most co-play first
+CREATE INDEX IF NOT EXISTS idx_discovery_frontier
+  ON discovery_candidates(depth, co_play DESC) WHERE status = 'pending';
+
+COMMENT ON TABLE discovery_candidates IS 'Co-participants found by discover_players.py; likely local = local_hint or co_play >= 2';
+
+-- ============================================================================
+-- Table: discovery_crawled_matches
+-- Purpose: Every match the crawler has fetched; co-play is only counted for matches not
+-- recorded here yet, so a crawl killed before its Bloom filter was saved cannot count a
+-- re-fetched match twice
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS discovery_crawled_matches (
+  match_id TEXT PRIMARY KEY,
+  crawled_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- ============================================================================
+-- Function: record_discovery_candidates
+-- Purpose: Record the crawled matches, insert newly seen players and add co-play of
+-- players seen again (co_play_matches: same-team matches with the expanded player)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION record_discovery_candidates(p_candidates JSONB, p_match_ids TEXT[] DEFAULT '{}')
+RETURNS VOID AS $$
+DECLARE
+  v_new_matches TEXT[];
+BEGIN
+  WITH crawled AS (
+    INSERT INTO discovery_crawled_matches (match_id)
+    SELECT unnest(p_match_ids)
+    ON CONFLICT DO NOTHING
+    RETURNING match_id
+  )
+  SELECT COALESCE(array_agg(match_id), '{}') INTO v_new_matches FROM crawled;
+
+  INSERT INTO discovery_candidates (puuid, game_name, tag_line, depth, co_play, local_hint, discovered_from)
+  SELECT puuid, game_name, tag_line, depth,
+         (SELECT COUNT(*) FROM jsonb_array_elements_text(COALESCE(co_play_matches, '[]'::jsonb)) AS m(match_id)
+          WHERE m.match_id = ANY(v_new_matches))::INTEGER,
+         local_hint, discovered_from
+  FROM jsonb_to_recordset(p_candidates)
+    AS r(puuid TEXT, game_name TEXT, tag_line TEXT, depth SMALLINT, co_play_matches JSONB,
+         local_hint BOOLEAN, discovered_from TEXT)
+  ON CONFLICT (puuid) DO UPDATE SET
+    game_name = COALESCE(EXCLUDED.game_name, discovery_candidates.game_name),
+    tag_line = COALESCE(EXCLUDED.tag_line, discovery_candidates.tag_line),
+    depth = LEAST(discovery_candidates.depth, EXCLUDED.depth),
+    co_play = discovery_candidates.co_play + EXCLUDED.co_play,
+    local_hint = discovery_candidates.local_hint OR EXCLUDED.local_hint,
+    last_seen_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- Row-Level Security (RLS) Policies
+-- ============================================================================
+
+ALTER TABLE discovery_candidates ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Only service role can modify discovery candidates"
+  ON discovery_candidates FOR ALL
+  USING (auth.role() = 'service_role');
+
+ALTER TABLE discovery_crawled_matches ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Only service role can modify discovery crawled matches"
+  ON discovery_crawled_matches FOR ALL
+  USING (auth.role() = 'service_role');
@@ -0,0 +1,148 @@
+"""
+Re-ingest stored matches that predate the timeline aggregates
+Matches in match_stats stored before the per-match counters existed (build paths, core
+timings, skill orders, matchups) or before the timeline columns were added are fetched
+again and run through the same storage as the ingest: the stored rows get their timeline
+columns, and each increment_* function skips matches it has already counted. Participant
+tiers for the champion meta come from the rank cache only.
+
+Costs two Riot API requests per match (match + timeline), newest matches first;
+--max-requests caps a run, so the job can be repeated until nothing is left.
+Usage: python backfill_match_aggregates.py [--max-requests 400] [--dry-run]
+"""
+
+import argparse
+import os
+from collections import defaultdict
+from typing import Dict, List, Set
+
+from match_processing import aggregate_match_analytics
+from participant_ranks import load_cached_ranks
+from repopulate_ranked_data import (
+    get_match_data, get_match_timeline, store_analytics, store_jungle_paths, store_match_aggregates,
+    store_match_stats, store_objectives, store_position_tracks, store_teamfights, supabase
+)
+from timeline_engine import run_stages
+from timeline_stages import ingest_stages
+
+# Counters fed from timeline stages (all three are counted in the same ingest pass)
+TIMELINE_AGGREGATES = ('builds', 'skill_orders', 'matchups')
+
+PAGE_SIZE = 1000
+
+
+def _fetch_all(query_builder) -> List[Dict]:
+    """All rows of a PostgREST query, PAGE_SIZE at a time"""
+    rows, start = [], 0
+    while True:
+        batch = query_builder().range(start, start + PAGE_SIZE - 1).execute().data or []
+        rows.extend(batch)
+        if len(batch) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def load_counted_matches() -> Set[str]:
+    """Match IDs already counted by every timeline aggregate"""
+    rows = _fetch_all(lambda: supabase.table('aggregated_matches').select('aggregate, match_id')
+                      .in_('aggregate', list(TIMELINE_AGGREGATES)).order('aggregate').order('match_id'))
+    counted = defaultdict(set)
+    for row in rows:
+        counted[row['match_id']].add(row['aggregate'])
+    return {match_id for match_id, aggregates in counted.items() if len(aggregates) == len(TIMELINE_AGGREGATES)}
+
+
+def load_pending_matches() -> Dict[str, List[str]]:
+    """
+    Stored matches that still need a re-ingest
+
+    Returns:
+        match_id -> player_ids of its match_stats rows, newest match first
+    """
+    counted = load_counted_matches()
+    rows = _fetch_all(lambda: supabase.table('match_stats').select('match_id, player_id, teamfights')
+                      .order('match_id').order('player_id'))
+    pending = defaultdict(list)
+    stale = set()
+    for row in rows:
+        pending[row['match_id']].append(row['player_id'])
+        if row['teamfights'] is None or row['match_id'] not in counted:
+            stale.add(row['match_id'])
+    return {match_id: pending[match_id] for match_id in sorted(stale, reverse=True)}
+
+
+def reingest_match(match_id: str, players: List[Dict], archive=None):
+    """
+    Fetch a stored match again and run it through the ingest storage
+
+    Args:
+        match_id: Match identifier
+        players: players rows (puuid, tier) of the tracked players with a match_stats row for it
+        archive: Optional MatchArchiveWriter
+    """
+    match_data = get_match_data(match_id)
+    timeline = get_match_timeline(match_id)
+    stage_results = run_stages(match_data, timeline, ingest_stages())
+
+    for player in players:
+        store_match_stats(match_data, player['puuid'], stage_results)
+        store_analytics(aggregate_match_analytics(match_id, match_data, timeline, player['puuid']), stage_results)
+    store_position_tracks(match_id, timeline)
+    store_teamfights(match_id, stage_results['teamfights'])
+    store_objectives(match_data, stage_results['objectives'])
+    store_jungle_paths(match_data, stage_results['jungle_paths'])
+
+    ranks = load_cached_ranks([p['puuid'] for p in match_data['info']['participants'] if p.get('puuid')])
+    store_match_aggregates(match_data, stage_results, players[0].get('tier'), ranks)
+    if archive:
+        archive.add(match_data, timeline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-ingest stored matches missing timeline aggregates')
+    parser.add_argument('--max-requests', type=int, default=400, help='Riot API requests to spend (2 per match)')
+    parser.add_argument('--dry-run', action='store_true', help='Only report how many matches are pending')
+    args = parser.parse_args()
+
+    pending = load_pending_matches()
+    print("=" * 60)
+    print(f"  Match aggregate backfill: {len(pending)} stored matches pending")
+    print("=" * 60)
+    if args.dry_run or not pending:
+        return
+
+    players = {
+        row['id']: row
+        for row in (supabase.table('players').select('id, puuid, tier').execute().data or [])
+    }
+
+    archive = None
+    if os.getenv('MATCH_ARCHIVE_DIR'):
+        from match_archive import open_archive_from_env
+        archive = open_archive_from_env()
+
+    done = failed = requests_made = 0
+    for match_id, player_ids in pending.items():
+        if requests_made + 2 > args.max_requests:
+            break
+        tracked = [players[player_id] for player_id in player_ids if player_id in players]
+        if not tracked:
+            continue
+        print(f"\n[{done + failed + 1}] {match_id}")
+        requests_made += 2
+        try:
+            reingest_match(match_id, tracked, archive)
+            done += 1
+        except Exception as e:
+            print(f"  [ERROR] {e}")
+            failed += 1
+
+    if archive:
+        archive.close()
+
+    left = len(pending) - done - failed
+    print(f"\n[OK] {done} matches re-ingested, {failed} failed, {left} left ({requests_made} requests)")
+
+
+if __name__ == "__main__":
+    main()
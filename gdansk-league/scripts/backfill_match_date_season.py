@@ -4,28 +4,20 @@ Backfill match_date and season for existing match_stats records
 import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
-import requests
-import time
 from datetime import datetime
+from riot_api import CONTINENT, riot_get
 
 load_dotenv()
 
-RIOT_API_KEY = os.getenv('RIOT_API_KEY')
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-MATCH_V5_BASE = 'https://europe.api.riotgames.com'
-
 def get_match_metadata(match_id: str):
     """Get match metadata from Riot API"""
-    url = f'{MATCH_V5_BASE}/lol/match/v5/matches/{match_id}'
-    headers = {'X-Riot-Token': RIOT_API_KEY}
-
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        data = response.json()
+    data = riot_get(CONTINENT, f'/lol/match/v5/matches/{match_id}')
+    if data:
         game_creation_ms = data['info']['gameCreation']
         match_date = datetime.fromtimestamp(game_creation_ms / 1000)
         game_version = data['info']['gameVersion']
@@ -37,7 +29,7 @@ def get_match_metadata(match_id: str):
             'version': game_version
         }
     else:
-        print(f'[ERROR] Failed to fetch match {match_id}: {response.status_code}')
+        print(f'[ERROR] Failed to fetch match {match_id}')
         return None
 
 def main():
@@ -79,9 +71,6 @@ def main():
             except Exception as e:
                 print(f'  [ERROR] Failed to update: {e}')
 
-        # Rate limiting
-        time.sleep(0.5)
-
     print(f'\n{"="*60}')
     print(f'[OK] Backfill complete!')
     print(f'Updated {updated_count}/{len(records_to_update)} records')
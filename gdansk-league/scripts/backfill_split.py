@@ -4,19 +4,15 @@ Backfill split column for existing match_stats records based on patch version
 import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
-import requests
-import time
+from riot_api import CONTINENT, riot_get
 
 load_dotenv()
 
-RIOT_API_KEY = os.getenv('RIOT_API_KEY')
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-MATCH_V5_BASE = 'https://europe.api.riotgames.com'
-
 def get_split_info(patch_number: int) -> dict:
     """Calculate split info based on patch number"""
     # Season 15 splits: 1-8 (Split 1), 9-16 (Split 2), 17-22 (Split 3)
@@ -38,12 +34,8 @@ def get_split_info(patch_number: int) -> dict:
 
 def get_match_patch(match_id: str):
     """Get patch version from Riot API"""
-    url = f'{MATCH_V5_BASE}/lol/match/v5/matches/{match_id}'
-    headers = {'X-Riot-Token': RIOT_API_KEY}
-
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        data = response.json()
+    data = riot_get(CONTINENT, f'/lol/match/v5/matches/{match_id}')
+    if data:
         game_version = data['info']['gameVersion']
         version_parts = game_version.split('.')
         season = int(version_parts[0])
@@ -60,7 +52,7 @@ def get_match_patch(match_id: str):
             'split_name': split_info['split_name']
         }
     else:
-        print(f'[ERROR] Failed to fetch match {match_id}: {response.status_code}')
+        print(f'[ERROR] Failed to fetch match {match_id}')
         return None
 
 def main():
@@ -103,9 +95,6 @@ def main():
             except Exception as e:
                 print(f'  [ERROR] Failed to update: {e}')
 
-        # Rate limiting
-        time.sleep(0.5)
-
     print(f'\n{"="*60}')
     print(f'[OK] Backfill complete!')
     print(f'Updated {updated_count}/{len(records_to_update)} records')
@@ -0,0 +1,313 @@
+"""
+Benchmark the match processing hot paths
+Times role metrics, match_stats extraction, analytics aggregation and event/snapshot
+row building on the sample match and timeline (scaled up to a corpus of N matches,
+or N distinct synthetic matches with --synthetic),
+reports matches/s and peak memory, and compares against a saved baseline.
+Usage: python benchmark_pipeline.py --scale 50 [--save-baseline | --compare]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from itertools import islice
+from typing import Callable, Dict, List, Tuple
+
+from timeline_parser import parse_timeline
+from position_tracks import decode_tracks, encode_tracks
+from timeline_engine import run_stages
+from timeline_stages import ingest_stages
+from riot_models import decode_match
+from match_processing import (
+    ROLE_MAPPING, aggregate_match_analytics, build_match_event_rows,
+    build_match_stats_row, build_timeline_snapshot_rows
+)
+
+# RoleMetricsCalculator lives with the backend scripts
+BACKEND_SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend', 'scripts')
+sys.path.append(BACKEND_SCRIPTS_DIR)
+from calculate_role_metrics import RoleMetricsCalculator, extract_match_stats_for_db  # noqa: E402
+
+SAMPLE_MATCH_FILE = os.path.join(BACKEND_SCRIPTS_DIR, 'match_details_sample.json')
+SAMPLE_TIMELINE_FILE = os.path.join(BACKEND_SCRIPTS_DIR, 'match_timeline_sample.json')
+DEFAULT_BASELINE_FILE = '../data/benchmark_baseline.json'
+
+# A benchmark is slower than baseline if its throughput drops by more than this fraction
+DEFAULT_TOLERANCE = 0.2
+
+# (match_id, match document, timeline document, raw timeline JSON, raw match JSON)
+CorpusEntry = Tuple[str, dict, dict, str, str]
+
+
+def load_corpus(scale: int, synthetic: bool = False, seed: int = 42) -> List[CorpusEntry]:
+    """
+    Build a corpus of scale matches from the sample documents or the synthetic generator
+
+    Every copy is parsed separately, so no two matches share objects
+
+    Args:
+        scale: Number of matches in the corpus
+        synthetic: Use distinct generated matches (synthetic_matches.py) instead of sample copies
+        seed: Generator seed when synthetic
+
+    Returns:
+        List of (match_id, match, timeline, raw timeline text, raw match text)
+    """
+    if synthetic:
+        from synthetic_matches import generate_matches
+        corpus = []
+        for match, timeline in islice(generate_matches(player_count=max(10, scale), games_per_player=10, seed=seed), scale):
+            timeline_text = json.dumps(timeline)
+            corpus.append((match['metadata']['matchId'], match, json.loads(timeline_text), timeline_text, json.dumps(match)))
+        return corpus
+
+    with open(SAMPLE_MATCH_FILE, 'r', encoding='utf-8') as f:
+        match_text = f.read()
+    with open(SAMPLE_TIMELINE_FILE, 'r', encoding='utf-8') as f:
+        timeline_text = f.read()
+    sample_id = json.loads(match_text)['metadata']['matchId']
+
+    corpus = []
+    for index in range(scale):
+        match_id = f"{sample_id}_{index}"
+        corpus_match_text = match_text.replace(sample_id, match_id)
+        corpus_timeline_text = timeline_text.replace(sample_id, match_id)
+        corpus.append((
+            match_id,
+            json.loads(corpus_match_text),
+            json.loads(corpus_timeline_text),
+            corpus_timeline_text,
+            corpus_match_text
+        ))
+    return corpus
+
+
+def _participant_roles(match_data: dict) -> List[Tuple[int, str, str]]:
+    """(participant_id, puuid, database role) for every participant"""
+    return [
+        (p['participantId'], p['puuid'], ROLE_MAPPING.get(p.get('teamPosition'), 'MID'))
+        for p in match_data['info']['participants']
+    ]
+
+
+def bench_parse_match(corpus: List[CorpusEntry]) -> int:
+    """json.loads of the raw match (what a dict-based path pays before reading any field)"""
+    for _, _, _, _, match_text in corpus:
+        json.loads(match_text)
+    return len(corpus)
+
+
+def bench_parse_timeline(corpus: List[CorpusEntry]) -> int:
+    """json.loads of the raw timeline (the cost every ingest pays first)"""
+    for _, _, _, timeline_text, _ in corpus:
+        json.loads(timeline_text)
+    return len(corpus)
+
+
+def bench_parse_timeline_projected(corpus: List[CorpusEntry]) -> int:
+    """timeline_parser.parse_timeline (projected decode used by the ingest scripts)"""
+    for _, _, _, timeline_text, _ in corpus:
+        parse_timeline(timeline_text)
+    return len(corpus)
+
+
+def bench_role_metrics(corpus: List[CorpusEntry]) -> int:
+    """RoleMetricsCalculator.calculate_all_metrics for all ten participants"""
+    calculator = RoleMetricsCalculator()
+    for _, match_data, timeline, _, _ in corpus:
+        for participant_id, _, role in _participant_roles(match_data):
+            calculator.calculate_all_metrics(match_data, timeline, participant_id, role)
+    return len(corpus)
+
+
+def bench_extract_match_stats(corpus: List[CorpusEntry]) -> int:
+    """extract_match_stats_for_db for all ten participants"""
+    for _, match_data, timeline, _, _ in corpus:
+        for participant_id, _, role in _participant_roles(match_data):
+            extract_match_stats_for_db(match_data, timeline, participant_id, role)
+    return len(corpus)
+
+
+def bench_match_stats_rows(corpus: List[CorpusEntry]) -> int:
+    """decode_match of the raw match + build_match_stats_row for all ten participants (archive import path)"""
+    for _, _, _, _, match_text in corpus:
+        match = decode_match(match_text)
+        for participant in match.info.participants:
+            build_match_stats_row(match, participant, 'benchmark-player')
+    return len(corpus)
+
+
+def bench_aggregate_analytics(corpus: List[CorpusEntry]) -> int:
+    """aggregate_match_analytics for all ten participants"""
+    for match_id, match_data, timeline, _, _ in corpus:
+        for _, puuid, _ in _participant_roles(match_data):
+            aggregate_match_analytics(match_id, match_data, timeline, puuid)
+    return len(corpus)
+
+
+def bench_event_rows(corpus: List[CorpusEntry]) -> int:
+    """build_match_event_rows, lean storage (store_match_events without the insert)"""
+    for match_id, _, timeline, _, _ in corpus:
+        build_match_event_rows(match_id, timeline)
+    return len(corpus)
+
+
+def bench_snapshot_rows(corpus: List[CorpusEntry]) -> int:
+    """build_timeline_snapshot_rows (store_timeline_snapshots without the insert)"""
+    for match_id, _, timeline, _, _ in corpus:
+        build_timeline_snapshot_rows(match_id, timeline)
+    return len(corpus)
+
+
+def bench_position_tracks(corpus: List[CorpusEntry]) -> int:
+    """encode_tracks + decode_tracks (match_position_tracks blob round trip)"""
+    for _, _, timeline, _, _ in corpus:
+        decode_tracks(encode_tracks(timeline))
+    return len(corpus)
+
+
+def bench_ingest_stages(corpus: List[CorpusEntry]) -> int:
+    """run_stages with ingest_stages() (single pass: teamfights, ...)"""
+    for _, match_data, timeline, _, _ in corpus:
+        run_stages(match_data, timeline, ingest_stages())
+    return len(corpus)
+
+
+# Benchmark name -> function(corpus) returning matches processed
+BENCHMARKS: Dict[str, Callable[[List[CorpusEntry]], int]] = {
+    'parse_match': bench_parse_match,
+    'parse_timeline': bench_parse_timeline,
+    'parse_timeline_projected': bench_parse_timeline_projected,
+    'role_metrics': bench_role_metrics,
+    'extract_match_stats': bench_extract_match_stats,
+    'match_stats_rows': bench_match_stats_rows,
+    'aggregate_analytics': bench_aggregate_analytics,
+    'event_rows': bench_event_rows,
+    'snapshot_rows': bench_snapshot_rows,
+    'position_tracks': bench_position_tracks,
+    'ingest_stages': bench_ingest_stages,
+}
+
+
+def run_benchmark(func: Callable[[List[CorpusEntry]], int], corpus: List[CorpusEntry], repeats: int) -> Dict:
+    """
+    Time a benchmark (best of repeats) and measure its peak memory in a separate run
+
+    Returns:
+        Dictionary with matches_per_second, seconds and peak_memory_mb
+    """
+    best = float('inf')
+    matches = 0
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        matches = func(corpus)
+        best = min(best, time.perf_counter() - start)
+
+    # tracemalloc slows allocation down, so memory gets its own run
+    gc.collect()
+    tracemalloc.start()
+    func(corpus)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'matches_per_second': round(matches / best, 2) if best > 0 else None,
+        'seconds': round(best, 4),
+        'peak_memory_mb': round(peak / 1024 / 1024, 2)
+    }
+
+
+def compare_to_baseline(results: Dict[str, Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Find benchmarks that got slower or hungrier than the baseline allows
+
+    Returns:
+        List of human readable regression descriptions (empty if none)
+    """
+    regressions = []
+    if baseline.get('scale') != results.get('scale') or baseline.get('corpus', 'sample') != results.get('corpus'):
+        print(f"[WARN] Baseline was recorded on a different corpus "
+              f"({baseline.get('corpus', 'sample')}, scale {baseline.get('scale')})")
+
+    for name, result in results['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if not base:
+            continue
+        if result['matches_per_second'] < base['matches_per_second'] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['matches_per_second']:.1f} matches/s vs baseline {base['matches_per_second']:.1f}"
+            )
+        if result['peak_memory_mb'] > max(base['peak_memory_mb'] * (1 + tolerance), base['peak_memory_mb'] + 1):
+            regressions.append(
+                f"{name}: peak {result['peak_memory_mb']:.1f} MB vs baseline {base['peak_memory_mb']:.1f} MB"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark match processing hot paths')
+    parser.add_argument('--scale', type=int, default=20, help='Matches in the benchmark corpus')
+    parser.add_argument('--synthetic', action='store_true', help='Use generated matches instead of sample copies')
+    parser.add_argument('--seed', type=int, default=42, help='Generator seed for --synthetic')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per benchmark (best is kept)')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS.keys()), help='Run only these benchmarks')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_FILE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Write this run as the new baseline')
+    parser.add_argument('--compare', action='store_true', help='Fail if slower/larger than the baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='Allowed regression fraction')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("MATCH PROCESSING BENCHMARK")
+    print("=" * 70)
+    source = f"synthetic, seed {args.seed}" if args.synthetic else "sample match + timeline"
+    print(f"Corpus: {args.scale} matches ({source}), best of {args.repeats}\n")
+
+    corpus = load_corpus(args.scale, args.synthetic, args.seed)
+
+    results = {
+        'scale': args.scale,
+        'corpus': 'synthetic' if args.synthetic else 'sample',
+        'python': platform.python_version(),
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'benchmarks': {}
+    }
+
+    print(f"{'Benchmark':<26} {'matches/s':>12} {'seconds':>10} {'peak MB':>10}")
+    print("-" * 70)
+    for name, func in BENCHMARKS.items():
+        if args.only and name not in args.only:
+            continue
+        result = run_benchmark(func, corpus, args.repeats)
+        results['benchmarks'][name] = result
+        print(f"{name:<26} {result['matches_per_second']:>12.1f} {result['seconds']:>10.4f} {result['peak_memory_mb']:>10.2f}")
+
+    print()
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"[ERROR] No baseline at {args.baseline} (run with --save-baseline first)")
+            sys.exit(1)
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"[ERROR] {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"[OK] No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Baseline saved to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,58 +4,33 @@ Analyzes last 20 ranked matches to determine most played role
 """
 
 import os
-import requests
-import time
 from collections import Counter
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from riot_api import CONTINENT, riot_get
 
 load_dotenv()
 
-API_KEY = os.getenv('RIOT_API_KEY')
-CONTINENT = "europe"
-REGION = "euw1"
-
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_ANON_KEY')
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 def get_recent_match_ids(puuid: str, count: int = 20):
-    """Fetch recent ranked match IDs"""
-    url = f"https://{CONTINENT}.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids"
-    headers = {"X-Riot-Token": API_KEY}
+    """Fetch recent ranked match IDs (pacing is handled by the shared quota)"""
     params = {
         "type": "ranked",
         "count": count
     }
 
-    try:
-        time.sleep(1.2)
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"  [FAIL] Error fetching matches: {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"  [FAIL] Error: {str(e)}")
-        return None
+    match_ids = riot_get(CONTINENT, f"/lol/match/v5/matches/by-puuid/{puuid}/ids", params=params)
+    if match_ids is None:
+        print(f"  [FAIL] Error fetching matches")
+    return match_ids
 
 def get_match_details(match_id: str):
     """Fetch detailed match information"""
-    url = f"https://{CONTINENT}.api.riotgames.com/lol/match/v5/matches/{match_id}"
-    headers = {"X-Riot-Token": API_KEY}
-
-    try:
-        time.sleep(1.2)
-        response = requests.get(url, headers=headers, params={}, timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
-    except Exception as e:
-        return None
+    return riot_get(CONTINENT, f"/lol/match/v5/matches/{match_id}")
 
 def get_player_role_from_match(match_data, puuid: str):
     """Extract the role/position this player played in a match"""
@@ -2,12 +2,14 @@
 Player Data Collection Script
 Reads player names from file and fetches their stats from Riot API
 Outputs to CSV for analysis or database import
+Players whose summoner revisionDate matches the previous CSV keep their ranked stats from it
+(no league-v4 request)
 """
 
 import csv
 import os
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 from riot_api import get_player_full_data, RiotAPIError
 
 
@@ -38,6 +40,38 @@ def read_player_names(file_path: str) -> List[str]:
     return names
 
 
+def load_previous_players(file_path: str) -> Dict[str, Dict]:
+    """
+    Read the players of a previous collection run
+
+    Args:
+        file_path: CSV written by save_to_csv
+
+    Returns:
+        summoner_name -> player data with the numeric fields converted back
+    """
+    if not os.path.exists(file_path):
+        return {}
+
+    def number(value: str, cast) -> Optional[float]:
+        return cast(value) if value not in (None, '') else None
+
+    previous = {}
+    with open(file_path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            row.pop('collected_at', None)
+            row.update({
+                'summoner_level': number(row.get('summoner_level'), int),
+                'lp': number(row.get('lp'), int),
+                'wins': number(row.get('wins'), int),
+                'losses': number(row.get('losses'), int),
+                'winrate': number(row.get('winrate'), float),
+                'summoner_revision_date': number(row.get('summoner_revision_date'), int),
+            })
+            previous[row['summoner_name']] = row
+    return previous
+
+
 def save_to_csv(players_data: List[Dict], output_file: str):
     """
     Save player data to CSV file
@@ -65,12 +99,13 @@ def save_to_csv(players_data: List[Dict], output_file: str):
         'wins',
         'losses',
         'winrate',
+        'summoner_revision_date',
         'collected_at'
     ]
 
     # Write to CSV
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
+        writer = csv.DictWriter(f, fieldnames=headers, extrasaction='ignore')
         writer.writeheader()
 
         for player in players_data:
@@ -94,6 +129,7 @@ def collect_players(player_names: List[str], save_partial: bool = True) -> List[
     """
     collected_players = []
     failed_players = []
+    previous_players = load_previous_players(OUTPUT_CSV_FILE)
 
     total = len(player_names)
     print(f"\n=== Starting Collection for {total} Players ===\n")
@@ -102,7 +138,7 @@ def collect_players(player_names: List[str], save_partial: bool = True) -> List[
         print(f"[{i}/{total}] Processing: {name}")
 
         try:
-            player_data = get_player_full_data(name)
+            player_data = get_player_full_data(name, previous_players.get(name.split('#')[0]))
 
             if player_data:
                 collected_players.append(player_data)
@@ -0,0 +1,116 @@
+"""
+Compact existing match_events rows to the lean storage format (migration 015)
+Rebuilds the typed columns and damage summary from event_data, then clears event_data.
+Run VACUUM FULL match_events afterwards to give the space back to the database.
+Only installs that still have match_events (migration 006 drops it) have anything to compact.
+Usage: python compact_match_events.py [--batch-size 500] [--no-damage-summary] [--dry-run]
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, List
+from dotenv import load_dotenv
+from supabase import create_client, Client
+from match_processing import build_match_event_row
+
+# Load environment variables
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')
+
+# Initialize Supabase client
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Columns written by the lean format (upserted together so every row in a batch has the same keys)
+LEAN_COLUMNS = (
+    'id', 'match_id', 'timestamp_ms', 'event_type', 'participant_id', 'killer_id', 'victim_id',
+    'assisting_participant_ids', 'position_x', 'position_y', 'team_id', 'bounty', 'shutdown_bounty',
+    'kill_streak_length', 'building_type', 'lane_type', 'tower_type', 'monster_type', 'monster_sub_type',
+    'damage_summary', 'event_data'
+)
+
+
+def compact_row(row: Dict, damage_summary: bool) -> Dict:
+    """Lean version of a stored match_events row (event_data cleared)"""
+    event = row['event_data']
+    if isinstance(event, str):
+        event = json.loads(event)
+
+    lean = build_match_event_row(row['match_id'], event, 'lean', damage_summary)
+    lean['id'] = row['id']
+    lean['event_data'] = None
+    return {column: lean.get(column) for column in LEAN_COLUMNS}
+
+
+def match_events_exists() -> bool:
+    """match_events is still present (installs that ran migration 006 no longer have it)"""
+    try:
+        supabase.table('match_events').select('id').limit(1).execute()
+        return True
+    except Exception as e:
+        if 'match_events' in str(e) and ('does not exist' in str(e) or 'schema cache' in str(e)):
+            return False
+        raise
+
+
+def fetch_batch(after_id: int, batch_size: int) -> List[Dict]:
+    """Next rows (by id) that still carry the raw event"""
+    result = supabase.table('match_events').select('id, match_id, event_data') \
+        .not_.is_('event_data', 'null').gt('id', after_id).order('id').limit(batch_size).execute()
+    return result.data or []
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compact match_events to the lean storage format')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows per fetch/upsert')
+    parser.add_argument('--no-damage-summary', action='store_true', help='Drop kill damage entirely')
+    parser.add_argument('--dry-run', action='store_true', help='Report the size reduction without writing')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  Compact match_events")
+    print("=" * 60)
+
+    if not match_events_exists():
+        print("[SKIP] match_events does not exist (dropped by migration 006), nothing to compact")
+        return
+
+    compacted = 0
+    bytes_before = 0
+    bytes_after = 0
+    last_id = 0
+
+    while True:
+        rows = fetch_batch(last_id, args.batch_size)
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+
+        lean_rows = [compact_row(row, not args.no_damage_summary) for row in rows]
+        bytes_before += sum(len(json.dumps(row['event_data'])) for row in rows)
+        bytes_after += sum(len(json.dumps(row['damage_summary'])) for row in lean_rows if row['damage_summary'])
+
+        if not args.dry_run:
+            try:
+                supabase.table('match_events').upsert(lean_rows, on_conflict='id').execute()
+            except Exception as e:
+                print(f"[ERROR] Batch ending at id {last_id} failed: {e}")
+                raise
+
+        compacted += len(rows)
+        print(f"  {compacted} rows compacted (up to id {last_id})")
+
+    if compacted == 0:
+        print("[OK] No rows left with event_data")
+        return
+
+    print(f"\n[OK] {compacted} rows {'would be ' if args.dry_run else ''}compacted")
+    print(f"  event_data JSON: {bytes_before / 1024 / 1024:.1f} MB -> damage_summary: {bytes_after / 1024 / 1024:.1f} MB")
+    if not args.dry_run:
+        print("[INFO] Run VACUUM FULL match_events in the SQL editor to reclaim the space")
+
+
+if __name__ == "__main__":
+    main()
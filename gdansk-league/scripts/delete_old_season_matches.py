@@ -5,30 +5,22 @@ Keep only Season 15 (2025) matches
 import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
-import requests
-import time
+from riot_api import CONTINENT, riot_get
 
 load_dotenv()
 
-RIOT_API_KEY = os.getenv('RIOT_API_KEY')
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-MATCH_V5_BASE = 'https://europe.api.riotgames.com'
-
 def get_match_version(match_id: str) -> str:
     """Get game version for a match"""
-    url = f'{MATCH_V5_BASE}/lol/match/v5/matches/{match_id}'
-    headers = {'X-Riot-Token': RIOT_API_KEY}
-
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        data = response.json()
+    data = riot_get(CONTINENT, f'/lol/match/v5/matches/{match_id}')
+    if data:
         return data['info']['gameVersion']
     else:
-        print(f'[WARN] Could not fetch match {match_id}: {response.status_code}')
+        print(f'[WARN] Could not fetch match {match_id}')
         return None
 
 def main():
@@ -56,9 +48,6 @@ def main():
                 current_season_matches.append(match_id)
                 print(f'{i}/{len(all_match_ids)} - {match_id} - Version {version} [CURRENT SEASON - KEEP]')
 
-        # Rate limiting
-        time.sleep(0.5)
-
     print(f'\n{"="*60}')
     print(f'Summary:')
     print(f'  Old season matches (to delete): {len(old_season_matches)}')
@@ -0,0 +1,341 @@
+"""
+Player discovery crawler over co-participants
+Grows the roster breadth-first from the tracked players: a frontier player's recent ranked
+matches are fetched and every co-participant is recorded in discovery_candidates with
+their Riot ID and how often they played on the same team as the frontier player. Players
+that look local (Gdańsk-area tag line or name, or repeated co-play) join the frontier in
+turn. Crawled match IDs and known PUUIDs go into a Bloom filter kept on disk, so a match
+is never fetched twice and known players are never re-queued; discovery_candidates and
+discovery_crawled_matches are the exact persisted sets behind it, and filter hits are checked
+against them (one batched query per table) so a false positive never hides a new match or
+player. The filter is saved after
+every expansion, and co-play is only counted for matches the database has not recorded yet,
+so a killed crawl never counts a match twice.
+
+The crawler is a low-priority quota consumer: it stops after --max-requests and pauses
+whenever the shared quota ledger (riot_quota.py) shows the match host is busy.
+
+Usage: python discover_players.py [--max-requests 300] [--depth 2]
+       python discover_players.py --promote    # append likely-local players to player_names.txt
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from dotenv import load_dotenv
+from supabase import create_client, Client
+
+from collect_players import PLAYER_NAMES_FILE, read_player_names
+from riot_api import CONTINENT, RiotAPIError, get_match_details, get_match_history
+from riot_quota import APP_RATE_LIMITS, get_usage
+
+# Load environment variables
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')
+
+# Initialize Supabase client
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Bloom filter of crawled match IDs and known PUUIDs
+BLOOM_FILE = '../data/discovery_seen.bloom'
+BLOOM_CAPACITY = 2_000_000
+BLOOM_ERROR_RATE = 0.001
+
+# Ranked matches fetched per frontier player
+MATCHES_PER_EXPANSION = 10
+
+# Frontier depth: 0 = tracked players, 1 = their co-participants, ...
+DEFAULT_MAX_DEPTH = 2
+
+# Local-player heuristics (tag lines / name fragments are matched case-insensitively)
+LOCAL_TAG_LINES = {
+    tag.strip().upper() for tag in os.getenv('DISCOVERY_LOCAL_TAGS', 'GDA,GDN,GDY,SOP,3CITY,TRJ').split(',')
+    if tag.strip()
+}
+LOCAL_NAME_HINTS = ('gdansk', 'gdańsk', 'gdynia', 'sopot', 'trojmiasto', 'trójmiasto', '3city', 'lechia', 'arka')
+# Same-team games with local players that mark a player as likely local on their own
+MIN_CO_PLAY = 2
+
+# The crawler backs off while the match host has used this share of any app window
+QUOTA_SHARE = 0.5
+QUOTA_BACKOFF_SECONDS = 30
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter (double hashing over one blake2b digest), persisted as raw bits"""
+
+    def __init__(self, capacity: int = BLOOM_CAPACITY, error_rate: float = BLOOM_ERROR_RATE):
+        self.size = int(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.bits.tofile(path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['BloomFilter']:
+        """Filter saved at path, or None if missing or saved with different parameters"""
+        bloom = cls()
+        if not os.path.exists(path) or os.path.getsize(path) != bloom.bits.nbytes:
+            return None
+        bloom.bits = np.fromfile(path, dtype=np.uint8)
+        return bloom
+
+
+def is_local_riot_id(game_name: Optional[str], tag_line: Optional[str]) -> bool:
+    """Tag line or name suggests a Gdańsk-area player"""
+    if tag_line and tag_line.upper() in LOCAL_TAG_LINES:
+        return True
+    name = (game_name or '').lower()
+    return any(hint in name for hint in LOCAL_NAME_HINTS)
+
+
+def is_likely_local(candidate: Dict) -> bool:
+    """discovery_candidates row passes the local-player heuristics"""
+    return bool(candidate.get('local_hint')) or (candidate.get('co_play') or 0) >= MIN_CO_PLAY
+
+
+def quota_busy() -> bool:
+    """Match host has used at least QUOTA_SHARE of an application window"""
+    usage = get_usage().get(CONTINENT, {})
+    return any(usage.get(f"{limit}:{window}", 0) >= limit * QUOTA_SHARE for limit, window in APP_RATE_LIMITS)
+
+
+def _fetch_all(query_builder) -> List[Dict]:
+    """All rows of a PostgREST query, 1000 at a time"""
+    rows, start = [], 0
+    while True:
+        batch = query_builder().range(start, start + 999).execute().data or []
+        rows.extend(batch)
+        if len(batch) < 1000:
+            return rows
+        start += 1000
+
+
+def load_seen_filter() -> BloomFilter:
+    """Bloom filter from disk, or rebuilt from discovery_candidates and discovery_crawled_matches"""
+    bloom = BloomFilter.load(BLOOM_FILE)
+    if bloom:
+        return bloom
+    bloom = BloomFilter()
+    rows = _fetch_all(lambda: supabase.table('discovery_candidates').select('puuid').order('puuid'))
+    for row in rows:
+        bloom.add(row['puuid'])
+    matches = _fetch_all(lambda: supabase.table('discovery_crawled_matches').select('match_id').order('match_id'))
+    for row in matches:
+        bloom.add(row['match_id'])
+    print(f"[INFO] Rebuilt seen filter from {len(rows)} candidates and {len(matches)} crawled matches")
+    return bloom
+
+
+def confirm_seen(table: str, column: str, keys: Iterable[str], seen: BloomFilter) -> Set[str]:
+    """
+    Keys that are really recorded, out of those the Bloom filter reports as seen
+
+    Args:
+        table: Persisted set behind the filter (discovery_candidates, discovery_crawled_matches)
+        column: Key column of the table
+        keys: Keys to check
+        seen: Crawled match IDs and known PUUIDs
+
+    Returns:
+        Filter hits found in the table; hits missing from it were false positives
+    """
+    hits = [key for key in keys if key in seen]
+    recorded = set()
+    for start in range(0, len(hits), 200):
+        result = supabase.table(table).select(column).in_(column, hits[start:start + 200]).execute()
+        recorded.update(row[column] for row in (result.data or []))
+    return recorded
+
+
+def seed_frontier(tracked: Dict[str, str], seen: BloomFilter):
+    """Add tracked players the crawler has not seen yet as depth-0 frontier entries"""
+    known = confirm_seen('discovery_candidates', 'puuid', tracked, seen)
+    new = [
+        {'puuid': puuid, 'game_name': name, 'tag_line': None, 'depth': 0, 'co_play': 0,
+         'local_hint': True, 'discovered_from': None}
+        for puuid, name in tracked.items() if puuid not in known
+    ]
+    if new:
+        supabase.rpc('record_discovery_candidates', {'p_candidates': new}).execute()
+        for row in new:
+            seen.add(row['puuid'])
+        print(f"[OK] Seeded {len(new)} tracked players")
+
+
+def next_frontier(max_depth: int, limit: int) -> List[Dict]:
+    """Pending candidates to expand, breadth-first and most co-play first within a depth"""
+    # Same condition as is_likely_local (tracked players are seeded with local_hint)
+    result = supabase.table('discovery_candidates').select('*') \
+        .eq('status', 'pending').lt('depth', max_depth) \
+        .or_(f'local_hint.is.true,co_play.gte.{MIN_CO_PLAY}') \
+        .order('depth').order('co_play', desc=True).limit(limit).execute()
+    return result.data or []
+
+
+def expand(candidate: Dict, seen: BloomFilter) -> int:
+    """
+    Record the co-participants of a frontier player's recent ranked matches
+
+    Args:
+        candidate: discovery_candidates row
+        seen: Crawled match IDs and known PUUIDs (updated in place)
+
+    Returns:
+        Number of Riot API requests made
+    """
+    match_ids = get_match_history(candidate['puuid'], count=MATCHES_PER_EXPANSION, queue_type=420) or []
+    requests_made = 1
+    encounters: Dict[str, Dict] = {}
+    crawled = []
+    crawled_before = confirm_seen('discovery_crawled_matches', 'match_id', match_ids, seen)
+    for match_id in match_ids:
+        if match_id in crawled_before:
+            continue
+        match_data = get_match_details(match_id)
+        requests_made += 1
+        seen.add(match_id)
+        if not match_data:
+            continue
+        crawled.append(match_id)
+        participants = match_data['info']['participants']
+        team = next((p['teamId'] for p in participants if p['puuid'] == candidate['puuid']), None)
+        for participant in participants:
+            puuid = participant['puuid']
+            if puuid == candidate['puuid']:
+                continue
+            entry = encounters.setdefault(puuid, {
+                'puuid': puuid,
+                'game_name': participant.get('riotIdGameName'),
+                'tag_line': participant.get('riotIdTagline'),
+                'depth': candidate['depth'] + 1,
+                'co_play': 0,
+                'co_play_matches': [],
+                'local_hint': is_local_riot_id(participant.get('riotIdGameName'), participant.get('riotIdTagline')),
+                'discovered_from': candidate['puuid'],
+            })
+            if participant['teamId'] == team:
+                entry['co_play'] += 1
+                entry['co_play_matches'].append(match_id)
+
+    # Known players only matter for their co-play count with this player
+    known = confirm_seen('discovery_candidates', 'puuid', encounters, seen)
+    rows = [entry for entry in encounters.values() if entry['puuid'] not in known or entry['co_play']]
+    if rows or crawled:
+        supabase.rpc('record_discovery_candidates', {'p_candidates': rows, 'p_match_ids': crawled}).execute()
+    for puuid in encounters:
+        seen.add(puuid)
+
+    supabase.table('discovery_candidates').update({
+        'status': 'expanded',
+        'expanded_at': datetime.now(timezone.utc).isoformat()
+    }).eq('puuid', candidate['puuid']).execute()
+    new_local = sum(1 for entry in rows if is_likely_local(entry))
+    print(f"  [OK] {len(match_ids)} matches, {len(encounters)} co-participants ({new_local} likely local)")
+    return requests_made
+
+
+def crawl(max_requests: int, max_depth: int):
+    """Expand the frontier until the request budget or the frontier runs out"""
+    tracked = {
+        row['puuid']: row['summoner_name']
+        for row in _fetch_all(lambda: supabase.table('players').select('puuid, summoner_name')
+                              .not_.is_('puuid', 'null').order('puuid'))
+    }
+    seen = load_seen_filter()
+    seed_frontier(tracked, seen)
+
+    requests_made = 0
+    expanded = 0
+    try:
+        while requests_made + 1 + MATCHES_PER_EXPANSION <= max_requests:
+            frontier = next_frontier(max_depth, limit=10)
+            if not frontier:
+                print("[INFO] Frontier exhausted")
+                break
+            for candidate in frontier:
+                if requests_made + 1 + MATCHES_PER_EXPANSION > max_requests:
+                    break
+                while quota_busy():
+                    print(f"[INFO] Match host busy, waiting {QUOTA_BACKOFF_SECONDS}s")
+                    time.sleep(QUOTA_BACKOFF_SECONDS)
+                name = f"{candidate.get('game_name')}#{candidate.get('tag_line')}" if candidate.get('tag_line') \
+                    else candidate.get('game_name')
+                print(f"[depth {candidate['depth']}] {name}")
+                requests_made += expand(candidate, seen)
+                expanded += 1
+                seen.save(BLOOM_FILE)
+    except RiotAPIError as e:
+        print(f"[ERROR] {e}")
+    finally:
+        seen.save(BLOOM_FILE)
+
+    print(f"\n[OK] {expanded} players expanded with {requests_made} requests")
+
+
+def promote(names_file: str = PLAYER_NAMES_FILE):
+    """Append likely-local, not yet listed candidates to the roster file as Riot IDs"""
+    listed = {name.lower() for name in read_player_names(names_file)}
+    tracked = {row['puuid'] for row in _fetch_all(lambda: supabase.table('players').select('puuid').order('puuid'))}
+    candidates = _fetch_all(lambda: supabase.table('discovery_candidates').select('*')
+                            .neq('status', 'promoted').gt('depth', 0).order('puuid'))
+
+    promoted = []
+    for candidate in candidates:
+        if candidate['puuid'] in tracked or not candidate.get('tag_line') or not is_likely_local(candidate):
+            continue
+        riot_id = f"{candidate['game_name']}#{candidate['tag_line']}"
+        if riot_id.lower() not in listed:
+            promoted.append((candidate['puuid'], riot_id))
+
+    if not promoted:
+        print("[INFO] No new likely-local players")
+        return
+    with open(names_file, 'a', encoding='utf-8') as f:
+        f.write("\n# Discovered by discover_players.py\n")
+        for _, riot_id in promoted:
+            f.write(f"{riot_id}\n")
+    puuids = [puuid for puuid, _ in promoted]
+    for start in range(0, len(puuids), 200):
+        supabase.table('discovery_candidates').update({'status': 'promoted'}) \
+            .in_('puuid', puuids[start:start + 200]).execute()
+    print(f"[OK] Added {len(promoted)} players to {names_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Discover local players from co-participants')
+    parser.add_argument('--max-requests', type=int, default=300, help='Riot API requests for this run')
+    parser.add_argument('--depth', type=int, default=DEFAULT_MAX_DEPTH, help='Frontier depth limit')
+    parser.add_argument('--promote', action='store_true', help='Append likely-local players to the roster file')
+    args = parser.parse_args()
+
+    if args.promote:
+        promote()
+    else:
+        crawl(args.max_requests, args.depth)
+
+
+if __name__ == "__main__":
+    main()
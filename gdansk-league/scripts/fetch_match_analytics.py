@@ -4,80 +4,62 @@ Usage: python fetch_match_analytics.py
 """
 
 import os
-import time
-import requests
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from riot_api import CONTINENT, riot_get
+from timeline_parser import parse_timeline
 
 # Load environment variables
 load_dotenv()
 
-RIOT_API_KEY = os.getenv('RIOT_API_KEY')
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')
 
 # Initialize Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Riot API endpoints
-ACCOUNT_V1_BASE = "https://europe.api.riotgames.com"
-MATCH_V5_BASE = "https://europe.api.riotgames.com"
-
 def get_puuid(game_name: str, tag_line: str) -> str:
     """Get PUUID from Riot ID"""
-    url = f"{ACCOUNT_V1_BASE}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-    headers = {"X-Riot-Token": RIOT_API_KEY}
-
     print(f"Fetching PUUID for {game_name}#{tag_line}...")
-    response = requests.get(url, headers=headers)
+    data = riot_get(CONTINENT, f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}")
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to get PUUID: {response.status_code} - {response.text}")
+    if data is None:
+        raise Exception(f"Failed to get PUUID for {game_name}#{tag_line}")
 
-    data = response.json()
     puuid = data['puuid']
     print(f"[OK] Found PUUID: {puuid}")
     return puuid
 
 def get_match_ids(puuid: str, count: int = 100) -> list:
     """Get recent match IDs for a player"""
-    url = f"{MATCH_V5_BASE}/lol/match/v5/matches/by-puuid/{puuid}/ids"
     params = {"start": 0, "count": count}
-    headers = {"X-Riot-Token": RIOT_API_KEY}
 
     print(f"Fetching up to {count} match IDs...")
-    response = requests.get(url, headers=headers, params=params)
+    match_ids = riot_get(CONTINENT, f"/lol/match/v5/matches/by-puuid/{puuid}/ids", params=params)
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to get match IDs: {response.status_code} - {response.text}")
+    if match_ids is None:
+        raise Exception(f"Failed to get match IDs for {puuid}")
 
-    match_ids = response.json()
     print(f"[OK] Found {len(match_ids)} matches")
     return match_ids
 
 def get_match_data(match_id: str) -> dict:
     """Get match data (for participant mapping)"""
-    url = f"{MATCH_V5_BASE}/lol/match/v5/matches/{match_id}"
-    headers = {"X-Riot-Token": RIOT_API_KEY}
-
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(f"Failed to get match data: {response.status_code}")
+    match_data = riot_get(CONTINENT, f"/lol/match/v5/matches/{match_id}")
+    if match_data is None:
+        raise Exception(f"Failed to get match data for {match_id}")
 
-    return response.json()
+    return match_data
 
 def get_match_timeline(match_id: str) -> dict:
     """Get timeline data for a specific match"""
-    url = f"{MATCH_V5_BASE}/lol/match/v5/matches/{match_id}/timeline"
-    headers = {"X-Riot-Token": RIOT_API_KEY}
-
     print(f"Fetching timeline for match {match_id}...")
-    response = requests.get(url, headers=headers)
+    # Only the fields and events the analytics read are decoded
+    timeline = riot_get(CONTINENT, f"/lol/match/v5/matches/{match_id}/timeline", decoder=parse_timeline)
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to get timeline: {response.status_code} - {response.text}")
+    if timeline is None:
+        raise Exception(f"Failed to get timeline for {match_id}")
 
-    timeline = response.json()
     print(f"[OK] Timeline fetched")
     return timeline
 
@@ -410,11 +392,6 @@ def main():
 
             print(f"[OK] Match {match_id} processed\n")
 
-            # Rate limiting
-            if i < len(match_ids):
-                print("Waiting 1 second...")
-                time.sleep(1)
-
         print(f"\n{'='*60}")
         print(f"[OK] ALL DONE! Processed {len(match_ids)} matches")
         print(f"{'='*60}")
@@ -1,18 +1,20 @@
 """
 Fetch match timeline data for a player and store in match_events and match_timeline_snapshots tables
+(plus the compact per-match tracks in match_position_tracks)
 Usage: python fetch_match_timeline.py
 """
 
 import os
-import time
-import requests
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from riot_api import CONTINENT, riot_get
+from match_processing import build_match_event_rows, build_timeline_snapshot_rows
+from timeline_parser import parse_timeline
+from position_tracks import build_position_tracks_row
 
 # Load environment variables
 load_dotenv()
 
-RIOT_API_KEY = os.getenv('RIOT_API_KEY')
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 # Use service role key for bypassing RLS (server-side only, never expose to frontend)
 SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')
@@ -20,106 +22,50 @@ SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANO
 # Initialize Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Riot API endpoints
-ACCOUNT_V1_BASE = "https://europe.api.riotgames.com"
-MATCH_V5_BASE = "https://europe.api.riotgames.com"
+# match_events storage: 'lean' (typed columns + damage summary) or 'full' (also raw event JSONB)
+MATCH_EVENTS_STORAGE = os.getenv('MATCH_EVENTS_STORAGE', 'lean')
 
 def get_puuid(game_name: str, tag_line: str) -> str:
     """Get PUUID from Riot ID (game name + tag line)"""
-    url = f"{ACCOUNT_V1_BASE}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-    headers = {"X-Riot-Token": RIOT_API_KEY}
-
     print(f"Fetching PUUID for {game_name}#{tag_line}...")
-    response = requests.get(url, headers=headers)
+    data = riot_get(CONTINENT, f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}")
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to get PUUID: {response.status_code} - {response.text}")
+    if data is None:
+        raise Exception(f"Failed to get PUUID for {game_name}#{tag_line}")
 
-    data = response.json()
     puuid = data['puuid']
     print(f"[OK] Found PUUID: {puuid}")
     return puuid
 
 def get_match_ids(puuid: str, count: int = 3) -> list:
     """Get recent match IDs for a player"""
-    url = f"{MATCH_V5_BASE}/lol/match/v5/matches/by-puuid/{puuid}/ids"
     params = {"start": 0, "count": count}
-    headers = {"X-Riot-Token": RIOT_API_KEY}
 
     print(f"Fetching last {count} match IDs...")
-    response = requests.get(url, headers=headers, params=params)
+    match_ids = riot_get(CONTINENT, f"/lol/match/v5/matches/by-puuid/{puuid}/ids", params=params)
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to get match IDs: {response.status_code} - {response.text}")
+    if match_ids is None:
+        raise Exception(f"Failed to get match IDs for {puuid}")
 
-    match_ids = response.json()
     print(f"[OK] Found {len(match_ids)} matches: {match_ids}")
     return match_ids
 
 def get_match_timeline(match_id: str) -> dict:
     """Get timeline data for a specific match"""
-    url = f"{MATCH_V5_BASE}/lol/match/v5/matches/{match_id}/timeline"
-    headers = {"X-Riot-Token": RIOT_API_KEY}
-
     print(f"Fetching timeline for match {match_id}...")
-    response = requests.get(url, headers=headers)
+    # Kill/building/monster events plus frame stats are all that gets stored
+    timeline = riot_get(CONTINENT, f"/lol/match/v5/matches/{match_id}/timeline",
+                        decoder=lambda content: parse_timeline(content, include_stats=True))
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to get timeline: {response.status_code} - {response.text}")
+    if timeline is None:
+        raise Exception(f"Failed to get timeline for {match_id}")
 
-    timeline = response.json()
     print(f"[OK] Timeline fetched successfully")
     return timeline
 
 def store_match_events(match_id: str, timeline: dict):
     """Extract and store match events from timeline"""
-    events_to_insert = []
-
-    # Process all frames to extract events
-    for frame in timeline['info']['frames']:
-        if 'events' not in frame:
-            continue
-
-        for event in frame['events']:
-            event_type = event.get('type')
-
-            # We're interested in: CHAMPION_KILL, BUILDING_KILL, ELITE_MONSTER_KILL
-            if event_type not in ['CHAMPION_KILL', 'BUILDING_KILL', 'ELITE_MONSTER_KILL']:
-                continue
-
-            # Extract common fields
-            event_data = {
-                'match_id': match_id,
-                'timestamp_ms': event.get('timestamp'),
-                'event_type': event_type,
-                'event_data': event  # Store full event as JSONB
-            }
-
-            # Extract position if available
-            if 'position' in event:
-                event_data['position_x'] = event['position'].get('x')
-                event_data['position_y'] = event['position'].get('y')
-
-            # Extract participants based on event type
-            if event_type == 'CHAMPION_KILL':
-                event_data['killer_id'] = event.get('killerId')
-                event_data['victim_id'] = event.get('victimId')
-                event_data['participant_id'] = event.get('killerId')
-
-                # Store assisting participants as array
-                assisting = event.get('assistingParticipantIds', [])
-                if assisting:
-                    event_data['assisting_participant_ids'] = assisting
-
-            elif event_type == 'BUILDING_KILL':
-                event_data['killer_id'] = event.get('killerId')
-                event_data['participant_id'] = event.get('killerId')
-
-            elif event_type == 'ELITE_MONSTER_KILL':
-                event_data['killer_id'] = event.get('killerId')
-                event_data['participant_id'] = event.get('killerId')
-
-            events_to_insert.append(event_data)
+    events_to_insert = build_match_event_rows(match_id, timeline, storage=MATCH_EVENTS_STORAGE)
 
     # Insert into Supabase
     if events_to_insert:
@@ -131,43 +77,7 @@ def store_match_events(match_id: str, timeline: dict):
 
 def store_timeline_snapshots(match_id: str, timeline: dict):
     """Extract and store timeline snapshots from frames"""
-    snapshots_to_insert = []
-
-    # Process frames (typically every 60 seconds)
-    for frame in timeline['info']['frames']:
-        timestamp_ms = frame['timestamp']
-
-        # Skip frame 0 (game start has no meaningful position data)
-        if timestamp_ms == 0:
-            continue
-
-        # Extract participant frames
-        participant_frames = frame.get('participantFrames', {})
-
-        for participant_id_str, participant_data in participant_frames.items():
-            participant_id = int(participant_id_str)
-
-            # Extract position
-            position = participant_data.get('position', {})
-            if not position or position.get('x') is None:
-                continue  # Skip if no position data
-
-            snapshot_data = {
-                'match_id': match_id,
-                'participant_id': participant_id,
-                'timestamp_ms': timestamp_ms,
-                'position_x': position.get('x'),
-                'position_y': position.get('y'),
-                'level': participant_data.get('level'),
-                'total_gold': participant_data.get('totalGold'),
-                'current_gold': participant_data.get('currentGold'),
-                'xp': participant_data.get('xp'),
-                'minions_killed': participant_data.get('minionsKilled'),
-                'jungle_minions_killed': participant_data.get('jungleMinionsKilled'),
-                'stats': participant_data.get('championStats', {})  # Store as JSONB
-            }
-
-            snapshots_to_insert.append(snapshot_data)
+    snapshots_to_insert = build_timeline_snapshot_rows(match_id, timeline)
 
     # Insert into Supabase
     if snapshots_to_insert:
@@ -177,6 +87,12 @@ def store_timeline_snapshots(match_id: str, timeline: dict):
     else:
         print("[WARN] No snapshots found to store")
 
+def store_position_tracks(match_id: str, timeline: dict):
+    """Store every frame of all participants as one delta-encoded blob"""
+    row = build_position_tracks_row(match_id, timeline)
+    supabase.table('match_position_tracks').upsert(row, on_conflict='match_id').execute()
+    print(f"[OK] Stored position tracks ({row['frame_count']} frames, {len(row['tracks']) // 2 - 1} bytes)")
+
 def main():
     """Main function to fetch and store timeline data"""
     try:
@@ -201,12 +117,10 @@ def main():
             # Store snapshots
             store_timeline_snapshots(match_id, timeline)
 
-            print(f"[OK] Match {match_id} processed successfully\n")
+            # Store full-resolution tracks
+            store_position_tracks(match_id, timeline)
 
-            # Rate limiting: wait 1 second between requests
-            if i < len(match_ids):
-                print("Waiting 1 second before next match...")
-                time.sleep(1)
+            print(f"[OK] Match {match_id} processed successfully\n")
 
         print(f"\n{'='*60}")
         print(f"[OK] ALL DONE! Processed {len(match_ids)} matches")
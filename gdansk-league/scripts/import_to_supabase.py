@@ -44,6 +44,7 @@ def read_csv_data(file_path: str) -> list:
                 'wins': int(row['wins']),
                 'losses': int(row['losses']),
                 'winrate': float(row['winrate']),
+                'summoner_revision_date': int(row['summoner_revision_date']) if row.get('summoner_revision_date') else None,
                 'last_fetched_at': row.get('collected_at', datetime.now().isoformat())
             }
             players.append(player)
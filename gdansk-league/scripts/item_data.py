@@ -0,0 +1,79 @@
+"""
+Completed-item sets per patch from Riot Data Dragon
+A completed item is one that builds from components and into nothing else (legendaries,
+transformed items like Muramana); boots are left out. item.json is fetched once per patch and
+kept under ITEM_CACHE_DIR, so ingest only needs Data Dragon the first time a patch is seen.
+
+Usage:
+    from item_data import completed_items
+    completed = completed_items(match_data['info']['gameVersion'])   # frozenset or None
+"""
+
+import json
+import os
+from typing import Dict, FrozenSet, Optional
+
+import requests
+
+VERSION_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
+ITEM_DATA_URL = "https://ddragon.leagueoflegends.com/cdn/{version}/data/en_US/item.json"
+
+ITEM_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'ddragon')
+
+# patch ('15.21') -> completed item IDs, None when Data Dragon could not be read
+_completed: Dict[str, Optional[FrozenSet[int]]] = {}
+
+
+def completed_from_item_data(items: Dict) -> FrozenSet[int]:
+    """
+    Completed item IDs of a Data Dragon item.json
+
+    Args:
+        items: Parsed item.json
+
+    Returns:
+        IDs of items with components ('from') and no upgrades ('into'), boots excluded
+    """
+    return frozenset(
+        int(item_id) for item_id, item in items['data'].items()
+        if item.get('from') and not item.get('into') and 'Boots' not in item.get('tags', [])
+    )
+
+
+def _ddragon_version(patch: str) -> str:
+    """Data Dragon version of a patch ('15.21' -> '15.21.1')"""
+    versions = requests.get(VERSION_URL, timeout=10).json()
+    return next((version for version in versions if version.startswith(f"{patch}.")), versions[0])
+
+
+def completed_items(game_version: str) -> Optional[FrozenSet[int]]:
+    """
+    Completed item IDs of a match's patch
+
+    Args:
+        game_version: Match-v5 info.gameVersion ('15.21.721.8442')
+
+    Returns:
+        frozenset of item IDs, or None when the patch's item data is neither cached nor reachable
+    """
+    patch = '.'.join(game_version.split('.')[:2])
+    if patch in _completed:
+        return _completed[patch]
+
+    cache_file = os.path.join(ITEM_CACHE_DIR, f"items_{patch}.json")
+    try:
+        if os.path.exists(cache_file):
+            with open(cache_file, encoding='utf-8') as f:
+                items = json.load(f)
+        else:
+            response = requests.get(ITEM_DATA_URL.format(version=_ddragon_version(patch)), timeout=10)
+            response.raise_for_status()
+            items = response.json()
+            os.makedirs(ITEM_CACHE_DIR, exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump(items, f)
+        _completed[patch] = completed_from_item_data(items)
+    except (requests.RequestException, OSError, ValueError, KeyError) as e:
+        print(f"  [WARN] No item data for patch {patch}, build paths left empty: {e}")
+        _completed[patch] = None
+    return _completed[patch]
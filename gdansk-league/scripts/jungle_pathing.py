@@ -0,0 +1,195 @@
+"""
+Jungle pathing reconstruction from per-minute frames
+Turns junglers' frame positions and jungleMinionsKilled deltas into the ordered camps they
+cleared and their gank attempts (a visit to a lane with an enemy champion nearby). Everything is
+computed on (junglers x frames) arrays with the map_zones rasters, so a whole batch of
+junglers is classified at once.
+
+Usage:
+    from jungle_pathing import reconstruct_jungle_paths
+    python jungle_pathing.py [match.json timeline.json]    # print the sample match's paths
+"""
+
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from map_zones import (BLUE_JUNGLE, CAMP_CODES, CAMPS, LANE_ZONES, NO_CAMP, RED_JUNGLE, RIVER,
+                       TOP_LANE, MID_LANE, BOT_LANE, UNKNOWN, camp_at, zone_at)
+
+# The path covers the early game only (first clears, early rotations)
+PATH_END_MS = 15 * 60 * 1000
+
+# A lane visit is a gank attempt when an enemy champion is this close on one of its frames
+# (within the gank window)
+GANK_RADIUS = 2000
+GANK_START_MS = 150000
+GANK_END_MS = 20 * 60 * 1000
+
+# A gank succeeded if the jungler took part in a kill this long before/after the frame
+GANK_KILL_BEFORE_MS = 60000
+GANK_KILL_AFTER_MS = 30000
+
+LANE_NAMES = {TOP_LANE: 'top', MID_LANE: 'mid', BOT_LANE: 'bot'}
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend', 'scripts')
+
+
+def camp_token(camp_index: int, team_id: int) -> str:
+    """Path token of a camp from the jungler's side: own camps upper case, enemy camps lower case"""
+    code = CAMP_CODES[camp_index]
+    owner = CAMPS[code][0]
+    if owner == 0:
+        return code[:2]
+    return code[:2] if owner == team_id else code[:2].lower()
+
+
+def reconstruct_jungle_paths(xs: np.ndarray, ys: np.ndarray, jungle_cs: np.ndarray, valid: np.ndarray,
+                             timestamps: np.ndarray, team_ids: np.ndarray,
+                             enemy_xs: np.ndarray, enemy_ys: np.ndarray,
+                             kill_times: Sequence[Sequence[int]]) -> List[Dict]:
+    """
+    Pathing summaries for a batch of junglers
+
+    Args:
+        xs, ys: (J, F) jungler positions per frame
+        jungle_cs: (J, F) cumulative jungleMinionsKilled
+        valid: (J, F) frames that exist (batches of matches are padded to the longest)
+        timestamps: (J, F) frame timestamps in ms
+        team_ids: (J,) 100/200
+        enemy_xs, enemy_ys: (J, E, F) positions of each jungler's enemies (NaN if unknown)
+        kill_times: Per jungler, timestamps of champion kills they killed or assisted in
+
+    Returns:
+        Per jungler: path ('RE>KR>RA>...' up to PATH_END_MS), ganks ([[timestamp, lane, success]]),
+        gank_count, successful_ganks, first_gank_ms, ganks_top/mid/bot and the share of frames
+        in own jungle, enemy jungle, river and lanes
+    """
+    zones = np.where(valid, zone_at(xs, ys), UNKNOWN)
+    camps = np.where(valid, camp_at(xs, ys), NO_CAMP)
+
+    cleared = np.diff(jungle_cs, axis=1, prepend=0) > 0
+    path_frames = cleared & (camps != NO_CAMP) & (timestamps <= PATH_END_MS)
+
+    # Consecutive frames in the same lane form one visit; visit_ids numbers them per jungler
+    in_lane = np.isin(zones, LANE_ZONES)
+    previous_zones = np.concatenate([np.full((len(zones), 1), UNKNOWN), zones[:, :-1]], axis=1)
+    visit_ids = np.cumsum(in_lane & (zones != previous_zones), axis=1)
+    enemy_distance = np.hypot(enemy_xs - xs[:, None, :], enemy_ys - ys[:, None, :])
+    enemy_near = np.nan_to_num(enemy_distance, nan=np.inf).min(axis=1) <= GANK_RADIUS
+    gank_frames = in_lane & enemy_near & (timestamps >= GANK_START_MS) & (timestamps <= GANK_END_MS) & valid
+
+    own_jungle = np.where(team_ids[:, None] == 100, BLUE_JUNGLE, RED_JUNGLE)
+    enemy_jungle = np.where(team_ids[:, None] == 100, RED_JUNGLE, BLUE_JUNGLE)
+    frame_counts = np.maximum(valid.sum(axis=1), 1)
+    shares = {
+        'own_jungle_share': (zones == own_jungle).sum(axis=1) / frame_counts,
+        'enemy_jungle_share': (zones == enemy_jungle).sum(axis=1) / frame_counts,
+        'river_share': (zones == RIVER).sum(axis=1) / frame_counts,
+        'lane_share': np.isin(zones, LANE_ZONES).sum(axis=1) / frame_counts,
+    }
+
+    summaries = []
+    for jungler in range(len(xs)):
+        team_id = int(team_ids[jungler])
+        tokens = []
+        for camp in camps[jungler, path_frames[jungler]]:
+            token = camp_token(int(camp), team_id)
+            if not tokens or tokens[-1] != token:
+                tokens.append(token)
+
+        kills = np.asarray(kill_times[jungler], dtype=np.int64)
+        ganks = []
+        last_visit = None
+        for frame in np.flatnonzero(gank_frames[jungler]):
+            # One gank per lane visit, timed at its first frame with an enemy nearby
+            if visit_ids[jungler, frame] == last_visit:
+                continue
+            last_visit = visit_ids[jungler, frame]
+            timestamp = int(timestamps[jungler, frame])
+            success = bool(((kills > timestamp - GANK_KILL_BEFORE_MS) & (kills <= timestamp + GANK_KILL_AFTER_MS)).any())
+            ganks.append([timestamp, LANE_NAMES[int(zones[jungler, frame])], success])
+
+        summary = {
+            'path': '>'.join(tokens) or None,
+            'ganks': ganks,
+            'gank_count': len(ganks),
+            'successful_ganks': sum(1 for gank in ganks if gank[2]),
+            'first_gank_ms': ganks[0][0] if ganks else None,
+        }
+        for lane in LANE_NAMES.values():
+            summary[f'ganks_{lane}'] = sum(1 for gank in ganks if gank[1] == lane)
+        for name, values in shares.items():
+            summary[name] = round(float(values[jungler]), 3)
+        summaries.append(summary)
+    return summaries
+
+
+def paths_for_match(match_data: dict, timeline: dict, kills: Optional[List[Dict]] = None) -> Dict[int, Dict]:
+    """
+    Pathing summaries for the junglers (teamPosition JUNGLE) of one match
+
+    Args:
+        match_data: Match-v5 match document
+        timeline: Match-v5 timeline document
+        kills: CHAMPION_KILL events (read from the timeline when not given)
+
+    Returns:
+        {participant_id: summary}
+    """
+    participants = match_data['info']['participants']
+    junglers = [p for p in participants if p.get('teamPosition') == 'JUNGLE']
+    if not junglers:
+        return {}
+
+    frames = timeline['info']['frames']
+    if kills is None:
+        kills = [event for frame in frames for event in frame.get('events', []) if event.get('type') == 'CHAMPION_KILL']
+
+    participant_ids = [p['participantId'] for p in participants]
+    positions = np.full((len(participant_ids), len(frames), 2), np.nan)
+    jungle_cs = np.zeros((len(participant_ids), len(frames)))
+    for f, frame in enumerate(frames):
+        participant_frames = frame.get('participantFrames', {})
+        for p, participant_id in enumerate(participant_ids):
+            participant_frame = participant_frames.get(str(participant_id))
+            if not participant_frame:
+                continue
+            position = participant_frame.get('position') or {}
+            if position.get('x') is not None:
+                positions[p, f] = (position['x'], position['y'])
+            jungle_cs[p, f] = participant_frame.get('jungleMinionsKilled', 0)
+
+    rows = [participant_ids.index(j['participantId']) for j in junglers]
+    team_ids = np.array([j['teamId'] for j in junglers])
+    enemy_rows = [[i for i, p in enumerate(participants) if p['teamId'] != j['teamId']] for j in junglers]
+    jungler_positions = np.nan_to_num(positions[rows], nan=0.0)
+    timestamps = np.tile([frame['timestamp'] for frame in frames], (len(junglers), 1))
+    kill_times = [
+        [k.get('timestamp', 0) for k in kills
+         if k.get('killerId') == j['participantId'] or j['participantId'] in (k.get('assistingParticipantIds') or [])]
+        for j in junglers
+    ]
+
+    summaries = reconstruct_jungle_paths(
+        jungler_positions[..., 0], jungler_positions[..., 1], jungle_cs[rows],
+        ~np.isnan(positions[rows, :, 0]), timestamps, team_ids,
+        positions[enemy_rows][..., 0], positions[enemy_rows][..., 1], kill_times,
+    )
+    return {j['participantId']: summary for j, summary in zip(junglers, summaries)}
+
+
+if __name__ == "__main__":
+    match_path = sys.argv[1] if len(sys.argv) > 2 else os.path.join(SAMPLE_DIR, 'match_details_sample.json')
+    timeline_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(SAMPLE_DIR, 'match_timeline_sample.json')
+    with open(match_path, 'r', encoding='utf-8') as f:
+        match = json.load(f)
+    with open(timeline_path, 'r', encoding='utf-8') as f:
+        timeline_doc = json.load(f)
+    champions = {p['participantId']: p['championName'] for p in match['info']['participants']}
+    for participant_id, summary in paths_for_match(match, timeline_doc).items():
+        print(f"{champions[participant_id]} ({participant_id}): {summary['path']}")
+        print(f"  ganks: {summary['gank_count']} ({summary['successful_ganks']} with a kill) {summary['ganks']}")
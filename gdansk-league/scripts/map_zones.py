@@ -0,0 +1,95 @@
+"""
+Summoner's Rift zone and camp rasters
+The map is divided into CELL_SIZE-unit cells, each labelled once at import with a zone
+(base, lane, river, jungle side) and the jungle camp it belongs to, so classifying any
+number of positions is a single array lookup.
+
+Usage:
+    from map_zones import zone_at, camp_at, ZONE_NAMES
+    zones = zone_at(xs, ys)     # numpy arrays of any shape
+    python map_zones.py         # print the zone raster as text
+"""
+
+import numpy as np
+
+# Summoner's Rift coordinates run 0-14870 (x) and 0-14980 (y)
+MAP_SIZE = 15000
+CELL_SIZE = 250
+GRID = MAP_SIZE // CELL_SIZE
+
+# Zone codes (index into ZONE_NAMES)
+UNKNOWN, BLUE_BASE, RED_BASE, TOP_LANE, MID_LANE, BOT_LANE, RIVER, BLUE_JUNGLE, RED_JUNGLE = range(9)
+ZONE_NAMES = ('unknown', 'blue_base', 'red_base', 'top_lane', 'mid_lane', 'bot_lane',
+              'river', 'blue_jungle', 'red_jungle')
+LANE_ZONES = (TOP_LANE, MID_LANE, BOT_LANE)
+
+# Camp code -> (side owning it or 0 for neutral, x, y)
+CAMPS = {
+    'BL100': (100, 3821, 8101), 'GR100': (100, 2288, 8448), 'WO100': (100, 3783, 6495),
+    'RA100': (100, 7061, 5325), 'RE100': (100, 7762, 4011), 'KR100': (100, 8394, 2641),
+    'BL200': (200, 11031, 6990), 'GR200': (200, 12703, 6443), 'WO200': (200, 11008, 8387),
+    'RA200': (200, 7852, 9471), 'RE200': (200, 7101, 10856), 'KR200': (200, 6317, 12146),
+    'SCTOP': (0, 4400, 9600), 'SCBOT': (0, 10500, 5170),
+    'DRAGON': (0, 9866, 4414), 'BARON': (0, 5007, 10471),
+}
+CAMP_CODES = tuple(CAMPS)
+CAMP_RADIUS = 1000
+NO_CAMP = -1
+
+# Lane half-widths and the river band around x + y = RIVER_LINE
+SIDE_LANE_WIDTH = 1100
+MID_LANE_WIDTH = 900
+RIVER_LINE = 14900
+RIVER_WIDTH = 1100
+BASE_SIZE = 4300
+
+
+def _build_rasters() -> tuple:
+    """Zone and camp rasters (GRID x GRID, row = y cell, column = x cell)"""
+    centres = (np.arange(GRID) + 0.5) * CELL_SIZE
+    x, y = np.meshgrid(centres, centres)
+
+    top = ((x < SIDE_LANE_WIDTH * 2) & (y > BASE_SIZE)) | ((y > MAP_SIZE - SIDE_LANE_WIDTH * 2) & (x < MAP_SIZE - BASE_SIZE))
+    bot = ((y < SIDE_LANE_WIDTH * 2) & (x > BASE_SIZE)) | ((x > MAP_SIZE - SIDE_LANE_WIDTH * 2) & (y < MAP_SIZE - BASE_SIZE))
+    mid = np.abs(x - y) / np.sqrt(2) < MID_LANE_WIDTH
+    river = np.abs(x + y - RIVER_LINE) / np.sqrt(2) < RIVER_WIDTH
+
+    zones = np.where(x + y < RIVER_LINE, BLUE_JUNGLE, RED_JUNGLE)
+    zones = np.where(river, RIVER, zones)
+    zones = np.where(mid, MID_LANE, zones)
+    zones = np.where(top, TOP_LANE, zones)
+    zones = np.where(bot, BOT_LANE, zones)
+    zones = np.where((x < BASE_SIZE) & (y < BASE_SIZE), BLUE_BASE, zones)
+    zones = np.where((x > MAP_SIZE - BASE_SIZE) & (y > MAP_SIZE - BASE_SIZE), RED_BASE, zones)
+
+    camp_xy = np.array([(cx, cy) for _, cx, cy in CAMPS.values()], dtype=np.float64)
+    distances = np.hypot(x[..., None] - camp_xy[:, 0], y[..., None] - camp_xy[:, 1])
+    camps = np.where(distances.min(axis=2) <= CAMP_RADIUS, distances.argmin(axis=2), NO_CAMP)
+    return zones.astype(np.int8), camps.astype(np.int8)
+
+
+ZONE_RASTER, CAMP_RASTER = _build_rasters()
+
+
+def _cells(xs, ys) -> tuple:
+    """Raster (row, column) indices of positions"""
+    columns = np.clip(np.asarray(xs, dtype=np.int64) // CELL_SIZE, 0, GRID - 1)
+    rows = np.clip(np.asarray(ys, dtype=np.int64) // CELL_SIZE, 0, GRID - 1)
+    return rows, columns
+
+
+def zone_at(xs, ys) -> np.ndarray:
+    """Zone code of each position (same shape as xs)"""
+    return ZONE_RASTER[_cells(xs, ys)]
+
+
+def camp_at(xs, ys) -> np.ndarray:
+    """Index into CAMP_CODES of the camp each position is at, NO_CAMP elsewhere"""
+    return CAMP_RASTER[_cells(xs, ys)]
+
+
+if __name__ == "__main__":
+    # One character per cell, top of the map first: bases < >, lanes T M B, river ~, jungles b r
+    symbols = '?<>TMB~br'
+    for row in ZONE_RASTER[::-1]:
+        print(''.join(symbols[zone] for zone in row))
@@ -0,0 +1,247 @@
+"""
+Counter rows for the incrementally maintained cross-match aggregates
+Each ingested match contributes one small batch of increments (all ten participants) that
+the database folds into compact counter tables through an increment_* function, so
+per-champion statistics never need a scan over match_stats or the timelines. Every
+increment function records the match in aggregated_matches first and ignores matches it
+has already counted, so re-ingesting a match cannot double count (increment_teammates keys
+this per pair instead, so pairs with players added to the roster later are still counted).
+
+Usage:
+    from match_aggregates import build_stats_increments
+    supabase.rpc('increment_build_stats', build_stats_increments(match_data, stage_results, 'GOLD')).execute()
+    # likewise skill_order_increments -> increment_skill_orders, matchup_increments -> increment_matchups
+    supabase.rpc('increment_champion_meta', champion_meta_increments(match_data, ranks)).execute()
+    supabase.rpc('increment_teammates', teammate_increments(match_data, tracked_puuids)).execute()
+"""
+
+from itertools import permutations
+from typing import Dict, List, Optional, Set
+
+from match_processing import ROLE_MAPPING, get_season_fields
+
+# First-core timing histograms: one bucket per minute, the last one also holds everything later
+CORE_TIMING_BUCKETS = 40
+
+# Skill levels making up the 'start' skill sequence
+SKILL_START_LEVELS = 3
+
+# Lane diffs (lane_diffs stage columns) summed per matchup, with their squares for the variance
+MATCHUP_DIFFS = ('gold_diff_at_10', 'xp_diff_at_10', 'cs_diff_at_10',
+                 'gold_diff_at_15', 'xp_diff_at_15', 'cs_diff_at_15')
+
+
+def _participant_keys(match_data: dict, tier: Optional[str]) -> List[Dict]:
+    """
+    Aggregate key fields per participant (one entry per tier bucket: 'ALL' and the lobby tier)
+
+    Args:
+        match_data: Match-v5 match document
+        tier: Lobby tier (tracked player's Solo/Duo tier), None if unknown
+
+    Returns:
+        [{'participant': participant, 'patch', 'champion_id', 'role', 'tier'}]
+    """
+    patch = get_season_fields(match_data['info']['gameVersion'], match_data['info']['gameCreation'])['patch']
+    tiers = ['ALL'] + ([tier] if tier else [])
+    keys = []
+    for participant in match_data['info']['participants']:
+        role = ROLE_MAPPING.get(participant.get('teamPosition'))
+        if not role:
+            continue
+        for tier_bucket in tiers:
+            keys.append({
+                'participant': participant,
+                'patch': patch,
+                'champion_id': participant['championId'],
+                'role': role,
+                'tier': tier_bucket,
+            })
+    return keys
+
+
+def build_stats_increments(match_data: dict, stage_results: Dict, tier: Optional[str]) -> Dict:
+    """
+    increment_build_stats arguments for one match
+
+    Args:
+        match_data: Match-v5 match document
+        stage_results: run_stages output for ingest_stages() (item_builds)
+        tier: Lobby tier, None if unknown
+
+    Returns:
+        {'p_match_id', 'p_paths': [champion_build_paths increments],
+         'p_timings': [champion_core_timings increments]}
+    """
+    builds = stage_results['item_builds']
+    paths, timings = [], []
+    for key in _participant_keys(match_data, tier):
+        participant = key.pop('participant')
+        build = builds.get(participant['participantId'], {})
+        win = 1 if participant['win'] else 0
+        if build.get('build_path'):
+            paths.append(dict(key, path=build['build_path'], games=1, wins=win))
+        if build.get('first_core_ms') is not None:
+            counts = [0] * CORE_TIMING_BUCKETS
+            counts[min(build['first_core_ms'] // 60000, CORE_TIMING_BUCKETS - 1)] = 1
+            timings.append(dict(key, games=1, wins=win, counts=counts, sum_ms=build['first_core_ms']))
+    return {'p_match_id': match_data['metadata']['matchId'], 'p_paths': paths, 'p_timings': timings}
+
+
+def skill_order_increments(match_data: dict, stage_results: Dict, tier: Optional[str]) -> Dict:
+    """
+    increment_skill_orders arguments for one match
+
+    Args:
+        match_data: Match-v5 match document
+        stage_results: run_stages output for ingest_stages() (skill_orders)
+        tier: Lobby tier, None if unknown
+
+    Returns:
+        {'p_match_id', 'p_orders': [champion_skill_orders increments]} with one increment per
+        participant for kind 'start' (first three levels) and 'max' (max order, e.g. 'QEW')
+    """
+    skill_orders = stage_results['skill_orders']
+    orders = []
+    for key in _participant_keys(match_data, tier):
+        participant = key.pop('participant')
+        skills = skill_orders.get(participant['participantId'], {})
+        win = 1 if participant['win'] else 0
+        start = (skills.get('skill_order') or '')[:SKILL_START_LEVELS]
+        if len(start) == SKILL_START_LEVELS:
+            orders.append(dict(key, kind='start', sequence=start, games=1, wins=win))
+        if skills.get('skill_max_order'):
+            orders.append(dict(key, kind='max', sequence=skills['skill_max_order'], games=1, wins=win))
+    return {'p_match_id': match_data['metadata']['matchId'], 'p_orders': orders}
+
+
+def matchup_increments(match_data: dict, stage_results: Dict, tier: Optional[str]) -> Dict:
+    """
+    increment_matchups arguments for one match
+
+    Args:
+        match_data: Match-v5 match document
+        stage_results: run_stages output for ingest_stages() (lane_diffs)
+        tier: Lobby tier, None if unknown
+
+    Returns:
+        {'p_match_id', 'p_matchups': [champion_matchups increments]} with one increment per
+        participant with a unique lane opponent (same role, enemy team); diff_counts,
+        diff_sums and diff_squares follow the MATCHUP_DIFFS order (count 0 when a diff is None)
+    """
+    lane_diffs = stage_results['lane_diffs']
+    participants = match_data['info']['participants']
+    slots: Dict[tuple, List[Dict]] = {}
+    for participant in participants:
+        slots.setdefault((participant['teamId'], participant.get('teamPosition')), []).append(participant)
+
+    matchups = []
+    for key in _participant_keys(match_data, tier):
+        participant = key.pop('participant')
+        own = slots[(participant['teamId'], participant['teamPosition'])]
+        enemy = slots.get((300 - participant['teamId'], participant['teamPosition']), [])
+        if len(own) != 1 or len(enemy) != 1:
+            continue
+        diffs = lane_diffs.get(participant['participantId'], {})
+        values = [diffs.get(column) for column in MATCHUP_DIFFS]
+        matchups.append(dict(
+            key, opponent_champion_id=enemy[0]['championId'], games=1, wins=1 if participant['win'] else 0,
+            diff_counts=[0 if value is None else 1 for value in values],
+            diff_sums=[value or 0 for value in values],
+            diff_squares=[(value or 0) ** 2 for value in values],
+        ))
+    return {'p_match_id': match_data['metadata']['matchId'], 'p_matchups': matchups}
+
+
+def champion_meta_increments(match_data: dict, ranks: Dict[str, str]) -> Dict:
+    """
+    increment_champion_meta arguments for one match
+
+    Unlike the other aggregates, the tier bucket is each participant's own cached rank
+    (participant_ranks.cache_participant_ranks) rather than the lobby tier.
+
+    Args:
+        match_data: Match-v5 match document
+        ranks: {puuid: tier} of the participants whose rank is known
+
+    Returns:
+        See meta_increments_from_rows
+    """
+    info = match_data['info']
+    rows = [{
+        'puuid': participant.get('puuid'),
+        'champion_id': participant['championId'],
+        'role': ROLE_MAPPING.get(participant.get('teamPosition'), 'MID'),
+        'win': participant['win'],
+    } for participant in info['participants']]
+    patch = get_season_fields(info['gameVersion'], info['gameCreation'])['patch']
+    return meta_increments_from_rows(match_data['metadata']['matchId'], patch, info['gameCreation'], rows, ranks)
+
+
+def meta_increments_from_rows(match_id: str, patch: str, game_creation: int, rows: List[Dict],
+                              ranks: Dict[str, str]) -> Dict:
+    """
+    increment_champion_meta arguments from participant rows (match_stats / archive columns)
+
+    Args:
+        match_id: Match ID
+        patch: Patch of the match ('15.20')
+        game_creation: Game start (ms)
+        rows: One row per participant with puuid, champion_id, role and win
+        ranks: {puuid: tier} of the participants whose rank is known
+
+    Returns:
+        {'p_match_id', 'p_picks': [champion_meta increments], 'p_totals': [champion_meta_totals increments]}
+        with one pick per participant and tier bucket ('ALL' and their own tier, if known)
+    """
+    picks, totals = [], {}
+    for row in rows:
+        tiers = ['ALL'] + ([ranks[row['puuid']]] if row.get('puuid') in ranks else [])
+        for tier_bucket in tiers:
+            picks.append({
+                'patch': patch,
+                'tier': tier_bucket,
+                'champion_id': row['champion_id'],
+                'role': row['role'],
+                'games': 1,
+                'wins': 1 if row['win'] else 0,
+            })
+            totals[tier_bucket] = totals.get(tier_bucket, 0) + 1
+    return {
+        'p_match_id': match_id,
+        'p_picks': picks,
+        'p_totals': [{'patch': patch, 'tier': tier_bucket, 'picks': count, 'game_creation': game_creation}
+                     for tier_bucket, count in totals.items()],
+    }
+
+
+def teammate_increments(match_data: dict, tracked_puuids: Set[str]) -> Dict:
+    """
+    increment_teammates arguments for one match
+
+    Args:
+        match_data: Match-v5 match document
+        tracked_puuids: PUUIDs of the match's participants that are on the roster
+
+    Returns:
+        {'p_match_id', 'p_pairs': [player_teammates increments]} with both directions of every
+        pair of tracked players on the same team, so either player's row lists the other;
+        the database skips pairs already counted for the match
+    """
+    info = match_data['info']
+    teams: Dict[int, List[Dict]] = {}
+    for participant in info['participants']:
+        if participant.get('puuid') in tracked_puuids:
+            teams.setdefault(participant['teamId'], []).append(participant)
+
+    pairs = []
+    for team in teams.values():
+        for player, teammate in permutations(team, 2):
+            pairs.append({
+                'puuid': player['puuid'],
+                'teammate_puuid': teammate['puuid'],
+                'games': 1,
+                'wins': 1 if player['win'] else 0,
+                'game_creation': info['gameCreation'],
+            })
+    return {'p_match_id': match_data['metadata']['matchId'], 'p_pairs': pairs}
@@ -0,0 +1,365 @@
+"""
+Local columnar archive of ingested matches (Parquet, partitioned by season/patch)
+Two tables under the archive root, both Hive-partitioned as season=<n>/patch=<x.y>/:
+- participants: one row per participant per match (match_stats columns + puuid, items, queue)
+- frames: one row per participant per timeline frame (position, level, gold, xp, CS)
+
+Ingest scripts append to it when MATCH_ARCHIVE_DIR is set. Offline jobs read it with
+read_archive(), which memory-maps the files and pushes filters down to the partition
+directories and Parquet row groups instead of paging through PostgREST.
+
+Usage:
+    python match_archive.py import ../data/synthetic        # files or jsonl(.gz) from synthetic_matches.py
+    python match_archive.py summary [--season 15]
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from match_processing import build_match_stats_row
+from riot_models import Match, decode_match, match_from_dict
+
+DEFAULT_ARCHIVE_DIR = '../data/archive'
+PARTITION_COLUMNS = ['season', 'patch']
+
+# Matches buffered before a flush writes one file per (table, season, patch)
+DEFAULT_FLUSH_EVERY = 500
+
+PARTICIPANT_SCHEMA = pa.schema([
+    ('match_id', pa.string()),
+    ('season', pa.int16()),
+    ('patch', pa.string()),
+    ('split_number', pa.int8()),
+    ('match_date', pa.string()),
+    ('game_creation', pa.int64()),
+    ('game_duration', pa.int32()),
+    ('queue_id', pa.int16()),
+    ('participant_id', pa.int8()),
+    ('puuid', pa.string()),
+    ('team_id', pa.int16()),
+    ('champion_id', pa.int16()),
+    ('champion_name', pa.string()),
+    ('role', pa.string()),
+    ('win', pa.bool_()),
+    ('kills', pa.int16()),
+    ('deaths', pa.int16()),
+    ('assists', pa.int16()),
+    ('total_minions_killed', pa.int16()),
+    ('neutral_minions_killed', pa.int16()),
+    ('cs_per_minute', pa.float32()),
+    ('total_damage_to_champions', pa.int32()),
+    ('damage_per_minute', pa.float32()),
+    ('damage_share', pa.float32()),
+    ('total_damage_taken', pa.int32()),
+    ('damage_self_mitigated', pa.int32()),
+    ('gold_earned', pa.int32()),
+    ('vision_score', pa.int16()),
+    ('vision_score_per_minute', pa.float32()),
+    ('wards_placed', pa.int16()),
+    ('wards_killed', pa.int16()),
+    ('control_wards_purchased', pa.int16()),
+    ('damage_to_turrets', pa.int32()),
+    ('damage_to_objectives', pa.int32()),
+    ('turret_plates_taken', pa.int16()),
+    ('turrets_killed', pa.int16()),
+    ('dragon_kills', pa.int16()),
+    ('baron_kills', pa.int16()),
+    ('rift_herald_kills', pa.int16()),
+    ('time_ccing_others', pa.int32()),
+    ('total_heal_on_teammates', pa.int32()),
+    ('total_damage_shielded_on_teammates', pa.int32()),
+    ('kill_participation', pa.float32()),
+    ('solo_kills', pa.int16()),
+    ('takedowns_first_15_min', pa.int16()),
+    ('save_ally_from_death', pa.int16()),
+    ('items', pa.list_(pa.int32())),
+])
+
+FRAME_SCHEMA = pa.schema([
+    ('match_id', pa.string()),
+    ('season', pa.int16()),
+    ('patch', pa.string()),
+    ('timestamp', pa.int32()),
+    ('minute', pa.int16()),
+    ('participant_id', pa.int8()),
+    ('x', pa.int16()),
+    ('y', pa.int16()),
+    ('level', pa.int8()),
+    ('current_gold', pa.int32()),
+    ('total_gold', pa.int32()),
+    ('xp', pa.int32()),
+    ('minions_killed', pa.int16()),
+    ('jungle_minions_killed', pa.int16()),
+])
+
+SCHEMAS = {'participants': PARTICIPANT_SCHEMA, 'frames': FRAME_SCHEMA}
+
+
+def participant_rows(match: Match) -> List[Dict]:
+    """
+    Participant table rows for a match (same stat columns as match_stats)
+
+    Args:
+        match: riot_models.Match
+
+    Returns:
+        One row per participant
+    """
+    rows = []
+    for participant in match.info.participants:
+        row = build_match_stats_row(match, participant, None)
+        del row['player_id'], row['split_name']
+        row.update({
+            'game_creation': match.info.game_creation,
+            'queue_id': match.info.queue_id,
+            'participant_id': participant.participant_id,
+            'puuid': participant.puuid,
+            'items': [participant.item0, participant.item1, participant.item2, participant.item3,
+                      participant.item4, participant.item5, participant.item6],
+        })
+        rows.append(row)
+    return rows
+
+
+def frame_rows(match_id: str, season: int, patch: str, timeline: dict) -> List[Dict]:
+    """
+    Frame table rows for a timeline (full or parse_timeline() projected)
+
+    Args:
+        match_id: Match identifier
+        season: Partition season of the match
+        patch: Partition patch of the match
+        timeline: Match-v5 timeline document
+
+    Returns:
+        One row per participant per frame
+    """
+    rows = []
+    for frame in timeline['info']['frames']:
+        timestamp = frame['timestamp']
+        for participant_id, pf in frame.get('participantFrames', {}).items():
+            position = pf.get('position') or {}
+            rows.append({
+                'match_id': match_id,
+                'season': season,
+                'patch': patch,
+                'timestamp': timestamp,
+                'minute': round(timestamp / 60000),
+                'participant_id': int(participant_id),
+                'x': position.get('x'),
+                'y': position.get('y'),
+                'level': pf.get('level'),
+                'current_gold': pf.get('currentGold'),
+                'total_gold': pf.get('totalGold'),
+                'xp': pf.get('xp'),
+                'minions_killed': pf.get('minionsKilled', 0),
+                'jungle_minions_killed': pf.get('jungleMinionsKilled', 0),
+            })
+    return rows
+
+
+def archived_match_ids(root: str = DEFAULT_ARCHIVE_DIR) -> Set[str]:
+    """Match IDs already in the archive's participants table (empty if there is no archive yet)"""
+    if not os.path.isdir(os.path.join(root, 'participants')):
+        return set()
+    return set(pc.unique(read_archive('participants', columns=['match_id'], root=root)['match_id']).to_pylist())
+
+
+class MatchArchiveWriter:
+    """Buffers ingested matches and appends them to the archive as Parquet files"""
+
+    def __init__(self, root: str = DEFAULT_ARCHIVE_DIR, flush_every: int = DEFAULT_FLUSH_EVERY):
+        self.root = root
+        self.flush_every = flush_every
+        self.buffers: Dict[str, List[Dict]] = {table: [] for table in SCHEMAS}
+        self.pending = 0
+        self.written = 0
+        self.skipped = 0
+        # Archived match IDs, loaded on the first add (the archive is append-only, so a match
+        # ingested again, e.g. once per tracked player in it, must not be written twice)
+        self.archived: Optional[Set[str]] = None
+
+    def add(self, match_data: Union[Match, dict], timeline: Optional[dict] = None):
+        """
+        Queue a match (and optionally its timeline) for the archive; already archived matches are skipped
+
+        Args:
+            match_data: riot_models.Match, or a match-v5 match dictionary from the ingest scripts
+            timeline: Match-v5 timeline document (frames table is skipped without it)
+        """
+        if self.archived is None:
+            self.archived = archived_match_ids(self.root)
+        match = match_from_dict(match_data) if isinstance(match_data, dict) else match_data
+        match_id = match.metadata.match_id
+        if match_id in self.archived:
+            self.skipped += 1
+            return
+        self.archived.add(match_id)
+
+        rows = participant_rows(match)
+        self.buffers['participants'].extend(rows)
+        if timeline is not None:
+            self.buffers['frames'].extend(
+                frame_rows(rows[0]['match_id'], rows[0]['season'], rows[0]['patch'], timeline)
+            )
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows as one new file per table and partition"""
+        if not self.pending:
+            return
+        batch_id = uuid.uuid4().hex
+        for table, rows in self.buffers.items():
+            if not rows:
+                continue
+            pq.write_to_dataset(
+                pa.Table.from_pylist(rows, schema=SCHEMAS[table]),
+                os.path.join(self.root, table),
+                partition_cols=PARTITION_COLUMNS,
+                basename_template=f"part-{batch_id}-{{i}}.parquet",
+                existing_data_behavior='overwrite_or_ignore',
+                compression='zstd',
+            )
+            rows.clear()
+        self.written += self.pending
+        self.pending = 0
+
+    def close(self):
+        """Flush whatever is still buffered"""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_archive_from_env() -> Optional[MatchArchiveWriter]:
+    """Archive writer for MATCH_ARCHIVE_DIR, or None when archiving is not configured"""
+    root = os.getenv('MATCH_ARCHIVE_DIR')
+    if not root:
+        return None
+    return MatchArchiveWriter(root, int(os.getenv('MATCH_ARCHIVE_FLUSH_EVERY', DEFAULT_FLUSH_EVERY)))
+
+
+def read_archive(table: str, columns: Optional[List[str]] = None, filters: Optional[List[Tuple]] = None,
+                 root: str = DEFAULT_ARCHIVE_DIR) -> pa.Table:
+    """
+    Read an archive table (memory-mapped, with partition and row-group filter pushdown)
+
+    Args:
+        table: 'participants' or 'frames'
+        columns: Columns to read (default all)
+        filters: pyarrow filters, e.g. [('season', '=', 15), ('role', '=', 'MID')]
+        root: Archive root directory
+
+    Returns:
+        pyarrow Table (.to_pandas() for a DataFrame)
+    """
+    if table not in SCHEMAS:
+        raise ValueError(f"Unknown archive table: {table}")
+    return pq.read_table(
+        os.path.join(root, table),
+        columns=columns,
+        filters=filters,
+        schema=SCHEMAS[table],
+        partitioning='hive',
+        memory_map=True,
+    )
+
+
+def _iter_source(source: str) -> Iterator[Tuple[Match, Optional[dict]]]:
+    """(match, timeline) pairs from a synthetic_matches.py / recorded fixture directory (matches decoded from bytes)"""
+    for suffix, opener in (('.jsonl.gz', gzip.open), ('.jsonl', open)):
+        matches_path = os.path.join(source, f"matches{suffix}")
+        if os.path.exists(matches_path):
+            timelines_path = os.path.join(source, f"timelines{suffix}")
+            with opener(matches_path, 'rb') as matches, \
+                    opener(timelines_path, 'rt', encoding='utf-8') as timelines:
+                for match_line, timeline_line in zip(matches, timelines):
+                    yield decode_match(match_line), json.loads(timeline_line)
+            return
+
+    for match_path in sorted(glob.glob(os.path.join(source, '*.json'))):
+        if match_path.endswith('_timeline.json') or os.path.basename(match_path) == 'index.json':
+            continue
+        with open(match_path, 'rb') as f:
+            match_data = decode_match(f.read())
+        timeline = None
+        timeline_path = match_path[:-len('.json')] + '_timeline.json'
+        if os.path.exists(timeline_path):
+            with open(timeline_path, 'r', encoding='utf-8') as f:
+                timeline = json.load(f)
+        yield match_data, timeline
+
+
+def import_directory(source: str, root: str, flush_every: int) -> int:
+    """Archive every match in a fixture directory; returns matches archived"""
+    start = time.perf_counter()
+    with MatchArchiveWriter(root, flush_every) as writer:
+        for count, (match_data, timeline) in enumerate(_iter_source(source), 1):
+            writer.add(match_data, timeline)
+            if count % 1000 == 0:
+                print(f"  {count} matches read ({writer.written + writer.pending} new)")
+    elapsed = time.perf_counter() - start
+    print(f"[OK] {writer.written} matches archived to {root} in {elapsed:.1f}s ({writer.skipped} already archived)")
+    return writer.written
+
+
+def print_summary(root: str, season: Optional[int]):
+    """Row counts per partition plus a sample pushdown query"""
+    filters = [('season', '=', season)] if season is not None else None
+    start = time.perf_counter()
+    participants = read_archive('participants', ['season', 'patch', 'match_id', 'role', 'win'], filters, root)
+    elapsed = time.perf_counter() - start
+    if participants.num_rows == 0:
+        print("[INFO] Archive is empty")
+        return
+
+    per_patch = participants.group_by(['season', 'patch']).aggregate([('match_id', 'count_distinct')]) \
+        .sort_by([('season', 'ascending'), ('patch', 'ascending')])
+    total_matches = pc.count_distinct(participants['match_id']).as_py()
+    print(f"[OK] {participants.num_rows} participant rows, {total_matches} matches read in {elapsed * 1000:.0f} ms\n")
+    print(f"{'Season':<8} {'Patch':<8} {'Matches':>10}")
+    print("-" * 30)
+    for row in per_patch.to_pylist():
+        print(f"{row['season']:<8} {row['patch']:<8} {row['match_id_count_distinct']:>10}")
+
+    print("\nWin rate by role:")
+    wins = participants.group_by('role').aggregate([('win', 'mean')]).sort_by('role')
+    for row in wins.to_pylist():
+        print(f"  {row['role']:<8} {row['win_mean']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Parquet archive of ingested matches')
+    parser.add_argument('--root', default=os.getenv('MATCH_ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR), help='Archive root')
+    sub = parser.add_subparsers(dest='command', required=True)
+    import_parser = sub.add_parser('import', help='Archive a synthetic/recorded fixture directory')
+    import_parser.add_argument('source', help='Directory with <id>.json/<id>_timeline.json or matches/timelines.jsonl(.gz)')
+    import_parser.add_argument('--flush-every', type=int, default=DEFAULT_FLUSH_EVERY, help='Matches per written file')
+    summary_parser = sub.add_parser('summary', help='Partition row counts')
+    summary_parser.add_argument('--season', type=int, help='Only this season')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        import_directory(args.source, args.root, args.flush_every)
+    else:
+        print_summary(args.root, args.season)
+
+
+if __name__ == "__main__":
+    main()
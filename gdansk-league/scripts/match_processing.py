@@ -0,0 +1,396 @@
+"""
+Pure match/timeline processing shared by the ingest scripts and benchmarks
+Turns match-v5 match and timeline documents into database rows.
+No API or database access happens here, so these functions can be timed in isolation.
+"""
+
+from datetime import datetime
+from typing import Dict, List
+
+from riot_models import Match, Participant
+
+# Map role from API (teamPosition) to database format
+ROLE_MAPPING = {
+    'TOP': 'TOP',
+    'JUNGLE': 'JUNGLE',
+    'MIDDLE': 'MID',
+    'BOTTOM': 'ADC',
+    'UTILITY': 'SUPPORT'
+}
+
+# Timeline event types stored in match_events
+STORED_EVENT_TYPES = ('CHAMPION_KILL', 'BUILDING_KILL', 'ELITE_MONSTER_KILL')
+
+# match_events storage: 'lean' keeps typed columns (+ damage summary), 'full' also the raw event JSONB
+EVENT_STORAGE_MODES = ('lean', 'full')
+
+
+def find_participant_id(match_data: dict, target_puuid: str) -> int:
+    """Find the participant ID for the target player"""
+    for participant in match_data['info']['participants']:
+        if participant['puuid'] == target_puuid:
+            return participant['participantId']
+    raise Exception(f"Player {target_puuid} not found in match")
+
+
+def get_champion_name(match_data: dict, participant_id: int) -> str:
+    """Get champion name for a participant"""
+    for participant in match_data['info']['participants']:
+        if participant['participantId'] == participant_id:
+            return participant['championName']
+    return "Unknown"
+
+
+def aggregate_match_analytics(match_id: str, match_data: dict, timeline: dict, target_puuid: str) -> dict:
+    """Aggregate all analytics for a player in a match"""
+
+    # Find player's participant ID
+    participant_id = find_participant_id(match_data, target_puuid)
+
+    # Get queue_id and team_id from match data
+    queue_id = match_data['info'].get('queueId', 420)
+
+    # Get team_id from participant info
+    team_id = None
+    for participant in match_data['info']['participants']:
+        if participant['puuid'] == target_puuid:
+            team_id = participant.get('teamId', 100)
+            break
+
+    analytics = {
+        'match_id': match_id,
+        'player_puuid': target_puuid,
+        'participant_id': participant_id,
+        'queue_id': queue_id,
+        'team_id': team_id,
+        'deaths': [],
+        'kills': [],
+        'assists': [],
+        'elite_monster_kills': [],
+        'building_kills': [],
+        'position_timeline': []
+    }
+
+    # Process all frames for events and position snapshots
+    for frame in timeline['info']['frames']:
+        timestamp = frame['timestamp']
+
+        # Extract position at 5-minute intervals
+        if timestamp % 300000 == 0 or timestamp == 0:
+            participant_frames = frame.get('participantFrames', {})
+            player_frame = participant_frames.get(str(participant_id))
+
+            if player_frame and 'position' in player_frame:
+                position = player_frame['position']
+                if position.get('x') is not None:
+                    analytics['position_timeline'].append({
+                        'timestamp': timestamp,
+                        'x': position['x'],
+                        'y': position['y'],
+                        'level': player_frame.get('level'),
+                        'total_gold': player_frame.get('totalGold'),
+                        'current_gold': player_frame.get('currentGold'),
+                        'cs': player_frame.get('minionsKilled', 0),
+                        'jungle_cs': player_frame.get('jungleMinionsKilled', 0)
+                    })
+
+        # Process events
+        if 'events' not in frame:
+            continue
+
+        for event in frame['events']:
+            event_type = event.get('type')
+            position = event.get('position', {})
+
+            # CHAMPION_KILL events
+            if event_type == 'CHAMPION_KILL':
+                killer_id = event.get('killerId')
+                victim_id = event.get('victimId')
+                assisting_ids = event.get('assistingParticipantIds', [])
+
+                # Death (player is victim)
+                if victim_id == participant_id:
+                    analytics['deaths'].append({
+                        'x': position.get('x'),
+                        'y': position.get('y'),
+                        'timestamp': timestamp,
+                        'killer_champion': get_champion_name(match_data, killer_id) if killer_id else None,
+                        'assisting_champions': [get_champion_name(match_data, aid) for aid in assisting_ids]
+                    })
+
+                # Kill (player is killer)
+                if killer_id == participant_id:
+                    analytics['kills'].append({
+                        'x': position.get('x'),
+                        'y': position.get('y'),
+                        'timestamp': timestamp,
+                        'victim_champion': get_champion_name(match_data, victim_id),
+                        'assisting_champions': [get_champion_name(match_data, aid) for aid in assisting_ids]
+                    })
+
+                # Assist (player assisted)
+                if participant_id in assisting_ids:
+                    analytics['assists'].append({
+                        'x': position.get('x'),
+                        'y': position.get('y'),
+                        'timestamp': timestamp,
+                        'killer_champion': get_champion_name(match_data, killer_id) if killer_id else None,
+                        'victim_champion': get_champion_name(match_data, victim_id)
+                    })
+
+            # ELITE_MONSTER_KILL (dragons, baron, rift herald)
+            elif event_type == 'ELITE_MONSTER_KILL':
+                if event.get('killerId') == participant_id:
+                    analytics['elite_monster_kills'].append({
+                        'type': event.get('monsterType'),
+                        'subtype': event.get('monsterSubType'),
+                        'x': position.get('x'),
+                        'y': position.get('y'),
+                        'timestamp': timestamp
+                    })
+
+            # BUILDING_KILL (towers, inhibitors)
+            elif event_type == 'BUILDING_KILL':
+                if event.get('killerId') == participant_id:
+                    analytics['building_kills'].append({
+                        'type': event.get('buildingType'),
+                        'lane': event.get('laneType'),
+                        'tower_type': event.get('towerType'),
+                        'x': position.get('x'),
+                        'y': position.get('y'),
+                        'timestamp': timestamp
+                    })
+
+    return analytics
+
+
+def get_season_fields(game_version: str, game_creation_ms: int) -> dict:
+    """match_date, season, split and patch columns derived from gameVersion and gameCreation"""
+    # Extract match date and season
+    match_date = datetime.fromtimestamp(game_creation_ms / 1000)
+
+    # Extract season from game version
+    version_parts = game_version.split('.')
+    season = int(version_parts[0])
+    patch_number = int(version_parts[1])
+    patch = f"{season}.{patch_number}"
+
+    # Calculate split
+    if patch_number <= 8:
+        split_number = 1
+        split_name = "Welcome to Noxus"
+    elif patch_number <= 16:
+        split_number = 2
+        split_name = "Spirit Blossom Beyond"
+    else:
+        split_number = 3
+        split_name = "Trials of Twilight"
+
+    return {
+        'match_date': match_date.isoformat(),
+        'season': season,
+        'split_number': split_number,
+        'split_name': split_name,
+        'patch': patch,
+    }
+
+
+def build_match_stats_row(match: Match, participant: Participant, player_id: str) -> dict:
+    """Build the match_stats row for one participant (riot_models.decode_match / match_from_dict models)"""
+    game_duration_seconds = match.info.game_duration
+    game_duration_minutes = game_duration_seconds / 60
+    challenges = participant.challenges
+
+    def per_minute(value: int) -> float:
+        return round(value / game_duration_minutes, 2) if game_duration_minutes > 0 else 0
+
+    return {
+        'match_id': match.metadata.match_id,
+        'player_id': player_id,
+        'champion_id': participant.champion_id,
+        'champion_name': participant.champion_name,
+        'role': ROLE_MAPPING.get(participant.team_position, 'MID'),
+        'team_id': participant.team_id,
+        'game_duration': game_duration_seconds,
+        'win': participant.win,
+        **get_season_fields(match.info.game_version, match.info.game_creation),
+        'kills': participant.kills,
+        'deaths': participant.deaths,
+        'assists': participant.assists,
+        'total_minions_killed': participant.total_minions_killed,
+        'neutral_minions_killed': participant.neutral_minions_killed,
+        'cs_per_minute': per_minute(participant.total_minions_killed),
+        'total_damage_to_champions': participant.total_damage_dealt_to_champions,
+        'damage_per_minute': per_minute(participant.total_damage_dealt_to_champions),
+        'damage_share': challenges.team_damage_percentage,
+        'total_damage_taken': participant.total_damage_taken,
+        'damage_self_mitigated': participant.damage_self_mitigated,
+        'gold_earned': participant.gold_earned,
+        'vision_score': participant.vision_score,
+        'vision_score_per_minute': per_minute(participant.vision_score),
+        'wards_placed': participant.wards_placed,
+        'wards_killed': participant.wards_killed,
+        'control_wards_purchased': participant.vision_wards_bought_in_game,
+        'damage_to_turrets': participant.damage_dealt_to_turrets,
+        'damage_to_objectives': participant.damage_dealt_to_objectives,
+        'turret_plates_taken': challenges.turret_plates_taken,
+        'turrets_killed': participant.turret_kills,
+        'dragon_kills': participant.dragon_kills,
+        'baron_kills': participant.baron_kills,
+        'rift_herald_kills': challenges.rift_herald_takedowns,
+        'time_ccing_others': participant.time_ccing_others,
+        'total_heal_on_teammates': participant.total_heals_on_teammates,
+        'total_damage_shielded_on_teammates': participant.total_damage_shielded_on_teammates,
+        'kill_participation': challenges.kill_participation,
+        'solo_kills': challenges.solo_kills,
+        'takedowns_first_15_min': challenges.takedowns_first_15_minutes,
+        'save_ally_from_death': challenges.save_ally_from_death,
+    }
+
+
+def summarize_kill_damage(event: dict) -> Dict:
+    """
+    Compact damage summary of a CHAMPION_KILL event
+
+    Collapses victimDamageDealt/victimDamageReceived (one entry per spell hit, often 20+)
+    into physical/magic/true totals per participant.
+
+    Returns:
+        {'received': {participant_id: [physical, magic, true]}, 'dealt': {...}}
+        (participant 0 is minions, turrets and monsters)
+    """
+    summary = {}
+    for direction, key in (('received', 'victimDamageReceived'), ('dealt', 'victimDamageDealt')):
+        totals: Dict[str, List[int]] = {}
+        for entry in event.get(key) or []:
+            total = totals.setdefault(str(entry.get('participantId', 0)), [0, 0, 0])
+            total[0] += entry.get('physicalDamage', 0)
+            total[1] += entry.get('magicDamage', 0)
+            total[2] += entry.get('trueDamage', 0)
+        summary[direction] = totals
+    return summary
+
+
+def build_match_event_row(match_id: str, event: dict, storage: str = 'lean', damage_summary: bool = True) -> Dict:
+    """
+    Build one match_events row from a timeline event
+
+    Args:
+        match_id: Match identifier
+        event: CHAMPION_KILL, BUILDING_KILL or ELITE_MONSTER_KILL event
+        storage: 'lean' (typed columns only) or 'full' (also the raw event in event_data)
+        damage_summary: Add summarize_kill_damage() to kill events in lean storage
+
+    Returns:
+        match_events row
+    """
+    if storage not in EVENT_STORAGE_MODES:
+        raise ValueError(f"Unknown match_events storage mode: {storage}")
+
+    event_type = event.get('type')
+    row = {
+        'match_id': match_id,
+        'timestamp_ms': event.get('timestamp'),
+        'event_type': event_type,
+    }
+    if storage == 'full':
+        row['event_data'] = event  # Store full event as JSONB
+
+    # Extract position if available
+    if 'position' in event:
+        row['position_x'] = event['position'].get('x')
+        row['position_y'] = event['position'].get('y')
+
+    # Every stored event type is attributed to its killer
+    row['killer_id'] = event.get('killerId')
+    row['participant_id'] = event.get('killerId')
+
+    if event_type == 'CHAMPION_KILL':
+        row['victim_id'] = event.get('victimId')
+
+        # Store assisting participants as array
+        assisting = event.get('assistingParticipantIds', [])
+        if assisting:
+            row['assisting_participant_ids'] = assisting
+
+        if storage == 'lean':
+            row['bounty'] = event.get('bounty')
+            row['shutdown_bounty'] = event.get('shutdownBounty')
+            row['kill_streak_length'] = event.get('killStreakLength')
+            if damage_summary:
+                row['damage_summary'] = summarize_kill_damage(event)
+
+    elif event_type == 'BUILDING_KILL' and storage == 'lean':
+        row['team_id'] = event.get('teamId')
+        row['building_type'] = event.get('buildingType')
+        row['lane_type'] = event.get('laneType')
+        row['tower_type'] = event.get('towerType')
+        row['bounty'] = event.get('bounty')
+
+    elif event_type == 'ELITE_MONSTER_KILL' and storage == 'lean':
+        row['team_id'] = event.get('killerTeamId')
+        row['monster_type'] = event.get('monsterType')
+        row['monster_sub_type'] = event.get('monsterSubType')
+        row['bounty'] = event.get('bounty')
+
+    return row
+
+
+def build_match_event_rows(match_id: str, timeline: dict, storage: str = 'lean', damage_summary: bool = True) -> List[Dict]:
+    """Extract match_events rows (kills, buildings, elite monsters) from a timeline (see build_match_event_row)"""
+    events_to_insert = []
+
+    # Process all frames to extract events
+    for frame in timeline['info']['frames']:
+        if 'events' not in frame:
+            continue
+
+        for event in frame['events']:
+            # We're interested in: CHAMPION_KILL, BUILDING_KILL, ELITE_MONSTER_KILL
+            if event.get('type') not in STORED_EVENT_TYPES:
+                continue
+
+            events_to_insert.append(build_match_event_row(match_id, event, storage, damage_summary))
+
+    return events_to_insert
+
+
+def build_timeline_snapshot_rows(match_id: str, timeline: dict) -> List[Dict]:
+    """Extract match_timeline_snapshots rows (one per participant per frame) from a timeline"""
+    snapshots_to_insert = []
+
+    # Process frames (typically every 60 seconds)
+    for frame in timeline['info']['frames']:
+        timestamp_ms = frame['timestamp']
+
+        # Skip frame 0 (game start has no meaningful position data)
+        if timestamp_ms == 0:
+            continue
+
+        # Extract participant frames
+        participant_frames = frame.get('participantFrames', {})
+
+        for participant_id_str, participant_data in participant_frames.items():
+            participant_id = int(participant_id_str)
+
+            # Extract position
+            position = participant_data.get('position', {})
+            if not position or position.get('x') is None:
+                continue  # Skip if no position data
+
+            snapshots_to_insert.append({
+                'match_id': match_id,
+                'participant_id': participant_id,
+                'timestamp_ms': timestamp_ms,
+                'position_x': position.get('x'),
+                'position_y': position.get('y'),
+                'level': participant_data.get('level'),
+                'total_gold': participant_data.get('totalGold'),
+                'current_gold': participant_data.get('currentGold'),
+                'xp': participant_data.get('xp'),
+                'minions_killed': participant_data.get('minionsKilled'),
+                'jungle_minions_killed': participant_data.get('jungleMinionsKilled'),
+                'stats': participant_data.get('championStats', {})  # Store as JSONB
+            })
+
+    return snapshots_to_insert
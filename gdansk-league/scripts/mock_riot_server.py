@@ -0,0 +1,388 @@
+"""
+Offline Riot API stand-in for benchmarks and limiter testing
+Serves account-v1, summoner-v4, league-v4, match-v5, champion-mastery-v4 and spectator-v5
+routes from recorded fixtures (or the backend sample match/timeline), with realistic
+rate-limit headers, 429s and configurable latency.
+
+Usage: python mock_riot_server.py --port 8089 --latency-ms 40
+Then point the scripts at it:
+    RIOT_API_BASE_URL="http://127.0.0.1:8089/{routing}" python update_profile_icons.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from riot_quota import APP_RATE_LIMITS, METHOD_RATE_LIMITS, METHOD_PATTERNS, _parse_limits
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_DIR = os.path.join(SCRIPT_DIR, '..', '..', 'backend', 'scripts')
+SAMPLE_MATCH_FILE = os.path.join(SAMPLE_DIR, 'match_details_sample.json')
+SAMPLE_TIMELINE_FILE = os.path.join(SAMPLE_DIR, 'match_timeline_sample.json')
+
+TIERS = ['IRON', 'BRONZE', 'SILVER', 'GOLD', 'PLATINUM', 'EMERALD', 'DIAMOND']
+DIVISIONS = ['IV', 'III', 'II', 'I']
+COMMON_CHAMPION_IDS = [1, 22, 51, 64, 67, 81, 84, 89, 103, 157, 202, 222, 236, 238, 266, 412, 498, 517, 555, 875]
+
+
+def _seed(value: str) -> int:
+    """Stable integer derived from a string (same across runs and processes)"""
+    return int(hashlib.sha1(value.encode('utf-8')).hexdigest()[:12], 16)
+
+
+def format_limits(limits: List[Tuple[int, int]]) -> str:
+    """Format (requests, window) pairs the way Riot does in X-*-Rate-Limit headers"""
+    return ','.join(f"{count}:{window}" for count, window in limits)
+
+
+class SlidingWindowLimiter:
+    """Riot-style rate limiter: several (requests, window) limits per key"""
+
+    def __init__(self):
+        self.requests: Dict[Tuple, Deque[float]] = {}
+        self.lock = threading.Lock()
+
+    def hit(self, key: Tuple, limits: List[Tuple[int, int]]) -> Tuple[bool, List[int], float]:
+        """
+        Register a request if every window has room
+
+        Returns:
+            (allowed, counts per window after this request, retry_after seconds if rejected)
+        """
+        with self.lock:
+            now = time.time()
+            log = self.requests.setdefault(key, deque())
+            longest = max([w for _, w in limits] or [1])
+            while log and log[0] <= now - longest:
+                log.popleft()
+
+            counts = [sum(1 for t in log if t > now - window) for _, window in limits]
+            for (count_limit, window), count in zip(limits, counts):
+                if count >= count_limit:
+                    # Oldest request still inside the window decides when room frees up
+                    in_window = [t for t in log if t > now - window]
+                    retry_after = in_window[count - count_limit] + window - now
+                    return False, counts, max(retry_after, 0.0)
+
+            log.append(now)
+            return True, [count + 1 for count in counts], 0.0
+
+
+class FixtureStore:
+    """Recorded fixtures by match ID, falling back to the backend samples"""
+
+    def __init__(self, fixtures_dir: Optional[str] = None):
+        self.fixtures_dir = fixtures_dir
+        with open(SAMPLE_MATCH_FILE, 'r', encoding='utf-8') as f:
+            self.sample_match_text = f.read()
+        with open(SAMPLE_TIMELINE_FILE, 'r', encoding='utf-8') as f:
+            self.sample_timeline_text = f.read()
+
+        sample = json.loads(self.sample_match_text)
+        self.sample_match_id = sample['metadata']['matchId']
+        self.sample_puuid = sample['metadata']['participants'][0]
+
+        # match_id -> puuid the match was listed for (so that player appears in it)
+        self.match_owner: Dict[str, str] = {}
+        self.lock = threading.Lock()
+
+        # index.json (written by synthetic_matches.py): Riot ID -> PUUID and PUUID -> match IDs
+        self.accounts: Dict[str, str] = {}
+        self.match_index: Dict[str, List[str]] = {}
+        index_path = os.path.join(fixtures_dir, 'index.json') if fixtures_dir else None
+        if index_path and os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.accounts = index.get('accounts', {})
+            self.match_index = index.get('matches', {})
+
+    def puuid_for(self, game_name: str, tag_line: str) -> str:
+        """PUUID for a Riot ID (from the fixture index, otherwise derived from the name)"""
+        return self.accounts.get(f"{game_name}#{tag_line}") or f"mock-{_seed(f'{game_name}#{tag_line}'):012x}"
+
+    def _recorded(self, name: str) -> Optional[bytes]:
+        """Read a recorded fixture file if one exists"""
+        if not self.fixtures_dir:
+            return None
+        path = os.path.join(self.fixtures_dir, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read()
+        return None
+
+    def match_ids_for(self, puuid: str, start: int, count: int) -> List[str]:
+        """Match history for a PUUID (from the fixture index, otherwise deterministic)"""
+        if puuid in self.match_index:
+            return self.match_index[puuid][start:start + count]
+        base = 7_000_000_000 + (_seed(puuid) % 100_000) * 1000
+        match_ids = [f"EUW1_{base + index}" for index in range(start, start + count)]
+        with self.lock:
+            for match_id in match_ids:
+                self.match_owner[match_id] = puuid
+        return match_ids
+
+    def _personalise(self, text: str, match_id: str) -> bytes:
+        """Swap the sample match ID and first participant for the requested match and its owner"""
+        text = text.replace(self.sample_match_id, match_id)
+        owner = self.match_owner.get(match_id)
+        if owner:
+            text = text.replace(self.sample_puuid, owner)
+        return text.encode('utf-8')
+
+    def match(self, match_id: str) -> bytes:
+        """Match-v5 match document"""
+        return self._recorded(f"{match_id}.json") or self._personalise(self.sample_match_text, match_id)
+
+    def timeline(self, match_id: str) -> bytes:
+        """Match-v5 timeline document"""
+        return self._recorded(f"{match_id}_timeline.json") or self._personalise(self.sample_timeline_text, match_id)
+
+
+class MockRiotAPI:
+    """Route handlers and server-wide state"""
+
+    def __init__(self, fixtures: FixtureStore, app_limits: List[Tuple[int, int]],
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.fixtures = fixtures
+        self.app_limits = app_limits
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.limiter = SlidingWindowLimiter()
+        self.stats = {'requests': 0, 'served': 0, 'rate_limited': 0, 'not_found': 0, 'bytes': 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, key: str, amount: int = 1):
+        """Increment a server statistic"""
+        with self.stats_lock:
+            self.stats[key] += amount
+
+    def route(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, Optional[bytes]]:
+        """
+        Resolve a path (without routing prefix) to a status code and JSON body
+        """
+        match = re.match(r'^/riot/account/v1/accounts/by-riot-id/([^/]+)/([^/]+)$', path)
+        if match:
+            game_name, tag_line = match.groups()
+            puuid = self.fixtures.puuid_for(game_name, tag_line)
+            return 200, json.dumps({'puuid': puuid, 'gameName': game_name, 'tagLine': tag_line}).encode()
+
+        match = re.match(r'^/riot/account/v1/accounts/by-puuid/([^/]+)$', path)
+        if match:
+            puuid = match.group(1)
+            return 200, json.dumps({'puuid': puuid, 'gameName': f"Mock{_seed(puuid) % 10000}", 'tagLine': 'EUW'}).encode()
+
+        match = re.match(r'^/lol/summoner/v4/summoners/by-puuid/([^/]+)$', path)
+        if match:
+            puuid = match.group(1)
+            seed = _seed(puuid)
+            return 200, json.dumps({
+                'puuid': puuid,
+                'profileIconId': seed % 30,
+                'revisionDate': 1_760_000_000_000 + seed % 1_000_000_000,
+                'summonerLevel': 30 + seed % 500
+            }).encode()
+
+        match = re.match(r'^/lol/league/v4/entries/by-puuid/([^/]+)$', path)
+        if match:
+            puuid = match.group(1)
+            seed = _seed(puuid)
+            wins, losses = 20 + seed % 200, 20 + (seed >> 8) % 200
+            return 200, json.dumps([{
+                'leagueId': f"mock-league-{seed % 50}",
+                'queueType': 'RANKED_SOLO_5x5',
+                'tier': TIERS[seed % len(TIERS)],
+                'rank': DIVISIONS[(seed >> 4) % len(DIVISIONS)],
+                'puuid': puuid,
+                'leaguePoints': seed % 100,
+                'wins': wins,
+                'losses': losses,
+                'veteran': False,
+                'inactive': False,
+                'freshBlood': False,
+                'hotStreak': False
+            }]).encode()
+
+        match = re.match(r'^/lol/match/v5/matches/by-puuid/([^/]+)/ids$', path)
+        if match:
+            start = int(query.get('start', ['0'])[0])
+            count = min(int(query.get('count', ['20'])[0]), 100)
+            return 200, json.dumps(self.fixtures.match_ids_for(match.group(1), start, count)).encode()
+
+        match = re.match(r'^/lol/match/v5/matches/([^/]+)/timeline$', path)
+        if match:
+            return 200, self.fixtures.timeline(match.group(1))
+
+        match = re.match(r'^/lol/match/v5/matches/([^/]+)$', path)
+        if match:
+            return 200, self.fixtures.match(match.group(1))
+
+        match = re.match(r'^/lol/champion-mastery/v4/champion-masteries/by-puuid/([^/]+)(/top)?$', path)
+        if match:
+            puuid, top = match.groups()
+            count = int(query.get('count', ['3'])[0]) if top else len(COMMON_CHAMPION_IDS)
+            rng = random.Random(_seed(puuid))
+            champions = rng.sample(COMMON_CHAMPION_IDS, min(count, len(COMMON_CHAMPION_IDS)))
+            points = sorted((rng.randint(5_000, 900_000) for _ in champions), reverse=True)
+            return 200, json.dumps([{
+                'puuid': puuid,
+                'championId': champion_id,
+                'championLevel': min(7, 1 + champion_points // 50_000),
+                'championPoints': champion_points,
+                'lastPlayTime': 1_760_000_000_000
+            } for champion_id, champion_points in zip(champions, points)]).encode()
+
+        match = re.match(r'^/lol/spectator/v5/active-games/by-summoner/([^/]+)$', path)
+        if match:
+            # Roughly one in ten players is in a game at any time
+            puuid = match.group(1)
+            if _seed(puuid) % 10 != 0:
+                return 404, json.dumps({'status': {'message': 'Data not found', 'status_code': 404}}).encode()
+            return 200, json.dumps({
+                'gameId': _seed(puuid) % 10_000_000_000,
+                'gameMode': 'CLASSIC',
+                'gameQueueConfigId': 420,
+                'gameStartTime': int(time.time() * 1000) - 600_000,
+                'gameLength': 600,
+                'platformId': 'EUW1',
+                'participants': [{'puuid': puuid, 'teamId': 100, 'championId': COMMON_CHAMPION_IDS[0]}]
+            }).encode()
+
+        return 404, json.dumps({'status': {'message': 'Data not found - route', 'status_code': 404}}).encode()
+
+
+def make_handler(api: MockRiotAPI):
+    """Build a request handler class bound to api"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output clean
+
+        def _send(self, status: int, body: bytes, headers: Dict[str, str]):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json;charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+
+            if parsed.path == '/__stats':
+                with api.stats_lock:
+                    body = json.dumps(api.stats).encode()
+                self._send(200, body, {})
+                return
+
+            api.count('requests')
+
+            if not self.headers.get('X-Riot-Token'):
+                self._send(401, b'{"status": {"message": "Unauthorized", "status_code": 401}}', {})
+                return
+
+            # First path segment is the routing value (euw1, europe, ...)
+            segments = parsed.path.split('/', 2)
+            routing = segments[1] if len(segments) > 1 else ''
+            path = '/' + (segments[2] if len(segments) > 2 else '')
+
+            method = next((name for pattern, name in METHOD_PATTERNS if pattern.search(path)), path)
+            method_limits = METHOD_RATE_LIMITS.get(method, [])
+
+            allowed, app_counts, app_retry = api.limiter.hit(('app', routing), api.app_limits)
+            headers = {
+                'X-App-Rate-Limit': format_limits(api.app_limits),
+                'X-App-Rate-Limit-Count': ','.join(f"{c}:{w}" for c, (_, w) in zip(app_counts, api.app_limits)),
+            }
+            if not allowed:
+                api.count('rate_limited')
+                headers.update({'Retry-After': str(max(1, round(app_retry))), 'X-Rate-Limit-Type': 'application'})
+                self._send(429, b'{"status": {"message": "Rate limit exceeded", "status_code": 429}}', headers)
+                return
+
+            allowed, method_counts, method_retry = api.limiter.hit(('method', routing, method), method_limits)
+            headers.update({
+                'X-Method-Rate-Limit': format_limits(method_limits),
+                'X-Method-Rate-Limit-Count': ','.join(f"{c}:{w}" for c, (_, w) in zip(method_counts, method_limits)),
+            })
+            if not allowed:
+                api.count('rate_limited')
+                headers.update({'Retry-After': str(max(1, round(method_retry))), 'X-Rate-Limit-Type': 'method'})
+                self._send(429, b'{"status": {"message": "Rate limit exceeded", "status_code": 429}}', headers)
+                return
+
+            if api.latency_ms or api.jitter_ms:
+                delay_ms = max(0.0, random.gauss(api.latency_ms, api.jitter_ms)) if api.jitter_ms else api.latency_ms
+                time.sleep(delay_ms / 1000)
+
+            status, body = api.route(path, parse_qs(parsed.query))
+            api.count('served' if status == 200 else 'not_found')
+            api.count('bytes', len(body))
+            self._send(status, body, headers)
+
+    return Handler
+
+
+def start_server(host: str = '127.0.0.1', port: int = 8089, fixtures_dir: Optional[str] = None,
+                 app_limit: Optional[str] = None, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0) -> Tuple[ThreadingHTTPServer, MockRiotAPI]:
+    """
+    Start the mock server on a background thread
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        fixtures_dir: Directory with recorded <match_id>.json / <match_id>_timeline.json files
+            (and optionally index.json from synthetic_matches.py)
+        app_limit: App limit spec ("20:1,100:120"); defaults to the quota coordinator's limits
+        latency_ms: Mean added latency per request
+        jitter_ms: Standard deviation of the added latency
+
+    Returns:
+        Tuple of (server, api state); call server.shutdown() to stop
+    """
+    limits = _parse_limits(app_limit) if app_limit else APP_RATE_LIMITS
+    api = MockRiotAPI(FixtureStore(fixtures_dir), limits, latency_ms, jitter_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, api
+
+
+def main():
+    """Run the mock server in the foreground"""
+    parser = argparse.ArgumentParser(description='Offline Riot API mock server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--fixtures', help='Directory with recorded match/timeline JSON files')
+    parser.add_argument('--app-limit', help='App rate limit, e.g. "20:1,100:120"')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, api = start_server(args.host, args.port, args.fixtures, args.app_limit, args.latency_ms, args.jitter_ms)
+    print(f"[OK] Mock Riot API listening on http://{args.host}:{server.server_address[1]}")
+    print(f"  Base URL: RIOT_API_BASE_URL=\"http://{args.host}:{server.server_address[1]}/{{routing}}\"")
+    print(f"  App limit: {format_limits(api.app_limits)}")
+    print(f"  Latency: {args.latency_ms:g} ms (+/- {args.jitter_ms:g} ms)")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\n[INFO] Stopping. Stats: {api.stats}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Cached Solo/Duo tiers of match participants
+Tier filters on the cross-match aggregates need the rank of every participant, not only
+of the tracked player. Ranks are read from the players table (tracked players, kept fresh
+by the refresh daemon) and from participant_ranks; only participants missing from both or
+older than RANK_MAX_AGE_DAYS cost a league-v4 request, and the answer is cached for the
+next match they show up in.
+
+Usage:
+    from participant_ranks import cache_participant_ranks
+    ranks, requests_made = cache_participant_ranks(match_data)    # {puuid: tier}
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from supabase import create_client, Client
+
+from riot_api import get_ranked_stats_by_puuid
+
+# Load environment variables
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')
+
+# Initialize Supabase client
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Cached ranks older than this are looked up again
+RANK_MAX_AGE_DAYS = 14
+
+# Tier stored for participants without a Solo/Duo entry (so they are not looked up every match)
+UNRANKED = 'UNRANKED'
+
+# league-v4 lookups allowed per match (0 = cache only)
+RANK_LOOKUPS_PER_MATCH = 10
+
+
+def load_cached_ranks(puuids: List[str]) -> Dict[str, str]:
+    """
+    Known tiers of the given PUUIDs without any Riot API request
+
+    Args:
+        puuids: Participant PUUIDs
+
+    Returns:
+        {puuid: tier} for tracked players and fresh participant_ranks rows
+    """
+    if not puuids:
+        return {}
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=RANK_MAX_AGE_DAYS)).isoformat()
+    cached = supabase.table('participant_ranks').select('puuid, tier') \
+        .in_('puuid', puuids).gte('fetched_at', cutoff).execute()
+    ranks = {row['puuid']: row['tier'] for row in (cached.data or [])}
+
+    tracked = supabase.table('players').select('puuid, tier').in_('puuid', puuids).execute()
+    for row in tracked.data or []:
+        if row.get('tier'):
+            ranks[row['puuid']] = row['tier']
+    return ranks
+
+
+def cache_participant_ranks(match_data: dict, max_lookups: Optional[int] = None) -> Tuple[Dict[str, str], int]:
+    """
+    Tiers of a match's participants, looking up and caching the unknown ones
+
+    Args:
+        match_data: Match-v5 match document
+        max_lookups: league-v4 requests allowed (default RANK_LOOKUPS_PER_MATCH)
+
+    Returns:
+        ({puuid: tier} for every participant whose tier is known, Riot API requests made)
+    """
+    if max_lookups is None:
+        max_lookups = RANK_LOOKUPS_PER_MATCH
+    puuids = [p['puuid'] for p in match_data['info']['participants'] if p.get('puuid')]
+    ranks = load_cached_ranks(puuids)
+
+    missing = [puuid for puuid in puuids if puuid not in ranks][:max_lookups]
+    fetched = []
+    for puuid in missing:
+        entries = get_ranked_stats_by_puuid(puuid)
+        if entries is None:
+            continue
+        solo_queue = next((q for q in entries if q.get('queueType') == 'RANKED_SOLO_5x5'), None)
+        ranks[puuid] = solo_queue.get('tier') if solo_queue else UNRANKED
+        fetched.append({
+            'puuid': puuid,
+            'tier': ranks[puuid],
+            'division': solo_queue.get('rank') if solo_queue else None,
+            'lp': solo_queue.get('leaguePoints', 0) if solo_queue else 0,
+            'fetched_at': datetime.now(timezone.utc).isoformat(),
+        })
+
+    if fetched:
+        try:
+            supabase.table('participant_ranks').upsert(fetched, on_conflict='puuid').execute()
+        except Exception as e:
+            print(f"  [WARN] Failed to cache participant ranks: {e}")
+    return ranks, len(missing)
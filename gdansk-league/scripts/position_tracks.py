@@ -0,0 +1,212 @@
+"""
+Compact per-minute position/stat tracks for all ten participants of a match
+Encodes every timeline frame (x, y, level, gold, xp, CS) as delta-encoded int16/int32
+arrays, optionally zlib-compressed, into one blob stored in match_position_tracks.tracks.
+Replaces ~300 match_timeline_snapshots rows per match with a single ~3 KB bytea.
+
+Blob layout (little-endian):
+    header   magic 'PTRK', version u8, flags u8 (bit 0 = zlib body), participants u8,
+             frames u16, frame_interval_ms u32
+    body     timestamps (int32 deltas, one per frame), then for each channel in CHANNELS
+             and each participant 1..N: one delta per frame (first delta is from 0)
+
+Usage:
+    python position_tracks.py [timeline.json]    # size report + round-trip check
+"""
+
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, List, Tuple
+
+MAGIC = b'PTRK'
+VERSION = 1
+FLAG_ZLIB = 1
+HEADER = struct.Struct('<4sBBBHI')
+
+# (channel name, participantFrames key, array typecode)
+CHANNELS: List[Tuple[str, str, str]] = [
+    ('x', 'x', 'h'),
+    ('y', 'y', 'h'),
+    ('level', 'level', 'h'),
+    ('current_gold', 'currentGold', 'i'),
+    ('total_gold', 'totalGold', 'i'),
+    ('xp', 'xp', 'i'),
+    ('minions_killed', 'minionsKilled', 'h'),
+    ('jungle_minions_killed', 'jungleMinionsKilled', 'h'),
+]
+
+SAMPLE_TIMELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    '..', '..', 'backend', 'scripts', 'match_timeline_sample.json')
+
+
+def _delta(values: List[int], typecode: str) -> array:
+    """Delta-encode values into a little-endian array"""
+    encoded = array(typecode, [0] * len(values))
+    previous = 0
+    for index, value in enumerate(values):
+        encoded[index] = value - previous
+        previous = value
+    if sys.byteorder == 'big':
+        encoded.byteswap()
+    return encoded
+
+
+def _undelta(encoded: array) -> List[int]:
+    """Running sum of a delta-encoded array"""
+    if sys.byteorder == 'big':
+        encoded.byteswap()
+    values = []
+    total = 0
+    for delta in encoded:
+        total += delta
+        values.append(total)
+    return values
+
+
+def encode_tracks(timeline: dict, compress: bool = True) -> bytes:
+    """
+    Encode the per-frame participant state of a timeline
+
+    Missing participant frames (or positions) repeat the previous value.
+
+    Args:
+        timeline: Match-v5 timeline document (full or parse_timeline() projected)
+        compress: zlib-compress the body
+
+    Returns:
+        Track blob
+    """
+    frames = timeline['info']['frames']
+    frame_interval = timeline['info'].get('frameInterval', 60000)
+    participant_ids = sorted({int(pid) for frame in frames for pid in frame.get('participantFrames', {})})
+    participant_count = participant_ids[-1] if participant_ids else 0
+
+    body = bytearray(_delta([frame['timestamp'] for frame in frames], 'i').tobytes())
+    for name, key, typecode in CHANNELS:
+        for participant_id in range(1, participant_count + 1):
+            values = []
+            last = 0
+            for frame in frames:
+                participant_frame = frame.get('participantFrames', {}).get(str(participant_id))
+                if participant_frame is not None:
+                    source = (participant_frame.get('position') or {}) if name in ('x', 'y') else participant_frame
+                    value = source.get(key)
+                    if value is not None:
+                        last = value
+                values.append(last)
+            body += _delta(values, typecode).tobytes()
+
+    flags = 0
+    if compress:
+        body = zlib.compress(bytes(body), 9)
+        flags |= FLAG_ZLIB
+    header = HEADER.pack(MAGIC, VERSION, flags, participant_count, len(frames), frame_interval)
+    return header + bytes(body)
+
+
+def decode_tracks(blob: bytes) -> Dict:
+    """
+    Decode a track blob
+
+    Args:
+        blob: Output of encode_tracks (or from_bytea of the stored column)
+
+    Returns:
+        Dictionary with:
+        - frame_interval: Frame interval in ms
+        - timestamps: Frame timestamps in ms
+        - participants: {participant_id: {channel: [value per frame]}}
+    """
+    magic, version, flags, participant_count, frame_count, frame_interval = HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("Not a position track blob")
+    if version != VERSION:
+        raise ValueError(f"Unsupported position track version: {version}")
+
+    body = blob[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    offset = 0
+
+    def read(typecode: str) -> List[int]:
+        nonlocal offset
+        chunk = array(typecode)
+        size = chunk.itemsize * frame_count
+        chunk.frombytes(body[offset:offset + size])
+        offset += size
+        return _undelta(chunk)
+
+    timestamps = read('i')
+    participants: Dict[int, Dict[str, List[int]]] = {pid: {} for pid in range(1, participant_count + 1)}
+    for name, _, typecode in CHANNELS:
+        for participant_id in range(1, participant_count + 1):
+            participants[participant_id][name] = read(typecode)
+
+    return {
+        'frame_interval': frame_interval,
+        'timestamps': timestamps,
+        'participants': participants,
+    }
+
+
+def build_position_tracks_row(match_id: str, timeline: dict) -> dict:
+    """match_position_tracks row for a timeline"""
+    blob = encode_tracks(timeline)
+    return {
+        'match_id': match_id,
+        'encoding_version': VERSION,
+        'frame_count': len(timeline['info']['frames']),
+        'frame_interval_ms': timeline['info'].get('frameInterval', 60000),
+        'tracks': to_bytea(blob),
+    }
+
+
+def to_bytea(blob: bytes) -> str:
+    """PostgREST bytea literal for a blob"""
+    return '\\x' + blob.hex()
+
+
+def from_bytea(value: str) -> bytes:
+    """Blob from a bytea value returned by PostgREST"""
+    return bytes.fromhex(value[2:] if value.startswith('\\x') else value)
+
+
+def _report(path: str):
+    """Print encoded sizes against the JSON snapshot rows and verify the round trip"""
+    with open(path, 'r', encoding='utf-8') as f:
+        timeline = json.load(f)
+
+    from match_processing import build_timeline_snapshot_rows
+    snapshot_rows = build_timeline_snapshot_rows('report', timeline)
+    snapshot_bytes = len(json.dumps(snapshot_rows).encode('utf-8'))
+    raw = encode_tracks(timeline, compress=False)
+    packed = encode_tracks(timeline)
+
+    decoded = decode_tracks(packed)
+    mismatches = 0
+    for index, frame in enumerate(timeline['info']['frames']):
+        for pid_str, participant_frame in frame.get('participantFrames', {}).items():
+            track = decoded['participants'][int(pid_str)]
+            position = participant_frame.get('position') or {}
+            if position.get('x') is not None and (track['x'][index], track['y'][index]) != (position['x'], position['y']):
+                mismatches += 1
+            if track['total_gold'][index] != participant_frame.get('totalGold', track['total_gold'][index]):
+                mismatches += 1
+
+    print(f"Frames: {len(decoded['timestamps'])}, participants: {len(decoded['participants'])}")
+    print(f"match_timeline_snapshots: {len(snapshot_rows)} rows, {snapshot_bytes / 1024:.1f} KB JSON")
+    print(f"Delta-encoded:            {len(raw) / 1024:.1f} KB")
+    print(f"Delta + zlib:             {len(packed) / 1024:.1f} KB")
+    if mismatches:
+        print(f"[ERROR] {mismatches} values differ after decoding")
+        sys.exit(1)
+    print("[OK] Round trip matches the timeline")
+
+
+if __name__ == "__main__":
+    _report(sys.argv[1] if len(sys.argv) > 1 else SAMPLE_TIMELINE_FILE)
@@ -0,0 +1,489 @@
+"""
+Continuous refresh daemon
+Keeps player data fresh by spending the Riot quota steadily instead of in cron bursts.
+Work is ordered per job by staleness, recent play and recent profile views.
+Usage: python refresh_daemon.py
+
+Budgets (requests per minute per job) come from REFRESH_BUDGETS, e.g.
+    REFRESH_BUDGETS="rank=20,matches=40,icons=5,mastery=5"
+"""
+
+import heapq
+import math
+import os
+import signal
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from supabase import create_client, Client
+from riot_api import (
+    get_summoner_by_puuid, get_ranked_stats_by_puuid, get_match_history, get_champion_mastery, is_summoner_unchanged
+)
+
+# Load environment variables
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')
+
+# Initialize Supabase client
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Requests per minute each job may spend. rank/icons/mastery hit the platform host (euw1),
+# matches hits the continental host (europe); each host has its own app limit.
+DEFAULT_BUDGETS = "rank=20,matches=40,icons=5,mastery=5"
+
+# A job is not re-run for a player before this many hours have passed
+MIN_INTERVAL_HOURS = {
+    'rank': 1,
+    'matches': 1,
+    'icons': 24,
+    'mastery': 24,
+}
+
+# Extra hours of "staleness" granted for recent activity (decays over ACTIVITY_DECAY_HOURS)
+PLAYED_BONUS_HOURS = 48
+VIEWED_BONUS_HOURS = 24
+ACTIVITY_DECAY_HOURS = 24
+
+# How often the roster and refresh state are reloaded from the database
+RELOAD_INTERVAL_SECONDS = 300
+
+# Ranked games fetched per match-ingest run
+MATCHES_PER_RUN = 20
+
+# Jobs skipped while the summoner revisionDate is the same as when they last ran
+REVISION_GATED_JOBS = {'matches', 'mastery'}
+
+# Jobs whose handler is told the tokens available to the run (optional requests stay within them)
+BUDGETED_JOBS = {'matches'}
+
+# Parquet archive writer (match_archive.py), opened on first ingest when MATCH_ARCHIVE_DIR is set
+_archive = None
+
+
+def parse_budgets(spec: str) -> Dict[str, float]:
+    """
+    Parse "job=requests_per_minute" pairs
+
+    Args:
+        spec: Comma separated budgets, e.g. "rank=20,matches=40"
+
+    Returns:
+        Dictionary mapping job name to requests per minute
+    """
+    budgets = {}
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        job, value = part.split('=')
+        job = job.strip()
+        if job not in MIN_INTERVAL_HOURS:
+            raise ValueError(f"Unknown refresh job in REFRESH_BUDGETS: {job}")
+        budgets[job] = float(value)
+    return budgets
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Supabase timestamp string into an aware datetime"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _hours_since(value: Optional[datetime], now: datetime) -> Optional[float]:
+    """Hours between value and now, or None if value is unknown"""
+    if value is None:
+        return None
+    return (now - value).total_seconds() / 3600
+
+
+def calculate_priority(job: str, player: Dict, state: Optional[Dict], now: datetime) -> Optional[float]:
+    """
+    Priority of running job for player (higher runs first)
+
+    Args:
+        job: Job name
+        player: Player row with last_fetched_at, last_match_at, last_viewed_at, summoner_revision_date
+        state: Refresh state row for (player, job) with last_run_at and revision_date, if any
+        now: Current time
+
+    Returns:
+        Priority score, or None if the job ran too recently or nothing changed since it ran
+    """
+    last_run_at = state['last_run_at'] if state else None
+
+    # Summoner untouched since the job last ran: nothing new to fetch
+    revision = player.get('summoner_revision_date')
+    if job in REVISION_GATED_JOBS and state and revision is not None and state.get('revision_date') == revision:
+        return None
+
+    if last_run_at is None and job == 'rank':
+        last_run_at = _parse_timestamp(player.get('last_fetched_at'))
+
+    staleness = _hours_since(last_run_at, now)
+    if staleness is None:
+        # Never refreshed: ahead of everything else
+        return math.inf
+    if staleness < MIN_INTERVAL_HOURS[job]:
+        return None
+
+    priority = staleness
+
+    played_ago = _hours_since(_parse_timestamp(player.get('last_match_at')), now)
+    if played_ago is not None:
+        priority += PLAYED_BONUS_HOURS * math.exp(-played_ago / ACTIVITY_DECAY_HOURS)
+
+    viewed_ago = _hours_since(_parse_timestamp(player.get('last_viewed_at')), now)
+    if viewed_ago is not None:
+        priority += VIEWED_BONUS_HOURS * math.exp(-viewed_ago / ACTIVITY_DECAY_HOURS)
+
+    return priority
+
+
+def load_players() -> List[Dict]:
+    """Fetch the roster with the activity columns used for prioritisation"""
+    response = supabase.table('players').select(
+        'id, summoner_name, puuid, tier, wins, losses, last_fetched_at, last_match_at, last_viewed_at, '
+        'summoner_revision_date'
+    ).execute()
+    return response.data or []
+
+
+def load_refresh_state() -> Dict[Tuple[str, str], Dict]:
+    """
+    Fetch last run time and summoner revision for every (player_id, job)
+
+    Returns:
+        Dictionary mapping (player_id, job) to {'last_run_at', 'revision_date'}
+    """
+    response = supabase.table('player_refresh_state').select('player_id, job, last_run_at, revision_date').execute()
+    return {
+        (row['player_id'], row['job']): {
+            'last_run_at': _parse_timestamp(row['last_run_at']),
+            'revision_date': row.get('revision_date')
+        }
+        for row in (response.data or [])
+    }
+
+
+def mark_refreshed(player_id: str, job: str, revision_date: Optional[int]):
+    """Record a successful job run for a player, with the summoner revision it saw"""
+    supabase.table('player_refresh_state').upsert({
+        'player_id': player_id,
+        'job': job,
+        'last_run_at': datetime.now(timezone.utc).isoformat(),
+        'revision_date': revision_date
+    }, on_conflict='player_id,job').execute()
+
+
+def refresh_rank(player: Dict) -> int:
+    """
+    Refresh summoner level, icon and Solo/Duo rank
+    League-v4 is skipped when the summoner revisionDate has not changed
+
+    Returns:
+        Number of Riot API requests made
+    """
+    summoner = get_summoner_by_puuid(player['puuid'])
+    if not summoner:
+        return 1
+
+    revision = summoner.get('revisionDate')
+    if is_summoner_unchanged(summoner, player.get('summoner_revision_date')):
+        print(f"  [SKIP] Unchanged since revision {revision}")
+        supabase.table('players').update({
+            'last_fetched_at': datetime.now(timezone.utc).isoformat()
+        }).eq('id', player['id']).execute()
+        return 1
+
+    player['summoner_revision_date'] = revision
+    ranked_stats = get_ranked_stats_by_puuid(player['puuid']) or []
+    solo_queue = next((q for q in ranked_stats if q.get('queueType') == 'RANKED_SOLO_5x5'), None)
+
+    update = {
+        'summoner_level': summoner.get('summonerLevel', 0),
+        'profile_icon_id': summoner.get('profileIconId', 0),
+        'summoner_revision_date': revision,
+        'last_fetched_at': datetime.now(timezone.utc).isoformat()
+    }
+
+    if solo_queue:
+        wins = solo_queue.get('wins', 0)
+        losses = solo_queue.get('losses', 0)
+        update.update({
+            'tier': solo_queue.get('tier'),
+            'rank': solo_queue.get('rank'),
+            'lp': solo_queue.get('leaguePoints', 0),
+            'wins': wins,
+            'losses': losses,
+            'winrate': round(wins / max(wins + losses, 1) * 100, 1)
+        })
+
+        # New games since the last rank refresh: bump the player in the match-ingest queue
+        if wins + losses > (player.get('wins') or 0) + (player.get('losses') or 0):
+            update['last_match_at'] = datetime.now(timezone.utc).isoformat()
+
+    supabase.table('players').update(update).eq('id', player['id']).execute()
+    return 2
+
+
+def refresh_icon(player: Dict) -> int:
+    """
+    Refresh profile icon
+    players.summoner_revision_date belongs to the rank job and is only read here: advancing
+    it would make the next rank refresh skip league-v4 for a summoner that did change.
+
+    Returns:
+        Number of Riot API requests made
+    """
+    summoner = get_summoner_by_puuid(player['puuid'])
+    if summoner and not is_summoner_unchanged(summoner, player.get('summoner_revision_date')):
+        supabase.table('players').update({
+            'profile_icon_id': summoner.get('profileIconId', 29)
+        }).eq('id', player['id']).execute()
+    return 1
+
+
+def refresh_mastery(player: Dict) -> int:
+    """
+    Refresh top 3 champion mastery
+
+    Returns:
+        Number of Riot API requests made
+    """
+    top_champions = get_champion_mastery(player['puuid'], count=3)
+    if top_champions:
+        update = {}
+        for idx, champ in enumerate(top_champions[:3], 1):
+            update[f'top_champion_{idx}_id'] = champ['championId']
+            update[f'top_champion_{idx}_points'] = champ['championPoints']
+        supabase.table('players').update(update).eq('id', player['id']).execute()
+    return 1
+
+
+def ingest_matches(player: Dict, budget: Optional[float] = None) -> int:
+    """
+    Ingest ranked matches not yet stored for the player (or stored without the timeline columns)
+
+    Args:
+        player: Player row
+        budget: Tokens the scheduler has for this run; participant rank lookups only spend what
+            is left after the match fetches (None = up to RANK_LOOKUPS_PER_MATCH per match)
+
+    Returns:
+        Number of Riot API requests made
+    """
+    # Imported lazily: the ingest module is only needed when this job has budget
+    from repopulate_ranked_data import (
+        get_match_data, get_match_timeline, store_match_stats, store_analytics, store_position_tracks, store_teamfights,
+        store_match_aggregates, store_objectives, store_jungle_paths
+    )
+    from timeline_engine import run_stages
+    from timeline_stages import ingest_stages
+    from match_processing import aggregate_match_analytics
+    from participant_ranks import RANK_LOOKUPS_PER_MATCH, cache_participant_ranks
+    global _archive
+    if _archive is None and os.getenv('MATCH_ARCHIVE_DIR'):
+        from match_archive import open_archive_from_env
+        _archive = open_archive_from_env()
+
+    match_ids = get_match_history(player['puuid'], count=MATCHES_PER_RUN, queue_type=420)
+    requests_made = 1
+    if not match_ids:
+        return requests_made
+
+    # Rows stored before the timeline columns existed (teamfights NULL) are ingested again to fill them
+    existing = supabase.table('match_stats').select('match_id') \
+        .eq('player_id', player['id']).in_('match_id', match_ids).not_.is_('teamfights', 'null').execute()
+    stored_ids = {row['match_id'] for row in (existing.data or [])}
+    new_ids = [match_id for match_id in match_ids if match_id not in stored_ids]
+
+    # Requests left for participant rank lookups once every new match is fetched
+    spare = math.inf if budget is None else budget - requests_made - 2 * len(new_ids)
+
+    latest_game = None
+    for match_id in new_ids:
+        match_data = get_match_data(match_id)
+        timeline = get_match_timeline(match_id)
+        requests_made += 2
+
+        stage_results = run_stages(match_data, timeline, ingest_stages())
+        store_match_stats(match_data, player['puuid'], stage_results)
+        store_analytics(aggregate_match_analytics(match_id, match_data, timeline, player['puuid']), stage_results)
+        store_position_tracks(match_id, timeline)
+        store_teamfights(match_id, stage_results['teamfights'])
+        store_objectives(match_data, stage_results['objectives'])
+        store_jungle_paths(match_data, stage_results['jungle_paths'])
+        ranks, rank_requests = cache_participant_ranks(match_data, int(max(0, min(RANK_LOOKUPS_PER_MATCH, spare))))
+        requests_made += rank_requests
+        spare -= rank_requests
+        store_match_aggregates(match_data, stage_results, player.get('tier'), ranks)
+        if _archive:
+            _archive.add(match_data, timeline)
+
+        game_creation = match_data['info']['gameCreation']
+        latest_game = max(latest_game or 0, game_creation)
+
+    # The daemon runs for days: write this run's matches now rather than when the buffer fills,
+    # so a crash or kill loses at most the match being ingested
+    if _archive:
+        _archive.flush()
+
+    if new_ids:
+        from update_heatmap_tiles import update_player as update_heatmap_tiles
+        from update_death_hotspots import update_player as update_death_hotspots
+        from update_ward_timing import update_player as update_ward_timing
+        update_heatmap_tiles(player)
+        update_death_hotspots(player)
+        update_ward_timing(player)
+
+    if latest_game:
+        supabase.table('players').update({
+            'last_match_at': datetime.fromtimestamp(latest_game / 1000, tz=timezone.utc).isoformat()
+        }).eq('id', player['id']).execute()
+
+    print(f"  [OK] {len(new_ids)} new matches ingested")
+    return requests_made
+
+
+# Job name -> (handler, estimated requests per run)
+JOBS: Dict[str, Tuple[Callable[..., int], int]] = {
+    'rank': (refresh_rank, 2),
+    'matches': (ingest_matches, 1 + 2 * 3),
+    'icons': (refresh_icon, 1),
+    'mastery': (refresh_mastery, 1),
+}
+
+
+class RefreshScheduler:
+    """Per-job priority queues drained at a fixed request budget"""
+
+    def __init__(self, budgets: Dict[str, float]):
+        self.budgets = budgets
+        # Token buckets in requests; up to one minute of budget can be banked
+        self.tokens = {job: 0.0 for job in budgets}
+        self.queues: Dict[str, List[Tuple[float, str]]] = {job: [] for job in budgets}
+        self.players: Dict[str, Dict] = {}
+        self.last_refill = time.monotonic()
+        self.last_reload = 0.0
+        self.runs = {job: 0 for job in budgets}
+
+    def reload(self):
+        """Rebuild every job queue from the current roster and refresh state"""
+        now = datetime.now(timezone.utc)
+        players = load_players()
+        state = load_refresh_state()
+        self.players = {player['id']: player for player in players}
+
+        for job in self.budgets:
+            queue = []
+            for player in players:
+                priority = calculate_priority(job, player, state.get((player['id'], job)), now)
+                if priority is not None:
+                    queue.append((-priority, player['id']))
+            heapq.heapify(queue)
+            self.queues[job] = queue
+
+        self.last_reload = time.monotonic()
+        pending = ", ".join(f"{job}: {len(queue)}" for job, queue in self.queues.items())
+        print(f"[OK] Loaded {len(players)} players (pending {pending})")
+
+    def refill(self):
+        """Add tokens for the time elapsed since the last refill"""
+        now = time.monotonic()
+        elapsed_minutes = (now - self.last_refill) / 60
+        self.last_refill = now
+        for job, per_minute in self.budgets.items():
+            cap = max(per_minute, JOBS[job][1])
+            self.tokens[job] = min(self.tokens[job] + per_minute * elapsed_minutes, cap)
+
+    def next_job(self) -> Optional[str]:
+        """Job with pending work and enough tokens, preferring the fullest bucket"""
+        ready = [
+            job for job in self.budgets
+            if self.queues[job] and self.tokens[job] >= JOBS[job][1]
+        ]
+        if not ready:
+            return None
+        return max(ready, key=lambda job: self.tokens[job] / max(self.budgets[job], 1e-9))
+
+    def run_once(self) -> bool:
+        """
+        Run at most one job
+
+        Returns:
+            True if a job ran, False if the daemon should wait for tokens
+        """
+        if time.monotonic() - self.last_reload > RELOAD_INTERVAL_SECONDS:
+            self.reload()
+
+        self.refill()
+        job = self.next_job()
+        if job is None:
+            return False
+
+        _, player_id = heapq.heappop(self.queues[job])
+        player = self.players[player_id]
+        handler, _ = JOBS[job]
+
+        print(f"[{job}] {player['summoner_name']}")
+        try:
+            if job in BUDGETED_JOBS:
+                requests_made = handler(player, budget=self.tokens[job])
+            else:
+                requests_made = handler(player)
+            mark_refreshed(player_id, job, player.get('summoner_revision_date'))
+            self.runs[job] += 1
+        except Exception as e:
+            print(f"  [ERROR] {job} refresh failed: {e}")
+            requests_made = JOBS[job][1]
+
+        # Charge what was actually spent; the bucket may go into debt after a big ingest
+        self.tokens[job] -= requests_made
+        return True
+
+    def run_forever(self):
+        """Main loop; stops on Ctrl+C or SIGTERM"""
+        self.reload()
+        signal.signal(signal.SIGTERM, _stop_on_sigterm)
+        try:
+            while True:
+                if not self.run_once():
+                    time.sleep(1)
+        except KeyboardInterrupt:
+            print("\n[INFO] Stopping refresh daemon")
+            for job, count in self.runs.items():
+                print(f"  {job}: {count} players refreshed")
+        finally:
+            if _archive:
+                _archive.close()
+                print(f"[OK] {_archive.written} matches archived to {_archive.root} ({_archive.skipped} already archived)")
+
+
+def _stop_on_sigterm(signum, frame):
+    """Handle SIGTERM (service stop) like Ctrl+C, so run_forever closes the archive writer"""
+    raise KeyboardInterrupt
+
+
+def main():
+    """Main function"""
+    budgets = parse_budgets(os.getenv('REFRESH_BUDGETS', DEFAULT_BUDGETS))
+
+    print("=" * 60)
+    print("  Continuous Refresh Daemon")
+    print("=" * 60)
+    for job, per_minute in budgets.items():
+        print(f"  {job}: {per_minute:g} requests/min")
+    print()
+
+    RefreshScheduler(budgets).run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Replay harness: run the ingestion request flow against the mock Riot API
+Measures end-to-end throughput (requests/s, matches/s) and time spent waiting
+on the shared quota, with no network access or production API key needed.
+Usage: python replay_harness.py --players 20 --matches 10 --processes 2 --latency-ms 40
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from multiprocessing import Pool
+from typing import Dict, List
+
+import requests
+
+
+def _configure_quota(app_limit: str):
+    """Give the run its own quota ledger and limits (must happen before riot_quota is imported)"""
+    os.environ['RIOT_APP_RATE_LIMIT'] = app_limit
+    os.environ['RIOT_QUOTA_DB'] = os.path.join(tempfile.mkdtemp(prefix='riot_replay_'), 'quota.sqlite3')
+
+
+def replay_players(player_indices: List[int], match_count: int) -> Dict:
+    """
+    Run account -> summoner -> league -> match ids -> match + timeline for each player
+
+    Args:
+        player_indices: Mock players to replay (MockPlayer<index>#EUW)
+        match_count: Matches to fetch per player
+
+    Returns:
+        Dictionary of request, match and quota-wait totals for this worker
+    """
+    # Imported here so the environment set by the parent applies to the worker too
+    import riot_api
+    import riot_quota
+
+    totals = {'requests': 0, 'matches': 0, 'failures': 0, 'quota_wait': 0.0}
+    original_acquire = riot_quota.acquire
+
+    def counting_acquire(host: str, method: str) -> float:
+        waited = original_acquire(host, method)
+        totals['requests'] += 1
+        totals['quota_wait'] += waited
+        return waited
+
+    # riot_api imported acquire_for_url by name, which calls riot_quota.acquire
+    riot_quota.acquire = counting_acquire
+
+    with redirect_stdout(io.StringIO()):
+        for index in player_indices:
+            account = riot_api.get_account_by_riot_id(f"MockPlayer{index}", 'EUW')
+            if not account:
+                totals['failures'] += 1
+                continue
+            puuid = account['puuid']
+
+            riot_api.get_summoner_by_puuid(puuid)
+            riot_api.get_ranked_stats_by_puuid(puuid)
+
+            for match_id in riot_api.get_match_history(puuid, count=match_count) or []:
+                match = riot_api.get_match_details(match_id)
+                timeline = riot_api.get_match_timeline(match_id)
+                if match and timeline:
+                    totals['matches'] += 1
+                else:
+                    totals['failures'] += 1
+
+    return totals
+
+
+def _run_worker(args) -> Dict:
+    """Pool entry point"""
+    player_indices, match_count = args
+    return replay_players(player_indices, match_count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay the ingestion flow against the mock Riot API')
+    parser.add_argument('--players', type=int, default=10, help='Number of mock players to replay')
+    parser.add_argument('--matches', type=int, default=5, help='Matches per player')
+    parser.add_argument('--processes', type=int, default=1, help='Concurrent worker processes sharing the quota')
+    parser.add_argument('--app-limit', default='500:10,30000:600', help='App rate limit for both mock and quota')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Mean mock latency per request')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Mock latency standard deviation')
+    parser.add_argument('--fixtures', help='Directory with recorded match/timeline JSON files')
+    parser.add_argument('--base-url', help='Use an already running mock, e.g. http://127.0.0.1:8089/{routing}')
+    args = parser.parse_args()
+
+    _configure_quota(args.app_limit)
+    from mock_riot_server import start_server
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        server, _ = start_server(port=0, fixtures_dir=args.fixtures, app_limit=args.app_limit,
+                                 latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/{{routing}}"
+
+    # riot_api reads these at import time, which happens inside the workers
+    os.environ['RIOT_API_BASE_URL'] = base_url
+    os.environ['RIOT_API_KEY'] = 'RGAPI-mock'
+    stats_url = base_url.replace('/{routing}', '') + '/__stats'
+
+    print("=" * 60)
+    print("RIOT API REPLAY")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    print(f"Players: {args.players}, matches/player: {args.matches}, processes: {args.processes}")
+    print(f"App limit: {args.app_limit}, latency: {args.latency_ms:g} ms\n")
+
+    stats_before = requests.get(stats_url, timeout=5).json()
+
+    chunks = [list(range(i, args.players, args.processes)) for i in range(args.processes)]
+    jobs = [(chunk, args.matches) for chunk in chunks if chunk]
+
+    start = time.perf_counter()
+    if len(jobs) == 1:
+        results = [_run_worker(jobs[0])]
+    else:
+        with Pool(len(jobs)) as pool:
+            results = pool.map(_run_worker, jobs)
+    elapsed = time.perf_counter() - start
+
+    stats_after = requests.get(stats_url, timeout=5).json()
+    if server:
+        server.shutdown()
+
+    total_requests = sum(r['requests'] for r in results)
+    total_matches = sum(r['matches'] for r in results)
+    total_failures = sum(r['failures'] for r in results)
+    quota_wait = sum(r['quota_wait'] for r in results)
+    rate_limited = stats_after['rate_limited'] - stats_before['rate_limited']
+    megabytes = (stats_after['bytes'] - stats_before['bytes']) / 1024 / 1024
+
+    print("=" * 60)
+    print("RESULTS")
+    print("=" * 60)
+    print(f"Wall time: {elapsed:.2f}s")
+    print(f"Requests: {total_requests} ({total_requests / elapsed:.1f}/s)")
+    print(f"Matches (details + timeline): {total_matches} ({total_matches / elapsed:.2f}/s)")
+    print(f"Downloaded: {megabytes:.1f} MB")
+    print(f"Quota wait (summed over processes): {quota_wait:.2f}s")
+    print(f"429 responses from mock: {rate_limited}")
+    print(f"Failures: {total_failures}")
+
+    if rate_limited:
+        print("[WARN] Quota coordinator let requests through that the mock rejected")
+    if total_failures:
+        print("[ERROR] Some requests failed")
+        sys.exit(1)
+    print("[OK] Replay complete")
+
+    print(json.dumps({
+        'elapsed_seconds': round(elapsed, 3),
+        'requests_per_second': round(total_requests / elapsed, 2),
+        'matches_per_second': round(total_matches / elapsed, 3),
+        'quota_wait_seconds': round(quota_wait, 3),
+        'rate_limited': rate_limited
+    }))
+
+
+if __name__ == "__main__":
+    main()
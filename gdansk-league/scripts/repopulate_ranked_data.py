@@ -4,220 +4,80 @@ Usage: python repopulate_ranked_data.py
 """
 
 import os
-import time
-import requests
+from typing import Dict, Optional, Set
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from riot_api import CONTINENT, riot_get
+from match_aggregates import (
+    build_stats_increments, champion_meta_increments, matchup_increments, skill_order_increments, teammate_increments
+)
+from match_processing import aggregate_match_analytics, build_match_stats_row, get_season_fields
+from participant_ranks import cache_participant_ranks
+from position_tracks import build_position_tracks_row
+from riot_models import match_from_dict
+from timeline_engine import required_event_types, run_stages
+from timeline_parser import DEFAULT_EVENT_TYPES, parse_timeline
+from timeline_stages import analytics_timeline_columns, ingest_stages, match_stats_timeline_columns
 
 # Load environment variables
 load_dotenv(override=True)
 
-RIOT_API_KEY = os.getenv('RIOT_API_KEY')
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')
 
 # Initialize Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Riot API endpoints
-ACCOUNT_V1_BASE = "https://europe.api.riotgames.com"
-MATCH_V5_BASE = "https://europe.api.riotgames.com"
-
 def get_puuid(game_name: str, tag_line: str) -> str:
     """Get PUUID from Riot ID"""
-    url = f"{ACCOUNT_V1_BASE}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-    headers = {"X-Riot-Token": RIOT_API_KEY}
-
     print(f"Fetching PUUID for {game_name}#{tag_line}...")
-    response = requests.get(url, headers=headers)
+    data = riot_get(CONTINENT, f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}")
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to get PUUID: {response.status_code} - {response.text}")
+    if data is None:
+        raise Exception(f"Failed to get PUUID for {game_name}#{tag_line}")
 
-    data = response.json()
     puuid = data['puuid']
     print(f"[OK] Found PUUID: {puuid}")
     return puuid
 
 def get_match_ids(puuid: str, count: int = 100, queue_id: int = 420) -> list:
     """Get recent match IDs for a player (filtered by queue)"""
-    url = f"{MATCH_V5_BASE}/lol/match/v5/matches/by-puuid/{puuid}/ids"
     params = {
         "start": 0,
         "count": count,
         "queue": queue_id  # Only get ranked solo/duo
     }
-    headers = {"X-Riot-Token": RIOT_API_KEY}
 
     print(f"Fetching up to {count} RANKED SOLO/DUO match IDs...")
-    response = requests.get(url, headers=headers, params=params)
+    match_ids = riot_get(CONTINENT, f"/lol/match/v5/matches/by-puuid/{puuid}/ids", params=params)
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to get match IDs: {response.status_code} - {response.text}")
+    if match_ids is None:
+        raise Exception(f"Failed to get match IDs for {puuid}")
 
-    match_ids = response.json()
     print(f"[OK] Found {len(match_ids)} ranked solo/duo matches")
     return match_ids
 
 def get_match_data(match_id: str) -> dict:
     """Get match data"""
-    url = f"{MATCH_V5_BASE}/lol/match/v5/matches/{match_id}"
-    headers = {"X-Riot-Token": RIOT_API_KEY}
-
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(f"Failed to get match data: {response.status_code}")
+    match_data = riot_get(CONTINENT, f"/lol/match/v5/matches/{match_id}")
+    if match_data is None:
+        raise Exception(f"Failed to get match data for {match_id}")
 
-    return response.json()
+    return match_data
 
 def get_match_timeline(match_id: str) -> dict:
     """Get timeline data for a specific match"""
-    url = f"{MATCH_V5_BASE}/lol/match/v5/matches/{match_id}/timeline"
-    headers = {"X-Riot-Token": RIOT_API_KEY}
-
     print(f"  Fetching timeline...")
-    response = requests.get(url, headers=headers)
-
-    if response.status_code != 200:
-        raise Exception(f"Failed to get timeline: {response.status_code} - {response.text}")
-
-    return response.json()
-
-def find_participant_id(match_data: dict, target_puuid: str) -> int:
-    """Find the participant ID for the target player"""
-    for participant in match_data['info']['participants']:
-        if participant['puuid'] == target_puuid:
-            return participant['participantId']
-    raise Exception(f"Player {target_puuid} not found in match")
-
-def get_champion_name(match_data: dict, participant_id: int) -> str:
-    """Get champion name for a participant"""
-    for participant in match_data['info']['participants']:
-        if participant['participantId'] == participant_id:
-            return participant['championName']
-    return "Unknown"
-
-def aggregate_match_analytics(match_id: str, match_data: dict, timeline: dict, target_puuid: str) -> dict:
-    """Aggregate all analytics for a player in a match"""
-
-    # Find player's participant ID
-    participant_id = find_participant_id(match_data, target_puuid)
-
-    # Get queue_id and team_id from match data
-    queue_id = match_data['info'].get('queueId', 420)
-
-    # Get team_id from participant info
-    team_id = None
-    for participant in match_data['info']['participants']:
-        if participant['puuid'] == target_puuid:
-            team_id = participant.get('teamId', 100)
-            break
-
-    analytics = {
-        'match_id': match_id,
-        'player_puuid': target_puuid,
-        'participant_id': participant_id,
-        'queue_id': queue_id,
-        'team_id': team_id,
-        'deaths': [],
-        'kills': [],
-        'assists': [],
-        'elite_monster_kills': [],
-        'building_kills': [],
-        'position_timeline': []
-    }
+    # Only the fields and events the analytics and ingest stages read are decoded
+    timeline = riot_get(
+        CONTINENT, f"/lol/match/v5/matches/{match_id}/timeline",
+        decoder=lambda content: parse_timeline(content, DEFAULT_EVENT_TYPES | required_event_types(ingest_stages()))
+    )
+
+    if timeline is None:
+        raise Exception(f"Failed to get timeline for {match_id}")
 
-    # Process all frames for events and position snapshots
-    for frame in timeline['info']['frames']:
-        timestamp = frame['timestamp']
-
-        # Extract position at 5-minute intervals
-        if timestamp % 300000 == 0 or timestamp == 0:
-            participant_frames = frame.get('participantFrames', {})
-            player_frame = participant_frames.get(str(participant_id))
-
-            if player_frame and 'position' in player_frame:
-                position = player_frame['position']
-                if position.get('x') is not None:
-                    analytics['position_timeline'].append({
-                        'timestamp': timestamp,
-                        'x': position['x'],
-                        'y': position['y'],
-                        'level': player_frame.get('level'),
-                        'total_gold': player_frame.get('totalGold'),
-                        'current_gold': player_frame.get('currentGold'),
-                        'cs': player_frame.get('minionsKilled', 0),
-                        'jungle_cs': player_frame.get('jungleMinionsKilled', 0)
-                    })
-
-        # Process events
-        if 'events' not in frame:
-            continue
-
-        for event in frame['events']:
-            event_type = event.get('type')
-            position = event.get('position', {})
-
-            # CHAMPION_KILL events
-            if event_type == 'CHAMPION_KILL':
-                killer_id = event.get('killerId')
-                victim_id = event.get('victimId')
-                assisting_ids = event.get('assistingParticipantIds', [])
-
-                # Death (player is victim)
-                if victim_id == participant_id:
-                    analytics['deaths'].append({
-                        'x': position.get('x'),
-                        'y': position.get('y'),
-                        'timestamp': timestamp,
-                        'killer_champion': get_champion_name(match_data, killer_id) if killer_id else None,
-                        'assisting_champions': [get_champion_name(match_data, aid) for aid in assisting_ids]
-                    })
-
-                # Kill (player is killer)
-                if killer_id == participant_id:
-                    analytics['kills'].append({
-                        'x': position.get('x'),
-                        'y': position.get('y'),
-                        'timestamp': timestamp,
-                        'victim_champion': get_champion_name(match_data, victim_id),
-                        'assisting_champions': [get_champion_name(match_data, aid) for aid in assisting_ids]
-                    })
-
-                # Assist (player assisted)
-                if participant_id in assisting_ids:
-                    analytics['assists'].append({
-                        'x': position.get('x'),
-                        'y': position.get('y'),
-                        'timestamp': timestamp,
-                        'killer_champion': get_champion_name(match_data, killer_id) if killer_id else None,
-                        'victim_champion': get_champion_name(match_data, victim_id)
-                    })
-
-            # ELITE_MONSTER_KILL (dragons, baron, rift herald)
-            elif event_type == 'ELITE_MONSTER_KILL':
-                if event.get('killerId') == participant_id:
-                    analytics['elite_monster_kills'].append({
-                        'type': event.get('monsterType'),
-                        'subtype': event.get('monsterSubType'),
-                        'x': position.get('x'),
-                        'y': position.get('y'),
-                        'timestamp': timestamp
-                    })
-
-            # BUILDING_KILL (towers, inhibitors)
-            elif event_type == 'BUILDING_KILL':
-                if event.get('killerId') == participant_id:
-                    analytics['building_kills'].append({
-                        'type': event.get('buildingType'),
-                        'lane': event.get('laneType'),
-                        'tower_type': event.get('towerType'),
-                        'x': position.get('x'),
-                        'y': position.get('y'),
-                        'timestamp': timestamp
-                    })
-
-    return analytics
+    return timeline
 
 def get_or_create_player(puuid: str) -> str:
     """Get player_id from players table"""
@@ -233,13 +93,10 @@ def get_or_create_player(puuid: str) -> str:
         print(f"[WARN] Could not lookup player: {e}")
         return None
 
-def store_match_stats(match_data: dict, target_puuid: str):
-    """Store match stats in match_stats table"""
-    participant = None
-    for p in match_data['info']['participants']:
-        if p['puuid'] == target_puuid:
-            participant = p
-            break
+def store_match_stats(match_data: dict, target_puuid: str, stage_results: Optional[dict] = None):
+    """Store match stats in match_stats table (plus timeline columns when stage_results are given)"""
+    match = match_from_dict(match_data)
+    participant = match.participant_by_puuid(target_puuid)
 
     if not participant:
         print("[WARN] Participant not found, skipping match_stats")
@@ -249,109 +106,152 @@ def store_match_stats(match_data: dict, target_puuid: str):
     if not player_id:
         return
 
-    # Map role from API to database format
-    role_mapping = {
-        'TOP': 'TOP',
-        'JUNGLE': 'JUNGLE',
-        'MIDDLE': 'MID',
-        'BOTTOM': 'ADC',
-        'UTILITY': 'SUPPORT'
-    }
-    role = role_mapping.get(participant.get('teamPosition'), 'MID')
-
-    game_duration_seconds = match_data['info']['gameDuration']
-    game_duration_minutes = game_duration_seconds / 60
-
-    # Extract match date and season
-    from datetime import datetime
-    game_creation_ms = match_data['info']['gameCreation']
-    match_date = datetime.fromtimestamp(game_creation_ms / 1000)
-
-    # Extract season from game version
-    game_version = match_data['info']['gameVersion']
-    version_parts = game_version.split('.')
-    season = int(version_parts[0])
-    patch_number = int(version_parts[1])
-    patch = f"{season}.{patch_number}"
-
-    # Calculate split
-    if patch_number <= 8:
-        split_number = 1
-        split_name = "Welcome to Noxus"
-    elif patch_number <= 16:
-        split_number = 2
-        split_name = "Spirit Blossom Beyond"
-    else:
-        split_number = 3
-        split_name = "Trials of Twilight"
-
-    match_stats = {
-        'match_id': match_data['metadata']['matchId'],
-        'player_id': player_id,
-        'champion_id': participant['championId'],
-        'champion_name': participant['championName'],
-        'role': role,
-        'team_id': participant.get('teamId', 100),
-        'game_duration': game_duration_seconds,
-        'win': participant['win'],
-        'match_date': match_date.isoformat(),
-        'season': season,
-        'split_number': split_number,
-        'split_name': split_name,
-        'patch': patch,
-        'kills': participant['kills'],
-        'deaths': participant['deaths'],
-        'assists': participant['assists'],
-        'total_minions_killed': participant.get('totalMinionsKilled', 0),
-        'neutral_minions_killed': participant.get('neutralMinionsKilled', 0),
-        'cs_per_minute': round(participant.get('totalMinionsKilled', 0) / game_duration_minutes, 2) if game_duration_minutes > 0 else 0,
-        'total_damage_to_champions': participant.get('totalDamageDealtToChampions', 0),
-        'damage_per_minute': round(participant.get('totalDamageDealtToChampions', 0) / game_duration_minutes, 2) if game_duration_minutes > 0 else 0,
-        'damage_share': participant.get('challenges', {}).get('teamDamagePercentage', 0),
-        'total_damage_taken': participant.get('totalDamageTaken', 0),
-        'damage_self_mitigated': participant.get('damageSelfMitigated', 0),
-        'gold_earned': participant.get('goldEarned', 0),
-        'vision_score': participant.get('visionScore', 0),
-        'vision_score_per_minute': round(participant.get('visionScore', 0) / game_duration_minutes, 2) if game_duration_minutes > 0 else 0,
-        'wards_placed': participant.get('wardsPlaced', 0),
-        'wards_killed': participant.get('wardsKilled', 0),
-        'control_wards_purchased': participant.get('visionWardsBoughtInGame', 0),
-        'damage_to_turrets': participant.get('damageDealtToTurrets', 0),
-        'damage_to_objectives': participant.get('damageDealtToObjectives', 0),
-        'turret_plates_taken': participant.get('challenges', {}).get('turretPlatesTaken', 0),
-        'turrets_killed': participant.get('turretKills', 0),
-        'dragon_kills': participant.get('dragonKills', 0),
-        'baron_kills': participant.get('baronKills', 0),
-        'rift_herald_kills': participant.get('challenges', {}).get('riftHeraldTakedowns', 0),
-        'time_ccing_others': participant.get('timeCCingOthers', 0),
-        'total_heal_on_teammates': participant.get('totalHealsOnTeammates', 0),
-        'total_damage_shielded_on_teammates': participant.get('totalDamageShieldedOnTeammates', 0),
-        'kill_participation': participant.get('challenges', {}).get('killParticipation', 0),
-        'solo_kills': participant.get('challenges', {}).get('soloKills', 0),
-        'takedowns_first_15_min': participant.get('challenges', {}).get('takedownsFirst15Minutes', 0),
-        'save_ally_from_death': participant.get('challenges', {}).get('saveAllyFromDeath', 0),
-    }
+    match_stats = build_match_stats_row(match, participant, player_id)
+    timeline_columns = {}
+    if stage_results:
+        timeline_columns = match_stats_timeline_columns(stage_results, participant.participant_id, participant.team_id)
+        match_stats.update(timeline_columns)
 
     try:
         result = supabase.table('match_stats').insert(match_stats).execute()
         print(f"  [OK] Match stats stored")
     except Exception as e:
         if 'duplicate key' in str(e).lower() or 'unique' in str(e).lower():
-            print(f"  [SKIP] Match stats already exist")
+            if not timeline_columns:
+                print(f"  [SKIP] Match stats already exist")
+                return
+            # Re-ingest: fill the timeline columns of the stored row (NULL if stored before they existed)
+            supabase.table('match_stats').update(timeline_columns) \
+                .eq('match_id', match_stats['match_id']).eq('player_id', player_id).execute()
+            print(f"  [OK] Match stats already exist, timeline columns updated")
         else:
             print(f"  [ERROR] Failed to store match stats: {e}")
 
-def store_analytics(analytics: dict):
-    """Store aggregated analytics in database"""
+def store_analytics(analytics: dict, stage_results: Optional[dict] = None):
+    """Store aggregated analytics in database (plus timeline columns when stage_results are given)"""
+    timeline_columns = {}
+    if stage_results:
+        timeline_columns = analytics_timeline_columns(stage_results, analytics['participant_id'])
+        analytics.update(timeline_columns)
     try:
         result = supabase.table('match_analytics_summary').insert(analytics).execute()
         print(f"  [OK] Analytics stored")
     except Exception as e:
         if 'duplicate key' in str(e).lower() or 'unique' in str(e).lower():
-            print(f"  [SKIP] Analytics already exist")
+            if not timeline_columns:
+                print(f"  [SKIP] Analytics already exist")
+                return
+            # Re-ingest: fill the timeline columns of the stored row
+            supabase.table('match_analytics_summary').update(timeline_columns) \
+                .eq('match_id', analytics['match_id']).eq('player_puuid', analytics['player_puuid']).execute()
+            print(f"  [OK] Analytics already exist, timeline columns updated")
         else:
             raise
 
+def store_teamfights(match_id: str, fights: list):
+    """Store the detected teamfights of a match (one row per match, all participants)"""
+    try:
+        supabase.table('match_teamfights').upsert({
+            'match_id': match_id,
+            'fight_count': len(fights),
+            'fights': fights,
+        }, on_conflict='match_id').execute()
+        print(f"  [OK] {len(fights)} teamfights stored")
+    except Exception as e:
+        print(f"  [WARN] Failed to store teamfights: {e}")
+
+def store_objectives(match_data: dict, objectives: dict):
+    """Store the objective ledger of both teams (one row per match and team)"""
+    info = match_data['info']
+    season_fields = get_season_fields(info['gameVersion'], info['gameCreation'])
+    wins = {team['teamId']: team.get('win', False) for team in info.get('teams', [])}
+    rows = [{
+        'match_id': match_data['metadata']['matchId'],
+        'team_id': team_id,
+        'win': wins.get(team_id, False),
+        'season': season_fields['season'],
+        'patch': season_fields['patch'],
+        'match_date': season_fields['match_date'],
+        'soul_rift': objectives['soul_rift'],
+        **ledger,
+    } for team_id, ledger in objectives['teams'].items()]
+    try:
+        supabase.table('match_objectives').upsert(rows, on_conflict='match_id,team_id').execute()
+        print(f"  [OK] Objective ledger stored")
+    except Exception as e:
+        print(f"  [WARN] Failed to store objective ledger: {e}")
+
+def store_jungle_paths(match_data: dict, jungle_paths: dict):
+    """Store the pathing summary of each jungler (one row per match and jungler)"""
+    if not jungle_paths:
+        return
+    teams = {p['participantId']: p for p in match_data['info']['participants']}
+    rows = [{
+        'match_id': match_data['metadata']['matchId'],
+        'participant_id': participant_id,
+        'team_id': teams[participant_id]['teamId'],
+        'champion_id': teams[participant_id]['championId'],
+        'puuid': teams[participant_id].get('puuid'),
+        **summary,
+    } for participant_id, summary in jungle_paths.items()]
+    try:
+        supabase.table('match_jungle_paths').upsert(rows, on_conflict='match_id,participant_id').execute()
+        print(f"  [OK] Jungle paths stored")
+    except Exception as e:
+        print(f"  [WARN] Failed to store jungle paths: {e}")
+
+def store_match_aggregates(match_data: dict, stage_results: dict, tier: Optional[str],
+                           ranks: Optional[Dict[str, str]] = None):
+    """
+    Fold a match into the cross-match counter tables (no-op for matches already counted)
+
+    Args:
+        match_data: Match-v5 match document
+        stage_results: run_stages output for ingest_stages()
+        tier: Lobby tier (tracked player's tier), None if unknown
+        ranks: {puuid: tier} of the participants (cache_participant_ranks), for the champion meta
+    """
+    increments = [
+        ('increment_build_stats', lambda: build_stats_increments(match_data, stage_results, tier)),
+        ('increment_skill_orders', lambda: skill_order_increments(match_data, stage_results, tier)),
+        ('increment_matchups', lambda: matchup_increments(match_data, stage_results, tier)),
+        ('increment_champion_meta', lambda: champion_meta_increments(match_data, ranks or {})),
+        ('increment_teammates', lambda: teammate_increments(match_data, get_tracked_puuids(match_data))),
+    ]
+    updated = []
+    for function, build_increments in increments:
+        try:
+            counted = supabase.rpc(function, build_increments()).execute()
+            if counted.data is not False:
+                updated.append(function)
+        except Exception as e:
+            print(f"  [WARN] {function} failed: {e}")
+    if updated:
+        print(f"  [OK] Match aggregates updated ({len(updated)}/{len(increments)})")
+    else:
+        print(f"  [SKIP] Match already aggregated")
+
+def get_tracked_puuids(match_data: dict) -> Set[str]:
+    """PUUIDs of a match's participants that are on the roster (players table)"""
+    puuids = [p['puuid'] for p in match_data['info']['participants'] if p.get('puuid')]
+    result = supabase.table('players').select('puuid').in_('puuid', puuids).execute()
+    return {row['puuid'] for row in (result.data or [])}
+
+def get_player_tier(puuid: str) -> Optional[str]:
+    """Current Solo/Duo tier of a tracked player (used as the lobby tier of their matches)"""
+    result = supabase.table('players').select('tier').eq('puuid', puuid).execute()
+    return result.data[0].get('tier') if result.data else None
+
+def store_position_tracks(match_id: str, timeline: dict):
+    """Store the delta-encoded per-minute tracks of all participants (one row per match)"""
+    try:
+        supabase.table('match_position_tracks').upsert(
+            build_position_tracks_row(match_id, timeline), on_conflict='match_id'
+        ).execute()
+        print(f"  [OK] Position tracks stored")
+    except Exception as e:
+        print(f"  [WARN] Failed to store position tracks: {e}")
+
 def main():
     """Main function"""
     try:
@@ -365,11 +265,18 @@ def main():
 
         # Get ranked solo/duo matches only
         match_ids = get_match_ids(puuid, count=100, queue_id=420)
+        tier = get_player_tier(puuid)
 
         print(f"\n{'='*80}")
         print(f"Processing {len(match_ids)} ranked solo/duo matches")
         print(f"{'='*80}\n")
 
+        # Optional local Parquet archive (MATCH_ARCHIVE_DIR)
+        archive = None
+        if os.getenv('MATCH_ARCHIVE_DIR'):
+            from match_archive import open_archive_from_env
+            archive = open_archive_from_env()
+
         # Process each match
         successful = 0
         skipped = 0
@@ -394,24 +301,36 @@ def main():
                 # Fetch timeline
                 timeline = get_match_timeline(match_id)
 
+                # One pass over the timeline for every ingest stage
+                stage_results = run_stages(match_data, timeline, ingest_stages())
+
                 # Store match stats
-                store_match_stats(match_data, puuid)
+                store_match_stats(match_data, puuid, stage_results)
 
                 # Aggregate and store analytics
                 analytics = aggregate_match_analytics(match_id, match_data, timeline, puuid)
-                store_analytics(analytics)
+                store_analytics(analytics, stage_results)
+                store_position_tracks(match_id, timeline)
+                store_teamfights(match_id, stage_results['teamfights'])
+                store_objectives(match_data, stage_results['objectives'])
+                store_jungle_paths(match_data, stage_results['jungle_paths'])
+                ranks, _ = cache_participant_ranks(match_data)
+                store_match_aggregates(match_data, stage_results, tier, ranks)
+
+                if archive:
+                    archive.add(match_data, timeline)
 
                 successful += 1
                 print(f"  [OK] Match processed successfully")
 
-                # Rate limiting
-                if i < len(match_ids):
-                    time.sleep(1.2)  # Be safe with rate limits
-
             except Exception as e:
                 print(f"  [ERROR] Failed to process match: {e}")
                 continue
 
+        if archive:
+            archive.close()
+            print(f"\n[OK] {archive.written} matches archived to {archive.root} ({archive.skipped} already archived)")
+
         print(f"\n{'='*80}")
         print(f"COMPLETE!")
         print(f"{'='*80}")
@@ -5,9 +5,10 @@ Handles all interactions with Riot Games API for fetching player data
 
 import os
 import requests
-import time
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
 from dotenv import load_dotenv
+from riot_quota import acquire_for_url, report_rate_limited
+from riot_models import Match, Timeline, decode_match, decode_timeline
 
 # Load environment variables
 load_dotenv()
@@ -20,8 +21,9 @@ if not API_KEY:
 REGION = "euw1"  # Europe West (changed from eun1 to support EUW players)
 CONTINENT = "europe"  # For match history and other continental endpoints
 
-# Rate limiting configuration
-RATE_LIMIT_DELAY = 1.2  # Seconds between API calls (conservative to avoid rate limits)
+# Base URL template; point it at mock_riot_server.py for offline runs,
+# e.g. RIOT_API_BASE_URL="http://127.0.0.1:8089/{routing}"
+API_BASE_URL = os.getenv('RIOT_API_BASE_URL', 'https://{routing}.api.riotgames.com')
 
 
 class RiotAPIError(Exception):
@@ -29,7 +31,23 @@ class RiotAPIError(Exception):
     pass
 
 
-def _make_request(url: str, headers: Dict[str, str], max_retries: int = 3) -> Optional[Dict]:
+def _api_url(routing: str, path: str) -> str:
+    """
+    Build a full API URL for a routing value (platform like euw1 or region like europe)
+
+    Args:
+        routing: Routing value used as the API host
+        path: Endpoint path starting with /
+
+    Returns:
+        Full URL
+    """
+    return API_BASE_URL.format(routing=routing) + path
+
+
+def _make_request(url: str, headers: Dict[str, str], max_retries: int = 3,
+                  decoder: Optional[Callable[[bytes], Any]] = None,
+                  params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
     """
     Make API request with retry logic and rate limit handling
 
@@ -37,17 +55,19 @@ def _make_request(url: str, headers: Dict[str, str], max_retries: int = 3) -> Op
         url: API endpoint URL
         headers: Request headers including API key
         max_retries: Maximum number of retry attempts
+        decoder: Decodes the raw response body (default: response.json())
+        params: Query string parameters
 
     Returns:
-        JSON response as dictionary, or None if request fails
+        Decoded response (JSON dictionary by default), or None if request fails
     """
     for attempt in range(max_retries):
         try:
-            time.sleep(RATE_LIMIT_DELAY)  # Rate limit protection
-            response = requests.get(url, headers=headers, timeout=10)
+            acquire_for_url(url)  # Shared quota across all scripts on this host
+            response = requests.get(url, headers=headers, params=params, timeout=10)
 
             if response.status_code == 200:
-                return response.json()
+                return decoder(response.content) if decoder else response.json()
             elif response.status_code == 404:
                 print(f"Resource not found (404): {url}")
                 return None
@@ -55,7 +75,7 @@ def _make_request(url: str, headers: Dict[str, str], max_retries: int = 3) -> Op
                 # Rate limit exceeded
                 retry_after = int(response.headers.get('Retry-After', 60))
                 print(f"Rate limit exceeded. Waiting {retry_after} seconds...")
-                time.sleep(retry_after)
+                report_rate_limited(url, retry_after, response.headers.get('X-Rate-Limit-Type'))
                 continue
             elif response.status_code == 403:
                 raise RiotAPIError("API key is invalid or expired (403)")
@@ -74,6 +94,24 @@ def _make_request(url: str, headers: Dict[str, str], max_retries: int = 3) -> Op
     return None
 
 
+def riot_get(routing: str, path: str, params: Optional[Dict[str, Any]] = None,
+             decoder: Optional[Callable[[bytes], Any]] = None) -> Optional[Any]:
+    """
+    GET any Riot API endpoint with the project key, shared quota and 429 handling
+    For scripts that keep their own endpoint wrappers
+
+    Args:
+        routing: Routing value used as the API host (CONTINENT, REGION)
+        path: Endpoint path starting with /
+        params: Query string parameters
+        decoder: Decodes the raw response body (default: response.json())
+
+    Returns:
+        Decoded response, or None if the request fails
+    """
+    return _make_request(_api_url(routing, path), {"X-Riot-Token": API_KEY}, decoder=decoder, params=params)
+
+
 def get_account_by_riot_id(game_name: str, tag_line: str) -> Optional[Dict]:
     """
     Fetch account information by Riot ID (new API)
@@ -85,7 +123,7 @@ def get_account_by_riot_id(game_name: str, tag_line: str) -> Optional[Dict]:
     Returns:
         Dictionary containing account info (puuid, gameName, tagLine)
     """
-    url = f"https://{CONTINENT}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
+    url = _api_url(CONTINENT, f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}")
     headers = {"X-Riot-Token": API_KEY}
 
     print(f"Fetching account data for: {game_name}#{tag_line}")
@@ -128,7 +166,7 @@ def get_summoner_by_name(summoner_name: str) -> Optional[Dict]:
         return summoner
     else:
         # Legacy endpoint (may not work for all accounts)
-        url = f"https://{REGION}.api.riotgames.com/lol/summoner/v4/summoners/by-name/{summoner_name}"
+        url = _api_url(REGION, f"/lol/summoner/v4/summoners/by-name/{summoner_name}")
         headers = {"X-Riot-Token": API_KEY}
 
         print(f"Fetching summoner data for: {summoner_name}")
@@ -145,13 +183,29 @@ def get_summoner_by_puuid(puuid: str) -> Optional[Dict]:
     Returns:
         Dictionary containing summoner info
     """
-    url = f"https://{REGION}.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/{puuid}"
+    url = _api_url(REGION, f"/lol/summoner/v4/summoners/by-puuid/{puuid}")
     headers = {"X-Riot-Token": API_KEY}
 
     print(f"Fetching summoner info for PUUID: {puuid[:20]}...")
     return _make_request(url, headers)
 
 
+def is_summoner_unchanged(summoner: Dict, last_revision_date: Optional[int]) -> bool:
+    """
+    Check whether a summoner-v4 response has the same revisionDate as the previous run
+
+    Args:
+        summoner: Summoner data from summoner-v4
+        last_revision_date: revisionDate stored on the previous run (None if never seen)
+
+    Returns:
+        True if downstream league/mastery/match calls can be skipped
+    """
+    if last_revision_date is None:
+        return False
+    return summoner.get('revisionDate') == last_revision_date
+
+
 def get_ranked_stats_by_puuid(puuid: str) -> Optional[List[Dict]]:
     """
     Fetch ranked statistics by PUUID (new method)
@@ -163,7 +217,7 @@ def get_ranked_stats_by_puuid(puuid: str) -> Optional[List[Dict]]:
         List of ranked queue entries (RANKED_SOLO_5x5, RANKED_FLEX_SR, etc.)
         Each entry contains: tier, rank, leaguePoints, wins, losses
     """
-    url = f"https://{REGION}.api.riotgames.com/lol/league/v4/entries/by-puuid/{puuid}"
+    url = _api_url(REGION, f"/lol/league/v4/entries/by-puuid/{puuid}")
     headers = {"X-Riot-Token": API_KEY}
 
     print(f"Fetching ranked stats for PUUID: {puuid[:20]}...")
@@ -181,7 +235,7 @@ def get_ranked_stats(summoner_id: str) -> Optional[List[Dict]]:
         List of ranked queue entries (RANKED_SOLO_5x5, RANKED_FLEX_SR, etc.)
         Each entry contains: tier, rank, leaguePoints, wins, losses
     """
-    url = f"https://{REGION}.api.riotgames.com/lol/league/v4/entries/by-summoner/{summoner_id}"
+    url = _api_url(REGION, f"/lol/league/v4/entries/by-summoner/{summoner_id}")
     headers = {"X-Riot-Token": API_KEY}
 
     print(f"Fetching ranked stats for summoner ID: {summoner_id}")
@@ -201,7 +255,7 @@ def get_match_history(puuid: str, count: int = 20, queue_type: int = 420, start_
     Returns:
         List of match IDs
     """
-    url = f"https://{CONTINENT}.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids"
+    url = _api_url(CONTINENT, f"/lol/match/v5/matches/by-puuid/{puuid}/ids")
     headers = {"X-Riot-Token": API_KEY}
     params = {
         "queue": queue_type,
@@ -212,34 +266,43 @@ def get_match_history(puuid: str, count: int = 20, queue_type: int = 420, start_
         params["startTime"] = start_time
 
     print(f"Fetching {count} match IDs for PUUID: {puuid[:8]}...")
-    try:
-        time.sleep(RATE_LIMIT_DELAY)
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Failed to fetch match history: {response.status_code}")
-            return None
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching match history: {str(e)}")
-        return None
+    return _make_request(url, headers, params=params)
 
 
-def get_match_details(match_id: str) -> Optional[Dict]:
+def get_match_details(match_id: str, typed: bool = False) -> Optional[Union[Dict, Match]]:
     """
     Fetch detailed match information
 
     Args:
         match_id: Match identifier
+        typed: Decode into a riot_models.Match instead of a dictionary
 
     Returns:
-        Dictionary containing full match details including all player stats
+        Dictionary (or Match) containing full match details including all player stats
     """
-    url = f"https://{CONTINENT}.api.riotgames.com/lol/match/v5/matches/{match_id}"
+    url = _api_url(CONTINENT, f"/lol/match/v5/matches/{match_id}")
     headers = {"X-Riot-Token": API_KEY}
 
     print(f"Fetching match details for: {match_id}")
-    return _make_request(url, headers)
+    return _make_request(url, headers, decoder=decode_match if typed else None)
+
+
+def get_match_timeline(match_id: str, typed: bool = False) -> Optional[Union[Dict, Timeline]]:
+    """
+    Fetch match timeline (per-minute frames and events)
+
+    Args:
+        match_id: Match identifier
+        typed: Decode into a riot_models.Timeline instead of a dictionary
+
+    Returns:
+        Dictionary (or Timeline) containing timeline frames with participant frames and events
+    """
+    url = _api_url(CONTINENT, f"/lol/match/v5/matches/{match_id}/timeline")
+    headers = {"X-Riot-Token": API_KEY}
+
+    print(f"Fetching match timeline for: {match_id}")
+    return _make_request(url, headers, decoder=decode_timeline if typed else None)
 
 
 def get_champion_mastery(puuid: str, count: int = 3) -> Optional[List[Dict]]:
@@ -254,22 +317,12 @@ def get_champion_mastery(puuid: str, count: int = 3) -> Optional[List[Dict]]:
         List of champion mastery entries sorted by mastery points
         Each entry contains: championId, championLevel, championPoints, etc.
     """
-    url = f"https://{REGION}.api.riotgames.com/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}/top"
+    url = _api_url(REGION, f"/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}/top")
     headers = {"X-Riot-Token": API_KEY}
     params = {"count": count}
 
     print(f"Fetching top {count} champion masteries for PUUID: {puuid[:20]}...")
-    try:
-        time.sleep(RATE_LIMIT_DELAY)
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Failed to fetch champion mastery: {response.status_code}")
-            return None
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching champion mastery: {str(e)}")
-        return None
+    return _make_request(url, headers, params=params)
 
 
 def get_champion_stats_from_matches(puuid: str, match_count: int = 20, start_time: Optional[int] = None) -> Dict[int, Dict]:
@@ -332,13 +385,16 @@ def get_champion_stats_from_matches(puuid: str, match_count: int = 20, start_tim
     return champion_stats
 
 
-def get_player_full_data(summoner_name: str) -> Optional[Dict]:
+def get_player_full_data(summoner_name: str, previous: Optional[Dict] = None) -> Optional[Dict]:
     """
     Fetch complete player data (summoner info + ranked stats)
     Convenience function that combines multiple API calls
 
     Args:
         summoner_name: In-game summoner name (or gameName#tagLine format)
+        previous: Data returned for this player on an earlier run; when its
+            summoner_revision_date still matches, its ranked fields are reused and the
+            league-v4 call is skipped
 
     Returns:
         Dictionary containing all player data or None if player not found
@@ -355,6 +411,16 @@ def get_player_full_data(summoner_name: str) -> Optional[Dict]:
         print(f"No PUUID found for summoner")
         return None
 
+    if previous and is_summoner_unchanged(summoner, previous.get('summoner_revision_date')):
+        player_data = dict(previous)
+        player_data.update({
+            'puuid': puuid,
+            'summoner_level': summoner.get('summonerLevel', 0),
+            'profile_icon_id': summoner.get('profileIconId', 0),
+        })
+        print(f"[SKIP] {player_data['summoner_name']} unchanged since revision {previous['summoner_revision_date']}, ranked stats reused")
+        return player_data
+
     ranked_stats = get_ranked_stats_by_puuid(puuid)
 
     # Find Ranked Solo/Duo queue stats
@@ -380,6 +446,7 @@ def get_player_full_data(summoner_name: str) -> Optional[Dict]:
         'summoner_id': solo_queue.get('summonerId', '') if solo_queue else '',  # Get ID from ranked stats
         'summoner_level': summoner.get('summonerLevel', 0),
         'profile_icon_id': summoner.get('profileIconId', 0),
+        'summoner_revision_date': summoner.get('revisionDate'),
         'tier': solo_queue.get('tier') if solo_queue else 'UNRANKED',
         'rank': solo_queue.get('rank') if solo_queue else '',
         'lp': solo_queue.get('leaguePoints', 0) if solo_queue else 0,
@@ -0,0 +1,254 @@
+"""
+Typed match-v5 models decoded straight from API bytes
+One msgspec schema for matches and timelines, shared by gdansk-league/scripts/riot_api.py
+and backend/scripts/riot_api.py. Only the fields the project reads are declared; everything
+else in the payload is skipped while decoding. Structs use __slots__, carry no per-instance
+dict and are excluded from the cyclic GC, so thousands of matches can be held for batch work.
+
+Usage:
+    from riot_models import decode_match, decode_timeline, match_from_dict
+    match = decode_match(response.content)        # or match_from_dict(match_data) for an already parsed dict
+    participant = match.participant_by_puuid(puuid)
+    participant.challenges.kill_participation
+"""
+
+from typing import Dict, List, Optional, Union
+
+import msgspec
+
+
+class _Model(msgspec.Struct, rename='camel', omit_defaults=True, gc=False):
+    """Base for Riot DTOs: camelCase JSON names, snake_case attributes"""
+
+
+class Position(_Model):
+    x: int = 0
+    y: int = 0
+
+
+class Challenges(_Model):
+    kill_participation: float = 0
+    team_damage_percentage: float = 0
+    damage_per_minute: float = 0
+    gold_per_minute: float = 0
+    vision_score_per_minute: float = 0
+    kda: float = 0
+    solo_kills: int = 0
+    turret_plates_taken: int = 0
+    rift_herald_takedowns: int = 0
+    takedowns_on_rift_herald: int = 0
+    takedowns_first_x_minutes: int = 0
+    takedowns_first_15_minutes: int = 0
+    save_ally_from_death: int = 0
+    solo_turrets_lategame: int = 0
+    control_wards_placed: int = 0
+    ward_takedowns: int = 0
+    lane_minions_first_10_minutes: int = 0
+
+
+class Participant(_Model):
+    participant_id: int
+    puuid: str
+    team_id: int
+    champion_id: int
+    champion_name: str
+    win: bool
+    kills: int = 0
+    deaths: int = 0
+    assists: int = 0
+    team_position: str = ''
+    individual_position: str = ''
+    riot_id_game_name: str = ''
+    riot_id_tagline: str = ''
+    summoner_id: str = ''
+    champ_level: int = 0
+    total_minions_killed: int = 0
+    neutral_minions_killed: int = 0
+    gold_earned: int = 0
+    total_damage_dealt_to_champions: int = 0
+    total_damage_taken: int = 0
+    damage_self_mitigated: int = 0
+    damage_dealt_to_turrets: int = 0
+    damage_dealt_to_objectives: int = 0
+    vision_score: int = 0
+    wards_placed: int = 0
+    wards_killed: int = 0
+    vision_wards_bought_in_game: int = 0
+    turret_kills: int = 0
+    dragon_kills: int = 0
+    baron_kills: int = 0
+    time_ccing_others: int = msgspec.field(default=0, name='timeCCingOthers')
+    total_heals_on_teammates: int = 0
+    total_damage_shielded_on_teammates: int = 0
+    item0: int = 0
+    item1: int = 0
+    item2: int = 0
+    item3: int = 0
+    item4: int = 0
+    item5: int = 0
+    item6: int = 0
+    challenges: Challenges = msgspec.field(default_factory=Challenges)
+
+
+class Ban(_Model):
+    champion_id: int
+    pick_turn: int = 0
+
+
+class ObjectiveCount(_Model):
+    first: bool = False
+    kills: int = 0
+
+
+class Team(_Model):
+    team_id: int
+    win: bool
+    bans: List[Ban] = []
+    objectives: Dict[str, ObjectiveCount] = {}
+
+
+class MatchMetadata(_Model):
+    match_id: str
+    participants: List[str] = []
+
+
+class MatchInfo(_Model):
+    game_id: int
+    game_creation: int
+    game_duration: int
+    game_version: str
+    queue_id: int = 0
+    platform_id: str = ''
+    game_start_timestamp: int = 0
+    game_end_timestamp: int = 0
+    participants: List[Participant] = []
+    teams: List[Team] = []
+
+
+class Match(_Model):
+    metadata: MatchMetadata
+    info: MatchInfo
+
+    def participant(self, participant_id: int) -> Optional[Participant]:
+        """Participant by ID (1-10)"""
+        for participant in self.info.participants:
+            if participant.participant_id == participant_id:
+                return participant
+        return None
+
+    def participant_by_puuid(self, puuid: str) -> Optional[Participant]:
+        """Participant by PUUID"""
+        for participant in self.info.participants:
+            if participant.puuid == puuid:
+                return participant
+        return None
+
+
+class Event(_Model):
+    """Union of the event fields the project reads; absent fields keep their defaults"""
+    type: str
+    timestamp: int = 0
+    participant_id: int = 0
+    killer_id: int = 0
+    victim_id: int = 0
+    assisting_participant_ids: List[int] = []
+    position: Optional[Position] = None
+    item_id: int = 0
+    before_id: int = 0
+    after_id: int = 0
+    gold_gain: int = 0
+    skill_slot: int = 0
+    level: int = 0
+    level_up_type: str = ''
+    creator_id: int = 0
+    ward_type: str = ''
+    monster_type: str = ''
+    monster_sub_type: str = ''
+    killer_team_id: int = 0
+    building_type: str = ''
+    lane_type: str = ''
+    tower_type: str = ''
+    team_id: int = 0
+    bounty: int = 0
+    shutdown_bounty: int = 0
+    kill_streak_length: int = 0
+    kill_type: str = ''
+    winning_team: int = 0
+
+
+class ParticipantFrame(_Model):
+    participant_id: int = 0
+    position: Optional[Position] = None
+    level: int = 0
+    current_gold: int = 0
+    total_gold: int = 0
+    xp: int = 0
+    minions_killed: int = 0
+    jungle_minions_killed: int = 0
+    time_enemy_spent_controlled: int = 0
+
+
+class TimelineFrame(_Model):
+    timestamp: int
+    events: List[Event] = []
+    participant_frames: Dict[str, ParticipantFrame] = {}
+
+
+class TimelineParticipant(_Model):
+    participant_id: int
+    puuid: str
+
+
+class TimelineInfo(_Model):
+    frame_interval: int = 60000
+    game_id: int = 0
+    frames: List[TimelineFrame] = []
+    participants: List[TimelineParticipant] = []
+
+
+class Timeline(_Model):
+    metadata: MatchMetadata
+    info: TimelineInfo
+
+
+_match_decoder = msgspec.json.Decoder(Match)
+_timeline_decoder = msgspec.json.Decoder(Timeline)
+
+
+def decode_match(data: Union[bytes, str]) -> Match:
+    """
+    Decode a match-v5 match payload
+
+    Args:
+        data: Raw JSON (response.content)
+
+    Returns:
+        Match model
+    """
+    return _match_decoder.decode(data)
+
+
+def match_from_dict(match_data: Dict) -> Match:
+    """
+    Match model of an already parsed match document (ingest keeps the dict for the timeline stages)
+
+    Args:
+        match_data: Match-v5 match dictionary
+
+    Returns:
+        Match model
+    """
+    return msgspec.convert(match_data, Match)
+
+
+def decode_timeline(data: Union[bytes, str]) -> Timeline:
+    """
+    Decode a match-v5 timeline payload
+
+    Args:
+        data: Raw JSON (response.content)
+
+    Returns:
+        Timeline model
+    """
+    return _timeline_decoder.decode(data)
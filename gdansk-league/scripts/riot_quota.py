@@ -0,0 +1,282 @@
+"""
+Cross-process Riot API quota coordinator
+All scripts on a host draw request permits from one shared SQLite ledger,
+so concurrent jobs together stay inside the app and method rate limits
+Usage: python riot_quota.py  (prints current usage per routing host)
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# Ledger location (every process on the host must point at the same file)
+QUOTA_DB_PATH = os.getenv('RIOT_QUOTA_DB', os.path.join(tempfile.gettempdir(), 'riot_quota.sqlite3'))
+
+
+def _parse_limits(spec: str) -> List[Tuple[int, int]]:
+    """
+    Parse a Riot style limit string ("20:1,100:120") into (requests, seconds) pairs
+
+    Args:
+        spec: Comma separated list of requests:window_seconds
+
+    Returns:
+        List of (max_requests, window_seconds) tuples
+    """
+    limits = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        count, window = part.split(':')
+        limits.append((int(count), int(window)))
+    return limits
+
+
+# Application limits, enforced per routing host (euw1, europe, ...)
+# Defaults match a development key; production keys set RIOT_APP_RATE_LIMIT="500:10,30000:600"
+APP_RATE_LIMITS = _parse_limits(os.getenv('RIOT_APP_RATE_LIMIT', '20:1,100:120'))
+
+# Method limits, enforced per routing host and method (from the developer portal)
+METHOD_RATE_LIMITS = {
+    'account-v1.getByRiotId': [(1000, 60)],
+    'account-v1.getByPuuid': [(1000, 60)],
+    'summoner-v4.getByPUUID': [(1600, 60)],
+    'summoner-v4.getBySummonerName': [(1600, 60)],
+    'league-v4.getLeagueEntriesByPUUID': [(20000, 10), (1200000, 600)],
+    'league-v4.getLeagueEntriesForSummoner': [(20000, 10), (1200000, 600)],
+    'match-v5.getMatchIdsByPUUID': [(2000, 10)],
+    'match-v5.getMatch': [(2000, 10)],
+    'match-v5.getTimeline': [(2000, 10)],
+    'champion-mastery-v4.getTopChampionMasteriesByPUUID': [(20000, 10), (1200000, 600)],
+    'champion-mastery-v4.getAllChampionMasteriesByPUUID': [(20000, 10), (1200000, 600)],
+    'spectator-v5.getCurrentGameInfoByPuuid': [(20000, 10), (1200000, 600)],
+}
+
+# URL path -> Riot method name (first match wins)
+METHOD_PATTERNS = [
+    (re.compile(r'^/riot/account/v1/accounts/by-riot-id/'), 'account-v1.getByRiotId'),
+    (re.compile(r'^/riot/account/v1/accounts/by-puuid/'), 'account-v1.getByPuuid'),
+    (re.compile(r'^/lol/summoner/v4/summoners/by-puuid/'), 'summoner-v4.getByPUUID'),
+    (re.compile(r'^/lol/summoner/v4/summoners/by-name/'), 'summoner-v4.getBySummonerName'),
+    (re.compile(r'^/lol/league/v4/entries/by-puuid/'), 'league-v4.getLeagueEntriesByPUUID'),
+    (re.compile(r'^/lol/league/v4/entries/by-summoner/'), 'league-v4.getLeagueEntriesForSummoner'),
+    (re.compile(r'^/lol/match/v5/matches/by-puuid/[^/]+/ids'), 'match-v5.getMatchIdsByPUUID'),
+    (re.compile(r'^/lol/match/v5/matches/[^/]+/timeline'), 'match-v5.getTimeline'),
+    (re.compile(r'^/lol/match/v5/matches/[^/]+$'), 'match-v5.getMatch'),
+    (re.compile(r'^/lol/champion-mastery/v4/champion-masteries/by-puuid/[^/]+/top'), 'champion-mastery-v4.getTopChampionMasteriesByPUUID'),
+    (re.compile(r'^/lol/champion-mastery/v4/champion-masteries/by-puuid/'), 'champion-mastery-v4.getAllChampionMasteriesByPUUID'),
+    (re.compile(r'^/lol/spectator/v5/active-games/by-summoner/'), 'spectator-v5.getCurrentGameInfoByPuuid'),
+]
+
+# Extra seconds added to every window: Riot counts a request when it arrives, we count it
+# when it leaves, so without slack a permit freed exactly at the window edge can still 429
+WINDOW_MARGIN = 0.1
+
+# Method key used for application-wide penalties
+APP_SCOPE = ''
+
+# Permits older than the longest configured window can never matter again
+LONGEST_WINDOW = WINDOW_MARGIN + max(window for limits in [APP_RATE_LIMITS] + list(METHOD_RATE_LIMITS.values()) for _, window in limits)
+
+_connection: Optional[sqlite3.Connection] = None
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Open (once per process) the shared ledger and make sure the schema exists"""
+    global _connection
+    if _connection is None:
+        conn = sqlite3.connect(QUOTA_DB_PATH, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS permits (
+                host TEXT NOT NULL,
+                method TEXT NOT NULL,
+                issued_at REAL NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_permits_host ON permits(host, issued_at)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_permits_method ON permits(host, method, issued_at)')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS penalties (
+                host TEXT NOT NULL,
+                method TEXT NOT NULL,
+                blocked_until REAL NOT NULL,
+                PRIMARY KEY (host, method)
+            )
+        """)
+        _connection = conn
+    return _connection
+
+
+def classify_url(url: str) -> Tuple[str, str]:
+    """
+    Work out the routing host and Riot method a request URL belongs to
+
+    Args:
+        url: Full Riot API URL (or mock server URL with the routing value as first path segment)
+
+    Returns:
+        Tuple of (routing host, method name), e.g. ('europe', 'match-v5.getMatch')
+    """
+    parsed = urlparse(url)
+    hostname = parsed.hostname or ''
+    path = parsed.path
+
+    if hostname.endswith('.api.riotgames.com'):
+        host = hostname.split('.')[0]
+    else:
+        # Offline base URL (RIOT_API_BASE_URL="http://host:port/{routing}"): routing is the first path segment
+        segments = path.split('/', 2)
+        host = segments[1] if len(segments) > 1 else ''
+        path = '/' + (segments[2] if len(segments) > 2 else '')
+
+    for pattern, method in METHOD_PATTERNS:
+        if pattern.search(path):
+            return host, method
+
+    # Unknown endpoint: still counted against the app limit under its own path
+    return host, path
+
+
+def _wait_for_window(conn: sqlite3.Connection, now: float, limits: List[Tuple[int, int]],
+                     where: str, params: Tuple) -> float:
+    """
+    Seconds until every window in limits has room for one more permit (0 if free now)
+    """
+    wait = 0.0
+    for max_requests, window in limits:
+        window += WINDOW_MARGIN
+        window_start = now - window
+        count = conn.execute(
+            f'SELECT COUNT(*) FROM permits WHERE {where} AND issued_at > ?',
+            params + (window_start,)
+        ).fetchone()[0]
+
+        if count >= max_requests:
+            # The permit that has to expire before we fit is (count - max_requests) from the oldest
+            oldest = conn.execute(
+                f'SELECT issued_at FROM permits WHERE {where} AND issued_at > ? '
+                f'ORDER BY issued_at LIMIT 1 OFFSET ?',
+                params + (window_start, count - max_requests)
+            ).fetchone()[0]
+            wait = max(wait, oldest + window - now)
+    return wait
+
+
+def acquire(host: str, method: str) -> float:
+    """
+    Block until a permit for (host, method) is available and record it in the ledger
+
+    Args:
+        host: Routing host (euw1, europe, ...)
+        method: Riot method name from classify_url
+
+    Returns:
+        Seconds spent waiting for the permit
+    """
+    conn = _get_connection()
+    method_limits = METHOD_RATE_LIMITS.get(method, [])
+    waited = 0.0
+
+    while True:
+        # BEGIN IMMEDIATE takes the write lock, so check-and-insert is atomic across processes
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            conn.execute('DELETE FROM permits WHERE host = ? AND issued_at <= ?', (host, now - LONGEST_WINDOW))
+
+            wait = 0.0
+            row = conn.execute(
+                'SELECT MAX(blocked_until) FROM penalties WHERE host = ? AND method IN (?, ?)',
+                (host, APP_SCOPE, method)
+            ).fetchone()
+            if row[0] and row[0] > now:
+                wait = row[0] - now
+
+            wait = max(wait, _wait_for_window(conn, now, APP_RATE_LIMITS, 'host = ?', (host,)))
+            wait = max(wait, _wait_for_window(conn, now, method_limits, 'host = ? AND method = ?', (host, method)))
+
+            if wait <= 0:
+                conn.execute('INSERT INTO permits (host, method, issued_at) VALUES (?, ?, ?)', (host, method, now))
+                conn.execute('COMMIT')
+                return waited
+
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        time.sleep(wait)
+        waited += wait
+
+
+def acquire_for_url(url: str) -> float:
+    """
+    Block until the request to url may be sent (see acquire)
+
+    Args:
+        url: Full Riot API URL
+
+    Returns:
+        Seconds spent waiting for the permit
+    """
+    host, method = classify_url(url)
+    return acquire(host, method)
+
+
+def report_rate_limited(url: str, retry_after: float, limit_type: Optional[str] = None):
+    """
+    Record a 429 so every process backs off, not just the one that got it
+
+    Args:
+        url: URL of the request that was rejected
+        retry_after: Value of the Retry-After header (seconds)
+        limit_type: Value of the X-Rate-Limit-Type header (application, method or service)
+    """
+    host, method = classify_url(url)
+    scope = APP_SCOPE if limit_type == 'application' else method
+    blocked_until = time.time() + retry_after
+
+    conn = _get_connection()
+    conn.execute(
+        'INSERT INTO penalties (host, method, blocked_until) VALUES (?, ?, ?) '
+        'ON CONFLICT(host, method) DO UPDATE SET blocked_until = MAX(blocked_until, excluded.blocked_until)',
+        (host, scope, blocked_until)
+    )
+
+
+def get_usage() -> Dict[str, Dict[str, int]]:
+    """
+    Current permit counts per routing host for each application window
+
+    Returns:
+        Dictionary mapping host to {'<requests>:<window>': permits issued in that window}
+    """
+    conn = _get_connection()
+    now = time.time()
+    usage = {}
+    for (host,) in conn.execute('SELECT DISTINCT host FROM permits').fetchall():
+        usage[host] = {}
+        for max_requests, window in APP_RATE_LIMITS:
+            count = conn.execute(
+                'SELECT COUNT(*) FROM permits WHERE host = ? AND issued_at > ?',
+                (host, now - window)
+            ).fetchone()[0]
+            usage[host][f"{max_requests}:{window}"] = count
+    return usage
+
+
+if __name__ == "__main__":
+    print(f"Quota ledger: {QUOTA_DB_PATH}")
+    print(f"App limits: {', '.join(f'{n}/{w}s' for n, w in APP_RATE_LIMITS)}")
+    usage = get_usage()
+    if not usage:
+        print("[INFO] No permits issued in the current windows")
+    for host, windows in usage.items():
+        print(f"  {host}: " + ", ".join(f"{used} used in {limit}" for limit, used in windows.items()))
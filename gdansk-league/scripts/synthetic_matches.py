@@ -0,0 +1,918 @@
+"""
+Synthetic match-v5 match and timeline generator for scale testing
+Produces seeded, statistically plausible match and timeline documents with the same
+shape as the samples in backend/scripts/, for a simulated player base with regular duos.
+Kills, objectives, items, levels and wards in the match document are derived from the
+timeline events, so both documents tell the same story.
+
+Usage: python synthetic_matches.py --players 1000 --games-per-player 20 --out ../data/synthetic
+       python synthetic_matches.py --players 100000 --games-per-player 100 --format jsonl --gzip --workers 8 --out /data/synth
+"""
+
+import argparse
+import copy
+import gzip
+import json
+import math
+import os
+import random
+import time
+from array import array
+from datetime import datetime, timezone
+from itertools import islice
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_DIR = os.path.join(SCRIPT_DIR, '..', '..', 'backend', 'scripts')
+SAMPLE_MATCH_FILE = os.path.join(SAMPLE_DIR, 'match_details_sample.json')
+SAMPLE_TIMELINE_FILE = os.path.join(SAMPLE_DIR, 'match_timeline_sample.json')
+
+POSITIONS = ['TOP', 'JUNGLE', 'MIDDLE', 'BOTTOM', 'UTILITY']
+TEAMS = (100, 200)
+FRAME_INTERVAL = 60000
+MATCH_ID_BASE = 8_000_000_000
+
+# (champion_id, champion_name) pools per position
+CHAMPIONS = {
+    'TOP': [(78, 'Poppy'), (517, 'Sylas'), (122, 'Darius'), (24, 'Jax'), (86, 'Garen'), (39, 'Irelia'),
+            (266, 'Aatrox'), (887, 'Gwen'), (54, 'Malphite'), (92, 'Riven'), (150, 'Gnar'), (799, 'Ambessa')],
+    'JUNGLE': [(5, 'XinZhao'), (11, 'MasterYi'), (64, 'LeeSin'), (121, 'Khazix'), (234, 'Viego'), (254, 'Vi'),
+               (59, 'JarvanIV'), (141, 'Kayn'), (876, 'Lillia'), (427, 'Ivern'), (28, 'Evelynn'), (20, 'Nunu')],
+    'MIDDLE': [(69, 'Cassiopeia'), (103, 'Ahri'), (7, 'Leblanc'), (238, 'Zed'), (157, 'Yasuo'), (134, 'Syndra'),
+               (61, 'Orianna'), (112, 'Viktor'), (4, 'TwistedFate'), (99, 'Lux'), (245, 'Ekko'), (910, 'Hwei')],
+    'BOTTOM': [(81, 'Ezreal'), (498, 'Xayah'), (222, 'Jinx'), (51, 'Caitlyn'), (21, 'MissFortune'), (236, 'Lucian'),
+               (145, 'Kaisa'), (202, 'Jhin'), (119, 'Draven'), (22, 'Ashe'), (221, 'Zeri'), (360, 'Samira')],
+    'UTILITY': [(518, 'Neeko'), (497, 'Rakan'), (412, 'Thresh'), (111, 'Nautilus'), (89, 'Leona'), (117, 'Lulu'),
+                (267, 'Nami'), (350, 'Yuumi'), (53, 'Blitzcrank'), (40, 'Janna'), (555, 'Pyke'), (147, 'Seraphine')],
+}
+ALL_CHAMPION_IDS = [champion_id for pool in CHAMPIONS.values() for champion_id, _ in pool]
+
+# Per-minute rates and per-game shares by position
+POSITION_PROFILE = {
+    #            cs/min  jungle/min  gold/min  xp/min  dmg/min  wards/min  kill weight  assist chance
+    'TOP':     (6.8,    0.3,        390,      480,     620,     0.35,      1.0,         0.30),
+    'JUNGLE':  (0.8,    5.2,        370,      420,     520,     0.55,      1.0,         0.55),
+    'MIDDLE':  (7.2,    0.4,        400,      480,     720,     0.35,      1.15,        0.40),
+    'BOTTOM':  (7.8,    0.3,        420,      400,     760,     0.30,      1.3,         0.40),
+    'UTILITY': (1.0,    0.0,        270,      320,     330,     1.40,      0.3,         0.60),
+}
+
+STARTING_ITEMS = {
+    'TOP': [(1054, 450), (2003, 50)],
+    'JUNGLE': [(1103, 450), (2003, 50)],
+    'MIDDLE': [(1056, 400), (2003, 50), (2003, 50)],
+    'BOTTOM': [(1055, 450), (2003, 50)],
+    'UTILITY': [(3865, 400), (2003, 50), (2003, 50)],
+}
+# Completed items per position, each built from two components
+COMPLETED_ITEMS = {
+    'TOP': [3078, 3053, 6333, 3071, 3065, 3143, 3748],
+    'JUNGLE': [6692, 3071, 3142, 6610, 3026, 6694, 3053],
+    'MIDDLE': [6655, 3089, 3135, 3157, 4645, 3102, 4646],
+    'BOTTOM': [3031, 3094, 3046, 3036, 6672, 3072, 3085],
+    'UTILITY': [3107, 3190, 3504, 3222, 3050, 2065, 6617],
+}
+COMPONENTS = [(1036, 350), (1037, 875), (1038, 1300), (1052, 400), (1026, 850), (1028, 400),
+              (1029, 300), (1033, 400), (1042, 250), (3133, 1100), (3067, 800), (3802, 900)]
+BOOTS = [3006, 3020, 3047, 3111, 3158]
+TRINKETS = {'UTILITY': 3364, 'BOTTOM': 3363}
+
+# Cumulative XP needed for levels 1..18
+XP_LEVELS = [0, 280, 660, 1140, 1720, 2400, 3180, 4060, 5040, 6120, 7300, 8580, 9960, 11440, 13020, 14700, 16480, 18360]
+
+# Approximate minimap anchors (0..14800) for each position while laning
+LANE_ANCHORS = {
+    100: {'TOP': (1800, 11500), 'JUNGLE': (4000, 7800), 'MIDDLE': (6800, 6800), 'BOTTOM': (11500, 1800), 'UTILITY': (11200, 2200)},
+    200: {'TOP': (3200, 13000), 'JUNGLE': (10800, 7000), 'MIDDLE': (8000, 8000), 'BOTTOM': (13000, 3200), 'UTILITY': (12600, 3600)},
+}
+FOUNTAIN = {100: (400, 400), 200: (14340, 14390)}
+DRAGON_PIT = (9866, 4414)
+BARON_PIT = (5007, 10471)
+DRAGON_TYPES = ['FIRE_DRAGON', 'WATER_DRAGON', 'EARTH_DRAGON', 'AIR_DRAGON', 'HEXTECH_DRAGON', 'CHEMTECH_DRAGON']
+SOUL_NAMES = {'FIRE_DRAGON': 'Infernal', 'WATER_DRAGON': 'Ocean', 'EARTH_DRAGON': 'Mountain',
+              'AIR_DRAGON': 'Cloud', 'HEXTECH_DRAGON': 'Hextech', 'CHEMTECH_DRAGON': 'Chemtech'}
+
+# Structures per owning team, in the order they fall along each lane
+LANE_STRUCTURES = {
+    100: {
+        'TOP_LANE': [('OUTER_TURRET', (981, 10441)), ('INNER_TURRET', (1512, 6699)), ('BASE_TURRET', (1169, 4287)), ('INHIBITOR', (1171, 3571))],
+        'MID_LANE': [('OUTER_TURRET', (5846, 6396)), ('INNER_TURRET', (5048, 4812)), ('BASE_TURRET', (3651, 3696)), ('INHIBITOR', (3203, 3208))],
+        'BOT_LANE': [('OUTER_TURRET', (10504, 1029)), ('INNER_TURRET', (6919, 1483)), ('BASE_TURRET', (4281, 1253)), ('INHIBITOR', (3452, 1236))],
+    },
+    200: {
+        'TOP_LANE': [('OUTER_TURRET', (4318, 13875)), ('INNER_TURRET', (7943, 13411)), ('BASE_TURRET', (10481, 13650)), ('INHIBITOR', (11261, 13676))],
+        'MID_LANE': [('OUTER_TURRET', (8955, 8510)), ('INNER_TURRET', (9767, 10113)), ('BASE_TURRET', (11134, 11207)), ('INHIBITOR', (11598, 11667))],
+        'BOT_LANE': [('OUTER_TURRET', (13866, 4505)), ('INNER_TURRET', (13327, 8226)), ('BASE_TURRET', (13624, 10572)), ('INHIBITOR', (13604, 11316))],
+    },
+}
+NEXUS_TURRETS = {100: [(1748, 2270), (2177, 1807)], 200: [(12611, 13084), (13052, 12612)]}
+POSITION_LANE = {'TOP': 'TOP_LANE', 'JUNGLE': 'MID_LANE', 'MIDDLE': 'MID_LANE', 'BOTTOM': 'BOT_LANE', 'UTILITY': 'BOT_LANE'}
+
+# Template documents (loaded once per process) supply every field we do not simulate
+_templates: Optional[Dict] = None
+
+
+def _load_templates() -> Dict:
+    """Load the sample documents and index their participants and frames by position"""
+    global _templates
+    if _templates is None:
+        with open(SAMPLE_MATCH_FILE, 'r', encoding='utf-8') as f:
+            match = json.load(f)
+        with open(SAMPLE_TIMELINE_FILE, 'r', encoding='utf-8') as f:
+            timeline = json.load(f)
+
+        participants = {p['teamPosition']: p for p in match['info']['participants'] if p['teamId'] == 100}
+        frame_templates = {}
+        for position, participant in participants.items():
+            key = str(participant['participantId'])
+            frame_templates[position] = [frame['participantFrames'][key] for frame in timeline['info']['frames']]
+
+        _templates = {
+            'info': {k: v for k, v in match['info'].items() if k not in ('participants', 'teams')},
+            'team': match['info']['teams'][0],
+            'participants': participants,
+            'frames': frame_templates,
+        }
+    return _templates
+
+
+# ============================================================================
+# Player pool and match schedule
+# ============================================================================
+
+def generate_player_pool(player_count: int, seed: int, duo_share: float) -> List[Dict]:
+    """
+    Create the simulated player base
+
+    Args:
+        player_count: Number of players
+        seed: Random seed
+        duo_share: Fraction of players with a regular duo partner
+
+    Returns:
+        List of player dictionaries (index, puuid, game_name, main/secondary position, skill, champions, duo)
+    """
+    rng = random.Random(seed)
+    players = []
+    for index in range(player_count):
+        main = rng.choices(POSITIONS, weights=[0.21, 0.19, 0.22, 0.21, 0.17])[0]
+        secondary = rng.choice([p for p in POSITIONS if p != main])
+        players.append({
+            'index': index,
+            'puuid': f"synth-{seed}-{index:07d}",
+            'game_name': f"MockPlayer{index}",
+            'main': main,
+            'secondary': secondary,
+            'skill': rng.gauss(0, 1),
+            'champions': {
+                main: rng.sample(CHAMPIONS[main], 4),
+                secondary: rng.sample(CHAMPIONS[secondary], 2),
+            },
+            'duo': None,
+        })
+
+    # Pair up a share of the player base; duos prefer complementary positions
+    candidates = rng.sample(range(player_count), int(player_count * duo_share) // 2 * 2)
+    for a, b in zip(candidates[::2], candidates[1::2]):
+        players[a]['duo'] = b
+        players[b]['duo'] = a
+    return players
+
+
+def schedule_games(players: List[Dict], games_per_player: int, duo_overlap: float, seed: int) -> Iterator[List[Tuple[int, int, str]]]:
+    """
+    Group players into games, roughly games_per_player each
+
+    Each round shuffles the player base and fills lobbies in order; a player with a
+    duo brings the partner onto the same team with probability duo_overlap.
+
+    Yields:
+        Lists of ten (player_index, team_id, position) slots
+    """
+    rng = random.Random(seed + 1)
+    order = list(range(len(players)))
+
+    for _ in range(games_per_player):
+        rng.shuffle(order)
+        used = set()
+        lobby = {100: {}, 200: {}}
+        count = 0
+
+        for index in order:
+            if index in used:
+                continue
+            group = [index]
+            partner = players[index]['duo']
+            if partner is not None and partner not in used and rng.random() < duo_overlap:
+                group.append(partner)
+
+            # Team with room for the whole group, preferring the one with the group's positions free
+            teams = [t for t in TEAMS if 5 - len(lobby[t]) >= len(group)]
+            if not teams:
+                group = group[:1]
+                teams = [t for t in TEAMS if len(lobby[t]) < 5]
+            team = max(teams, key=lambda t: sum(players[i]['main'] not in lobby[t] for i in group))
+
+            for member in group:
+                player = players[member]
+                free = [p for p in POSITIONS if p not in lobby[team]]
+                if player['main'] in free:
+                    position = player['main']
+                elif player['secondary'] in free:
+                    position = player['secondary']
+                else:
+                    position = rng.choice(free)
+                lobby[team][position] = member
+                used.add(member)
+                count += 1
+
+            if count == 10:
+                yield [(lobby[t][p], t, p) for t in TEAMS for p in POSITIONS]
+                lobby = {100: {}, 200: {}}
+                count = 0
+
+
+# ============================================================================
+# Single game simulation
+# ============================================================================
+
+def _clamp(value: float) -> int:
+    return int(min(14800, max(0, value)))
+
+
+def _position_at(rng: random.Random, team: int, position: str, minute: float) -> Tuple[int, int]:
+    """Plausible map position for a player at a given minute"""
+    if minute < 14:
+        x, y = LANE_ANCHORS[team][position]
+        if position == 'JUNGLE' and rng.random() < 0.5:
+            x, y = y, x  # Other side of the jungle
+        spread = 900
+    else:
+        x, y = rng.choice([(7400, 7400), DRAGON_PIT, BARON_PIT, LANE_ANCHORS[team][position]])
+        spread = 1500
+    return _clamp(rng.gauss(x, spread)), _clamp(rng.gauss(y, spread))
+
+
+def _level_for_xp(xp: float) -> int:
+    level = 1
+    while level < 18 and xp >= XP_LEVELS[level]:
+        level += 1
+    return level
+
+
+def _damage_entries(rng: random.Random, names: List[str], source_ids: List[int], count: int) -> List[Dict]:
+    """victimDamageDealt / victimDamageReceived style entries"""
+    entries = []
+    for _ in range(count):
+        source = rng.choice(source_ids)
+        magic = rng.random() < 0.5
+        entries.append({
+            'basic': not magic,
+            'magicDamage': rng.randint(20, 400) if magic else 0,
+            'name': names[source - 1],
+            'participantId': source,
+            'physicalDamage': 0 if magic else rng.randint(20, 400),
+            'spellName': f"{names[source - 1].lower()}{'q' if magic else 'basicattack'}",
+            'spellSlot': 0 if magic else 64,
+            'trueDamage': 0,
+            'type': 'OTHER'
+        })
+    return entries
+
+
+def simulate_game(game_index: int, slots: List[Tuple[int, int, str]], players: List[Dict],
+                  seed: int, start_time_ms: int, game_spacing_ms: int,
+                  season: int, first_patch: int, patch_days: int) -> Tuple[dict, dict]:
+    """
+    Simulate one game and build its match and timeline documents
+
+    Args:
+        game_index: Sequential game number (drives the match ID and start time)
+        slots: Ten (player_index, team_id, position) tuples from schedule_games
+        players: Player pool
+        seed: Base random seed
+        start_time_ms: gameCreation of the first game
+        game_spacing_ms: Time between consecutive game creations
+        season: Season number used in gameVersion
+        first_patch: Patch number of the first game
+        patch_days: Days per patch
+
+    Returns:
+        Tuple of (match document, timeline document)
+    """
+    templates = _load_templates()
+    rng = random.Random(seed * 1_000_003 + game_index)
+
+    game_id = MATCH_ID_BASE + game_index
+    match_id = f"EUW1_{game_id}"
+    creation = start_time_ms + game_index * game_spacing_ms
+    patch = first_patch + int((creation - start_time_ms) / (patch_days * 86_400_000))
+    game_version = f"{season}.{patch}.{700 + patch}.{8000 + seed % 1000}"
+
+    # Picks
+    taken = set()
+    roster = []
+    for participant_id, (player_index, team, position) in enumerate(slots, 1):
+        player = players[player_index]
+        pool = player['champions'].get(position) or CHAMPIONS[position]
+        options = [c for c in pool if c[0] not in taken] or [c for c in CHAMPIONS[position] if c[0] not in taken]
+        champion_id, champion_name = rng.choice(options)
+        taken.add(champion_id)
+        roster.append({
+            'participant_id': participant_id, 'player': player, 'team': team, 'position': position,
+            'champion_id': champion_id, 'champion_name': champion_name,
+            'form': player['skill'] + rng.gauss(0, 0.7),
+        })
+    names = [r['champion_name'] for r in roster]
+    team_members = {t: [r for r in roster if r['team'] == t] for t in TEAMS}
+
+    # Outcome: stronger lobby side wins more often
+    strength = {t: sum(r['form'] for r in team_members[t]) for t in TEAMS}
+    win_probability = 1 / (1 + math.exp(-(strength[100] - strength[200]) / 2.5))
+    winner = 100 if rng.random() < win_probability else 200
+    loser = 300 - winner
+    duration = int(min(2700, max(900, rng.gauss(1780, 330))))
+    surrender = duration < 1500 or rng.random() < 0.25
+    end_ms = duration * 1000 + rng.randint(0, 999)
+    minutes = duration / 60
+
+    # Per-frame player state
+    state = {r['participant_id']: {
+        'xp': 0.0, 'gold': 500.0, 'spent': 0, 'cs': 0.0, 'jungle': 0.0, 'level': 1,
+        'kills': 0, 'deaths': 0, 'assists': 0, 'early_takedowns': 0, 'solo_kills': 0,
+        'wards_placed': 0, 'wards_killed': 0, 'control_wards': 0, 'turret_kills': 0, 'plates': 0,
+        'dragons': 0, 'barons': 0, 'heralds': 0, 'items': [], 'components': [], 'build': [], 'bounties': [], 'skills': {1: 0, 2: 0, 3: 0, 4: 0},
+        'skill_priority': rng.sample([1, 2, 3], 3),
+    } for r in roster}
+
+    # Build path per player: two components into each completed item, boots after the first item
+    for r in roster:
+        build = []
+        for number, item_id in enumerate(rng.sample(COMPLETED_ITEMS[r['position']], 6)):
+            if number == 0:
+                build.append((1001, 300, 'component'))
+            for component_id, cost in rng.sample(COMPONENTS, 2):
+                build.append((component_id, cost, 'component'))
+            build.append((item_id, rng.randint(700, 1300), 'complete'))
+            if number == 0:
+                build.append((rng.choice(BOOTS), 800, 'boots'))
+        state[r['participant_id']]['build'] = build
+
+    events: List[Dict] = [{'realTimestamp': creation + 30000, 'timestamp': 0, 'type': 'PAUSE_END'}]
+    for r in roster:
+        for item_id, cost in STARTING_ITEMS[r['position']]:
+            events.append({'itemId': item_id, 'participantId': r['participant_id'], 'timestamp': 0, 'type': 'ITEM_PURCHASED'})
+            state[r['participant_id']]['spent'] += cost
+            state[r['participant_id']]['items'].append(item_id)
+
+    # Champion kills
+    kill_rate = rng.uniform(1.4, 2.4)
+    kill_count = max(3, int(rng.gauss(kill_rate * minutes, 5)))
+    kill_times = sorted(rng.randint(90_000, end_ms - 1) for _ in range(kill_count))
+    streaks = {r['participant_id']: 0 for r in roster}
+    first_blood = True
+    for timestamp in kill_times:
+        killer_team = winner if rng.random() < 0.6 else loser
+        victim_team = 300 - killer_team
+        killers = team_members[killer_team]
+        killer = rng.choices(killers, weights=[POSITION_PROFILE[k['position']][6] * math.exp(k['form'] * 0.3) for k in killers])[0]
+        victims = team_members[victim_team]
+        victim = rng.choices(victims, weights=[math.exp(-v['form'] * 0.3) for v in victims])[0]
+        assisters = [k['participant_id'] for k in killers
+                     if k is not killer and rng.random() < POSITION_PROFILE[k['position']][7]]
+
+        killer_id, victim_id = killer['participant_id'], victim['participant_id']
+        x, y = _position_at(rng, victim_team, victim['position'], timestamp / 60000)
+        shutdown = 150 * max(0, streaks[victim_id] - 1)
+        events.append({
+            'assistingParticipantIds': assisters, 'bounty': 300, 'killStreakLength': streaks[killer_id],
+            'killerId': killer_id, 'position': {'x': x, 'y': y}, 'shutdownBounty': shutdown,
+            'timestamp': timestamp, 'type': 'CHAMPION_KILL',
+            'victimDamageDealt': _damage_entries(rng, names, [victim_id], rng.randint(1, 3)),
+            'victimDamageReceived': _damage_entries(rng, names, [killer_id] + assisters, rng.randint(2, 5)),
+            'victimId': victim_id
+        })
+        if not assisters:
+            events[-1].pop('assistingParticipantIds')
+            state[killer_id]['solo_kills'] += 1
+        if first_blood:
+            events.append({'killType': 'KILL_FIRST_BLOOD', 'killerId': killer_id, 'position': {'x': x, 'y': y},
+                           'timestamp': timestamp, 'type': 'CHAMPION_SPECIAL_KILL'})
+            first_blood = False
+
+        streaks[killer_id] += 1
+        streaks[victim_id] = 0
+        state[killer_id]['kills'] += 1
+        state[killer_id]['bounties'].append((timestamp, 300 + shutdown))
+        state[victim_id]['deaths'] += 1
+        for assister in assisters:
+            state[assister]['assists'] += 1
+            state[assister]['bounties'].append((timestamp, 150))
+        if timestamp < 600_000:
+            for participant_id in [killer_id] + assisters:
+                state[participant_id]['early_takedowns'] += 1
+
+    def objective_killer(team: int) -> Dict:
+        jungler = next((r for r in team_members[team] if r['position'] == 'JUNGLE'), team_members[team][0])
+        return jungler if rng.random() < 0.7 else rng.choice(team_members[team])
+
+    # Dragons, voidgrubs, herald, baron
+    dragon_counts = {100: 0, 200: 0}
+    soul_type = None
+    timestamp = 300_000 + rng.randint(0, 60_000)
+    while timestamp < end_ms - 30_000:
+        team = winner if rng.random() < 0.62 else loser
+        killer = objective_killer(team)
+        elder = max(dragon_counts.values()) >= 4
+        subtype = 'ELDER_DRAGON' if elder else (soul_type if dragon_counts[100] + dragon_counts[200] >= 2 and soul_type else rng.choice(DRAGON_TYPES))
+        if dragon_counts[100] + dragon_counts[200] == 2 and not soul_type:
+            soul_type = subtype
+        events.append({'bounty': 0, 'killerId': killer['participant_id'], 'killerTeamId': team,
+                       'monsterSubType': subtype, 'monsterType': 'DRAGON',
+                       'position': {'x': DRAGON_PIT[0], 'y': DRAGON_PIT[1]}, 'timestamp': timestamp,
+                       'type': 'ELITE_MONSTER_KILL'})
+        state[killer['participant_id']]['dragons'] += 1
+        if not elder:
+            dragon_counts[team] += 1
+            if dragon_counts[team] == 4:
+                events.append({'name': SOUL_NAMES.get(soul_type, 'Cloud'), 'teamId': team,
+                               'timestamp': timestamp, 'type': 'DRAGON_SOUL_GIVEN'})
+        timestamp += (360_000 if elder or max(dragon_counts.values()) >= 4 else 300_000) + rng.randint(0, 120_000)
+
+    for offset in range(3):
+        timestamp = 360_000 + offset * 100_000 + rng.randint(0, 60_000)
+        if timestamp < end_ms:
+            killer = objective_killer(winner if rng.random() < 0.55 else loser)
+            events.append({'bounty': 0, 'killerId': killer['participant_id'], 'killerTeamId': killer['team'],
+                           'monsterType': 'HORDE', 'position': {'x': BARON_PIT[0], 'y': BARON_PIT[1]},
+                           'timestamp': timestamp, 'type': 'ELITE_MONSTER_KILL'})
+
+    timestamp = 900_000 + rng.randint(0, 180_000)
+    if timestamp < end_ms:
+        killer = objective_killer(winner if rng.random() < 0.6 else loser)
+        events.append({'bounty': 0, 'killerId': killer['participant_id'], 'killerTeamId': killer['team'],
+                       'monsterType': 'RIFTHERALD', 'position': {'x': BARON_PIT[0], 'y': BARON_PIT[1]},
+                       'timestamp': timestamp, 'type': 'ELITE_MONSTER_KILL'})
+        state[killer['participant_id']]['heralds'] += 1
+
+    timestamp = 1_260_000 + rng.randint(0, 300_000)
+    while timestamp < end_ms - 60_000 and rng.random() < 0.7:
+        killer = objective_killer(winner if rng.random() < 0.75 else loser)
+        events.append({'bounty': 0, 'killerId': killer['participant_id'], 'killerTeamId': killer['team'],
+                       'monsterType': 'BARON_NASHOR', 'position': {'x': BARON_PIT[0], 'y': BARON_PIT[1]},
+                       'timestamp': timestamp, 'type': 'ELITE_MONSTER_KILL'})
+        state[killer['participant_id']]['barons'] += 1
+        timestamp += 360_000 + rng.randint(0, 120_000)
+
+    # Turret plates (5:00-14:00)
+    for owner in TEAMS:
+        attackers = team_members[300 - owner]
+        for _ in range(min(15, int(rng.expovariate(1 / (5 if owner == loser else 3))))):
+            lane = rng.choice(list(LANE_STRUCTURES[owner].keys()))
+            laners = [a for a in attackers if POSITION_LANE[a['position']] == lane] or attackers
+            killer = rng.choice(laners) if rng.random() < 0.85 else None
+            x, y = LANE_STRUCTURES[owner][lane][0][1]
+            events.append({'killerId': killer['participant_id'] if killer else 0, 'laneType': lane,
+                           'position': {'x': x, 'y': y}, 'teamId': owner,
+                           'timestamp': rng.randint(300_000, min(end_ms, 840_000) - 1), 'type': 'TURRET_PLATE_DESTROYED'})
+            if killer:
+                state[killer['participant_id']]['plates'] += 1
+                state[killer['participant_id']]['bounties'].append((events[-1]['timestamp'], 160))
+
+    # Structures: the loser loses far more, in lane order; the nexus falls unless someone surrenders
+    structure_counts = {}
+    for owner in TEAMS:
+        fallen = []
+        lanes = list(LANE_STRUCTURES[owner].keys())
+        target = rng.randint(5, 12) if owner == loser else rng.randint(0, 5)
+        progress = {lane: 0 for lane in lanes}
+        while len(fallen) < target:
+            open_lanes = [lane for lane in lanes if progress[lane] < 4]
+            if not open_lanes:
+                break
+            lane = rng.choice(open_lanes)
+            fallen.append((lane,) + LANE_STRUCTURES[owner][lane][progress[lane]])
+            progress[lane] += 1
+        if owner == loser and not surrender:
+            lane = max(lanes, key=lambda l: progress[l])
+            while progress[lane] < 4:
+                fallen.append((lane,) + LANE_STRUCTURES[owner][lane][progress[lane]])
+                progress[lane] += 1
+            fallen.extend(('MID_LANE', 'NEXUS_TURRET', position) for position in NEXUS_TURRETS[owner])
+
+        span_start, span_end = 720_000, end_ms - 5_000
+        times = sorted(rng.randint(span_start, max(span_start + 1, span_end)) for _ in fallen)
+        structure_counts[owner] = {'tower': 0, 'inhibitor': 0}
+        for (lane, structure_type, (x, y)), timestamp in zip(fallen, times):
+            attackers = team_members[300 - owner]
+            killer = rng.choice(attackers) if rng.random() < 0.8 else None
+            assisters = [a['participant_id'] for a in attackers if killer and a is not killer and rng.random() < 0.25]
+            event = {'bounty': 0, 'buildingType': 'INHIBITOR_BUILDING' if structure_type == 'INHIBITOR' else 'TOWER_BUILDING',
+                     'killerId': killer['participant_id'] if killer else 0, 'laneType': lane,
+                     'position': {'x': x, 'y': y}, 'teamId': owner, 'timestamp': timestamp, 'type': 'BUILDING_KILL'}
+            if assisters:
+                event['assistingParticipantIds'] = assisters
+            if structure_type != 'INHIBITOR':
+                event['towerType'] = structure_type
+                structure_counts[owner]['tower'] += 1
+                if killer:
+                    state[killer['participant_id']]['turret_kills'] += 1
+            else:
+                structure_counts[owner]['inhibitor'] += 1
+            events.append(event)
+
+    # Frames: gold/xp/cs progression, level-ups, skills, shopping and wards
+    frames = []
+    frame_count = duration // 60 + 1
+    frame_times = [0] + [minute * FRAME_INTERVAL + rng.randint(0, 60) for minute in range(1, frame_count)] + [end_ms]
+    events.sort(key=lambda e: e['timestamp'])
+    event_index = 0
+    damage_totals = {r['participant_id']: POSITION_PROFILE[r['position']][4] * minutes * math.exp(r['form'] * 0.15) * rng.uniform(0.8, 1.2)
+                     for r in roster}
+
+    for frame_number, frame_time in enumerate(frame_times):
+        previous_time = frame_times[frame_number - 1] if frame_number else 0
+        minute = frame_time / 60000
+        frame_events = []
+
+        if frame_number:
+            step = (frame_time - previous_time) / 60000
+            for r in roster:
+                pid = r['participant_id']
+                s = state[pid]
+                cs_rate, jungle_rate, gold_rate, xp_rate, _, ward_rate, _, _ = POSITION_PROFILE[r['position']]
+                ramp = min(1.0, minute / 2)
+                form = math.exp(r['form'] * 0.08)
+                s['cs'] += cs_rate * step * ramp * form * rng.uniform(0.7, 1.3)
+                s['jungle'] += jungle_rate * step * ramp * form * rng.uniform(0.7, 1.3)
+                s['gold'] += gold_rate * step * form * rng.uniform(0.85, 1.15)
+                s['gold'] += sum(amount for t, amount in s['bounties'] if previous_time < t <= frame_time)
+                s['xp'] += xp_rate * step * form * rng.uniform(0.85, 1.15) * (1 + minute / 60)
+
+                new_level = _level_for_xp(s['xp'])
+                while s['level'] < new_level:
+                    s['level'] += 1
+                    t = rng.randint(int(previous_time) + 1, int(frame_time))
+                    frame_events.append({'level': s['level'], 'participantId': pid, 'timestamp': t, 'type': 'LEVEL_UP'})
+                    if s['level'] in (6, 11, 16):
+                        slot = 4
+                    else:
+                        slot = next(k for k in s['skill_priority'] if s['skills'][k] == 0) \
+                            if any(s['skills'][k] == 0 for k in (1, 2, 3)) \
+                            else next((k for k in s['skill_priority'] if s['skills'][k] < 5), 1)
+                    s['skills'][slot] += 1
+                    frame_events.append({'levelUpType': 'NORMAL', 'participantId': pid, 'skillSlot': slot,
+                                         'timestamp': t + 1, 'type': 'SKILL_LEVEL_UP'})
+
+                # Shop on a back roughly every four minutes
+                if minute > 3 and rng.random() < 0.28 and s['build']:
+                    t = rng.randint(int(previous_time) + 1, int(frame_time))
+                    if rng.random() < 0.03:
+                        component_id, cost = rng.choice(COMPONENTS)
+                        frame_events.append({'itemId': component_id, 'participantId': pid, 'timestamp': t, 'type': 'ITEM_PURCHASED'})
+                        frame_events.append({'afterId': 0, 'beforeId': component_id, 'goldGain': cost,
+                                             'participantId': pid, 'timestamp': t + 900, 'type': 'ITEM_UNDO'})
+                    while s['build'] and s['gold'] - s['spent'] >= s['build'][0][1]:
+                        item_id, cost, kind = s['build'].pop(0)
+                        s['spent'] += cost
+                        if kind == 'complete':
+                            # Components of the finished item are consumed
+                            for consumed in s['components'][-2:]:
+                                s['items'].remove(consumed)
+                                frame_events.append({'itemId': consumed, 'participantId': pid, 'timestamp': t, 'type': 'ITEM_DESTROYED'})
+                            s['components'] = s['components'][:-2]
+                        elif kind == 'boots' and 1001 in s['items']:
+                            s['items'].remove(1001)
+                            s['components'].remove(1001)
+                            frame_events.append({'itemId': 1001, 'participantId': pid, 'timestamp': t, 'type': 'ITEM_DESTROYED'})
+                        else:
+                            s['components'].append(item_id)
+                        s['items'].append(item_id)
+                        frame_events.append({'itemId': item_id, 'participantId': pid, 'timestamp': t, 'type': 'ITEM_PURCHASED'})
+                        t += rng.randint(200, 900)
+                    if 2003 in s['items'] and minute > 8:
+                        s['items'].remove(2003)
+                        frame_events.append({'itemId': 2003, 'participantId': pid, 'timestamp': t, 'type': 'ITEM_SOLD'})
+
+                # Wards
+                placed = sum(1 for _ in range(3) if rng.random() < ward_rate * step / 3 * 1.4) if minute > 1.5 else 0
+                for _ in range(placed):
+                    control = rng.random() < (0.3 if r['position'] == 'UTILITY' else 0.12)
+                    ward_type = 'CONTROL_WARD' if control else (
+                        'SIGHT_WARD' if r['position'] == 'UTILITY' and minute > 8 else
+                        'BLUE_TRINKET' if r['position'] == 'BOTTOM' and minute > 12 else 'YELLOW_TRINKET')
+                    frame_events.append({'creatorId': pid, 'timestamp': rng.randint(int(previous_time) + 1, int(frame_time)),
+                                         'type': 'WARD_PLACED', 'wardType': ward_type})
+                    s['wards_placed'] += 1
+                    s['control_wards'] += control
+                if minute > 3 and rng.random() < ward_rate * step * 0.3:
+                    frame_events.append({'killerId': pid, 'timestamp': rng.randint(int(previous_time) + 1, int(frame_time)),
+                                         'type': 'WARD_KILL', 'wardType': rng.choice(['YELLOW_TRINKET', 'CONTROL_WARD', 'SIGHT_WARD'])})
+                    s['wards_killed'] += 1
+
+        while event_index < len(events) and events[event_index]['timestamp'] <= frame_time:
+            frame_events.append(events[event_index])
+            event_index += 1
+        if frame_number == len(frame_times) - 1:
+            frame_events.append({'gameId': game_id, 'realTimestamp': creation + 30000 + end_ms, 'timestamp': end_ms,
+                                 'type': 'GAME_END', 'winningTeam': winner})
+        frame_events.sort(key=lambda e: e['timestamp'])
+
+        participant_frames = {}
+        progress = frame_time / end_ms
+        template_index = min(frame_number, len(templates['frames']['TOP']) - 1)
+        for r in roster:
+            pid = r['participant_id']
+            s = state[pid]
+            template = templates['frames'][r['position']][template_index]
+            x, y = FOUNTAIN[r['team']] if frame_number == 0 else _position_at(rng, r['team'], r['position'], minute)
+            damage_done = damage_totals[pid] * progress ** 1.3
+            participant_frames[str(pid)] = {
+                'championStats': dict(template['championStats']),
+                'currentGold': int(max(0, s['gold'] - s['spent'])),
+                'damageStats': {
+                    'magicDamageDone': int(damage_done * 1.8), 'magicDamageDoneToChampions': int(damage_done * 0.5),
+                    'magicDamageTaken': int(damage_done * 0.6), 'physicalDamageDone': int(damage_done * 3.2),
+                    'physicalDamageDoneToChampions': int(damage_done * 0.5), 'physicalDamageTaken': int(damage_done * 0.7),
+                    'totalDamageDone': int(damage_done * 5.0), 'totalDamageDoneToChampions': int(damage_done),
+                    'totalDamageTaken': int(damage_done * 1.4), 'trueDamageDone': 0,
+                    'trueDamageDoneToChampions': 0, 'trueDamageTaken': int(damage_done * 0.1)
+                },
+                'goldPerSecond': 0,
+                'jungleMinionsKilled': int(s['jungle']),
+                'level': s['level'],
+                'minionsKilled': int(s['cs']),
+                'participantId': pid,
+                'position': {'x': x, 'y': y},
+                'timeEnemySpentControlled': int(template.get('timeEnemySpentControlled', 0) * progress),
+                'totalGold': int(s['gold']),
+                'xp': int(s['xp'])
+            }
+
+        frames.append({'events': frame_events, 'participantFrames': participant_frames, 'timestamp': frame_time})
+
+    # Match document: sample participant per position, overwritten with simulated results
+    team_kills = {t: sum(state[r['participant_id']]['kills'] for r in team_members[t]) for t in TEAMS}
+    team_damage = {t: sum(damage_totals[r['participant_id']] for r in team_members[t]) for t in TEAMS}
+    participants = []
+    for r in roster:
+        pid = r['participant_id']
+        s = state[pid]
+        player = r['player']
+        p = copy.copy(templates['participants'][r['position']])
+        challenges = dict(p['challenges'])
+        damage = int(damage_totals[pid])
+        kills, deaths, assists = s['kills'], s['deaths'], s['assists']
+        vision_score = int(s['wards_placed'] * 1.1 + s['wards_killed'] * 1.5 + s['control_wards'] * 1.0 + minutes * 0.15)
+        final_items = [i for i in s['items'] if i not in (2003,)][-6:]
+        final_items += [0] * (6 - len(final_items))
+
+        p.update({
+            'assists': assists, 'baronKills': s['barons'], 'champLevel': s['level'],
+            'championId': r['champion_id'], 'championName': r['champion_name'],
+            'damageDealtToObjectives': int(damage * rng.uniform(0.3, 1.5)),
+            'damageDealtToTurrets': int(s['turret_kills'] * 1500 + s['plates'] * 400 + rng.randint(0, 2000)),
+            'damageSelfMitigated': int(damage * rng.uniform(0.4, 2.0)),
+            'deaths': deaths, 'dragonKills': s['dragons'],
+            'firstBloodKill': False, 'gameEndedInEarlySurrender': surrender and duration < 1200,
+            'gameEndedInSurrender': surrender, 'goldEarned': int(s['gold']), 'goldSpent': int(s['spent']),
+            'individualPosition': r['position'], 'lane': POSITION_LANE[r['position']].replace('_LANE', '').replace('MID', 'MIDDLE'),
+            'item0': final_items[0], 'item1': final_items[1], 'item2': final_items[2],
+            'item3': final_items[3], 'item4': final_items[4], 'item5': final_items[5],
+            'item6': TRINKETS.get(r['position'], 3340),
+            'kills': kills, 'neutralMinionsKilled': int(s['jungle']),
+            'participantId': pid, 'profileIcon': player['index'] % 30, 'puuid': player['puuid'],
+            'riotIdGameName': player['game_name'], 'riotIdTagline': 'EUW',
+            'role': 'SUPPORT' if r['position'] == 'UTILITY' else ('CARRY' if r['position'] == 'BOTTOM' else 'SOLO'),
+            'summonerId': f"synth-summoner-{player['index']}", 'summonerLevel': 30 + player['index'] % 500,
+            'summonerName': '', 'teamEarlySurrendered': surrender and duration < 1200 and r['team'] == loser,
+            'teamId': r['team'], 'teamPosition': r['position'],
+            'timeCCingOthers': int(rng.uniform(5, 60)), 'timePlayed': duration,
+            'totalDamageDealtToChampions': damage, 'totalDamageTaken': int(damage * rng.uniform(1.0, 2.2)),
+            'totalDamageShieldedOnTeammates': int(rng.uniform(2000, 12000)) if r['position'] == 'UTILITY' else int(rng.uniform(0, 800)),
+            'totalHealsOnTeammates': int(rng.uniform(1000, 9000)) if r['position'] == 'UTILITY' else int(rng.uniform(0, 500)),
+            'totalMinionsKilled': int(s['cs']), 'turretKills': s['turret_kills'],
+            'visionScore': vision_score, 'visionWardsBoughtInGame': s['control_wards'],
+            'wardsKilled': s['wards_killed'], 'wardsPlaced': s['wards_placed'], 'win': r['team'] == winner,
+        })
+        challenges.update({
+            'damagePerMinute': damage / minutes, 'goldPerMinute': s['gold'] / minutes,
+            'kda': (kills + assists) / max(1, deaths),
+            'killParticipation': (kills + assists) / team_kills[r['team']] if team_kills[r['team']] else 0,
+            'riftHeraldTakedowns': s['heralds'], 'saveAllyFromDeath': int(rng.random() < 0.2),
+            'soloKills': s['solo_kills'], 'takedownsFirstXMinutes': s['early_takedowns'],
+            'teamDamagePercentage': damage / team_damage[r['team']] if team_damage[r['team']] else 0,
+            'turretPlatesTaken': s['plates'], 'visionScorePerMinute': vision_score / minutes,
+            'controlWardsPlaced': s['control_wards'], 'wardTakedowns': s['wards_killed'],
+        })
+        p['challenges'] = challenges
+        participants.append(p)
+
+    first_kill = next((e for e in events if e['type'] == 'CHAMPION_KILL'), None)
+    if first_kill:
+        participants[first_kill['killerId'] - 1]['firstBloodKill'] = True
+
+    teams = []
+    elite = [e for e in events if e['type'] == 'ELITE_MONSTER_KILL']
+    bans = rng.sample([c for c in ALL_CHAMPION_IDS if c not in taken], 10)
+    for team in TEAMS:
+        def objective(monster_type: str) -> Dict:
+            kills = [e for e in elite if e['monsterType'] == monster_type]
+            return {'first': bool(kills) and kills[0]['killerTeamId'] == team,
+                    'kills': sum(1 for e in kills if e['killerTeamId'] == team)}
+        team_doc = copy.copy(templates['team'])
+        team_doc.update({
+            'bans': [{'championId': champion_id, 'pickTurn': turn + (0 if team == 100 else 5)}
+                     for turn, champion_id in enumerate(bans[:5] if team == 100 else bans[5:], 1)],
+            'objectives': {
+                'atakhan': {'first': False, 'kills': 0},
+                'baron': objective('BARON_NASHOR'),
+                'champion': {'first': bool(first_kill) and participants[first_kill['killerId'] - 1]['teamId'] == team,
+                             'kills': team_kills[team]},
+                'dragon': objective('DRAGON'),
+                'horde': objective('HORDE'),
+                'inhibitor': {'first': False, 'kills': structure_counts[300 - team]['inhibitor']},
+                'riftHerald': objective('RIFTHERALD'),
+                'tower': {'first': False, 'kills': structure_counts[300 - team]['tower']},
+            },
+            'teamId': team,
+            'win': team == winner
+        })
+        teams.append(team_doc)
+
+    info = dict(templates['info'])
+    info.update({
+        'endOfGameResult': 'GameComplete', 'gameCreation': creation, 'gameDuration': duration,
+        'gameEndTimestamp': creation + 30000 + end_ms, 'gameId': game_id,
+        'gameName': f"teambuilder-match-{game_id}", 'gameStartTimestamp': creation + 30000,
+        'gameVersion': game_version, 'participants': participants, 'platformId': 'EUW1',
+        'queueId': 420, 'teams': teams
+    })
+    puuids = [r['player']['puuid'] for r in roster]
+    match = {'metadata': {'dataVersion': '2', 'matchId': match_id, 'participants': puuids}, 'info': info}
+    timeline = {
+        'metadata': {'dataVersion': '2', 'matchId': match_id, 'participants': puuids},
+        'info': {
+            'endOfGameResult': 'GameComplete', 'frameInterval': FRAME_INTERVAL, 'frames': frames, 'gameId': game_id,
+            'participants': [{'participantId': i, 'puuid': puuid} for i, puuid in enumerate(puuids, 1)]
+        }
+    }
+    return match, timeline
+
+
+# ============================================================================
+# Drivers
+# ============================================================================
+
+def generate_matches(player_count: int = 1000, games_per_player: int = 20, seed: int = 42,
+                     duo_share: float = 0.3, duo_overlap: float = 0.5,
+                     start_date: str = '2025-09-01', days: int = 90,
+                     season: int = 15, first_patch: int = 18, patch_days: int = 14) -> Iterator[Tuple[dict, dict]]:
+    """
+    Lazily generate (match, timeline) pairs for a simulated player base
+
+    Args:
+        player_count: Players in the simulated base (at least 10)
+        games_per_player: Approximate ranked games per player
+        seed: Random seed (same arguments always give the same documents)
+        duo_share: Fraction of players with a regular duo partner
+        duo_overlap: Fraction of a paired player's games played with the partner
+        start_date: Date of the first game (YYYY-MM-DD, UTC)
+        days: Days the games are spread over
+        season: Season number for gameVersion
+        first_patch: Patch at start_date
+        patch_days: Days per patch
+
+    Yields:
+        (match document, timeline document)
+    """
+    players = generate_player_pool(player_count, seed, duo_share)
+    total_games = player_count * games_per_player // 10
+    start_ms = int(datetime.strptime(start_date, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp() * 1000)
+    spacing = max(1, days * 86_400_000 // max(1, total_games))
+
+    for game_index, slots in enumerate(schedule_games(players, games_per_player, duo_overlap, seed)):
+        yield simulate_game(game_index, slots, players, seed, start_ms, spacing, season, first_patch, patch_days)
+
+
+# Worker state for --workers (set once per process by _init_worker)
+_worker_context: Dict = {}
+
+
+def _init_worker(context: Dict):
+    _worker_context.update(context)
+    _worker_context['players'] = generate_player_pool(context['player_count'], context['seed'], context['duo_share'])
+
+
+def _simulate_serialized(task: Tuple[int, List[Tuple[int, int, str]]]) -> Tuple[str, str, str, List[str]]:
+    """Simulate a game in a worker and return (match_id, match JSON, timeline JSON, puuids)"""
+    game_index, slots = task
+    c = _worker_context
+    match, timeline = simulate_game(game_index, slots, c['players'], c['seed'], c['start_ms'], c['spacing'],
+                                    c['season'], c['first_patch'], c['patch_days'])
+    return (match['metadata']['matchId'], json.dumps(match, separators=(',', ':')),
+            json.dumps(timeline, separators=(',', ':')), match['metadata']['participants'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic match-v5 match and timeline documents')
+    parser.add_argument('--players', type=int, default=1000, help='Players in the simulated base')
+    parser.add_argument('--games-per-player', type=int, default=20, help='Approximate games per player')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--duo-share', type=float, default=0.3, help='Fraction of players with a regular duo partner')
+    parser.add_argument('--duo-overlap', type=float, default=0.5, help='Fraction of a paired player\'s games with the partner')
+    parser.add_argument('--start-date', default='2025-09-01', help='Date of the first game (YYYY-MM-DD)')
+    parser.add_argument('--days', type=int, default=90, help='Days the games are spread over')
+    parser.add_argument('--first-patch', type=int, default=18, help='Patch number at the start date')
+    parser.add_argument('--limit', type=int, help='Stop after this many matches')
+    parser.add_argument('--out', default='../data/synthetic', help='Output directory')
+    parser.add_argument('--format', choices=['files', 'jsonl'], default='files',
+                        help='files: <match_id>.json + <match_id>_timeline.json (mock server fixtures); jsonl: one line per document')
+    parser.add_argument('--gzip', action='store_true', help='Compress jsonl output')
+    parser.add_argument('--workers', type=int, default=1, help='Processes simulating games in parallel')
+    args = parser.parse_args()
+
+    if args.players < 10:
+        print("[ERROR] At least 10 players are needed to fill a game")
+        return
+
+    os.makedirs(args.out, exist_ok=True)
+    players = generate_player_pool(args.players, args.seed, args.duo_share)
+    total_games = args.players * args.games_per_player // 10
+    if args.limit:
+        total_games = min(total_games, args.limit)
+    start_ms = int(datetime.strptime(args.start_date, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp() * 1000)
+    context = {
+        'player_count': args.players, 'seed': args.seed, 'duo_share': args.duo_share,
+        'start_ms': start_ms, 'spacing': max(1, args.days * 86_400_000 // max(1, args.players * args.games_per_player // 10)),
+        'season': 15, 'first_patch': args.first_patch, 'patch_days': 14,
+    }
+
+    print("=" * 60)
+    print("SYNTHETIC MATCH GENERATOR")
+    print("=" * 60)
+    print(f"Players: {args.players}, games/player: {args.games_per_player}, seed: {args.seed}")
+    print(f"Duos: {args.duo_share:.0%} of players, {args.duo_overlap:.0%} of their games together")
+    print(f"Target: ~{total_games} matches -> {args.out} ({args.format})\n")
+
+    # Match numbers per player (compact, so 1M-match runs fit in memory)
+    player_matches = [array('I') for _ in players]
+    puuid_index = {player['puuid']: player['index'] for player in players}
+
+    if args.format == 'jsonl':
+        suffix = '.jsonl.gz' if args.gzip else '.jsonl'
+        opener = (lambda path: gzip.open(path, 'wt', encoding='utf-8')) if args.gzip else (lambda path: open(path, 'w', encoding='utf-8'))
+        match_file = opener(os.path.join(args.out, f"matches{suffix}"))
+        timeline_file = opener(os.path.join(args.out, f"timelines{suffix}"))
+
+    tasks = islice(enumerate(schedule_games(players, args.games_per_player, args.duo_overlap, args.seed)), total_games)
+    start = time.perf_counter()
+    written = 0
+
+    if args.workers > 1:
+        pool = Pool(args.workers, initializer=_init_worker, initargs=(context,))
+        results = pool.imap(_simulate_serialized, tasks, chunksize=16)
+    else:
+        _init_worker(context)
+        results = map(_simulate_serialized, tasks)
+
+    for match_id, match_json, timeline_json, puuids in results:
+        if args.format == 'files':
+            with open(os.path.join(args.out, f"{match_id}.json"), 'w', encoding='utf-8') as f:
+                f.write(match_json)
+            with open(os.path.join(args.out, f"{match_id}_timeline.json"), 'w', encoding='utf-8') as f:
+                f.write(timeline_json)
+        else:
+            match_file.write(match_json + '\n')
+            timeline_file.write(timeline_json + '\n')
+
+        for puuid in puuids:
+            player_matches[puuid_index[puuid]].append(int(match_id.split('_')[1]) - MATCH_ID_BASE)
+        written += 1
+        if written % 1000 == 0:
+            elapsed = time.perf_counter() - start
+            print(f"  {written}/{total_games} matches ({written / elapsed:.0f}/s)")
+
+    if args.workers > 1:
+        pool.close()
+        pool.join()
+    if args.format == 'jsonl':
+        match_file.close()
+        timeline_file.close()
+
+    # Index for the mock server: Riot ID -> PUUID and PUUID -> match IDs (newest first)
+    with open(os.path.join(args.out, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'accounts': {f"{p['game_name']}#EUW": p['puuid'] for p in players},
+            'matches': {p['puuid']: [f"EUW1_{MATCH_ID_BASE + n}" for n in reversed(player_matches[p['index']])]
+                        for p in players if player_matches[p['index']]},
+        }, f)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n[OK] {written} matches written in {elapsed:.1f}s ({written / elapsed:.1f}/s)")
+    print(f"[OK] Index written to {os.path.join(args.out, 'index.json')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Team formation candidate search
+Proposes full five-role lineups from the roster around one player. Each lineup is scored
+on rank proximity to that player, role fit (share of games in the assigned role), champion
+pool depth in the role and past co-play (player_teammates). The roster is loaded once into
+per-role candidate arrays; each query is a branch-and-bound over the four open role slots
+that only expands partial lineups whose optimistic score can still reach the top results.
+Usage: python team_builder.py "Name" [--role MID] [--top 5]
+       python team_builder.py --synthetic 5000    # time the search on a random roster
+"""
+
+import argparse
+import heapq
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from match_processing import ROLE_MAPPING
+
+ROLES = ('TOP', 'JUNGLE', 'MID', 'ADC', 'SUPPORT')
+TIERS = ('IRON', 'BRONZE', 'SILVER', 'GOLD', 'PLATINUM', 'EMERALD', 'DIAMOND', 'MASTER', 'GRANDMASTER', 'CHALLENGER')
+DIVISIONS = {'IV': 0, 'III': 1, 'II': 2, 'I': 3}
+
+# Score weights of the per-player terms and of co-play (all terms are 0-1)
+WEIGHTS = {'rank': 0.35, 'role': 0.3, 'pool': 0.15, 'coplay': 0.2}
+
+# Rank proximity falls to 0 this many divisions away from the anchor player (two tiers)
+RANK_SPREAD = 8
+
+# Players qualify for a role with this share of their games in it (or as their main role)
+MIN_ROLE_FIT = 0.2
+MAIN_ROLE_FIT = 0.6
+
+# Distinct champions played in a role for a full pool score
+POOL_TARGET = 5
+
+# Games together for a full co-play score of a pair
+COPLAY_CAP = 10
+
+# Best candidates kept per open role for each query (by optimistic score)
+CANDIDATES_PER_ROLE = 60
+
+# match_stats history used for role fit and champion pools
+ROLE_HISTORY_DAYS = 120
+
+PAGE_SIZE = 1000
+
+# Each lineup has 4 open slots and 10 pairs; scores are normalised to 0-1
+OPEN_SLOTS = len(ROLES) - 1
+PAIRS = len(ROLES) * (len(ROLES) - 1) // 2
+
+
+def rank_value(tier: Optional[str], division: Optional[str], lp: Optional[int]) -> Optional[float]:
+    """Rank in divisions above Iron IV (LP as a fraction of a division), None if unranked"""
+    if tier not in TIERS:
+        return None
+    return TIERS.index(tier) * 4 + DIVISIONS.get(division, 0) + min(lp or 0, 100) / 100
+
+
+class TeamBuilder:
+    """Per-role candidate arrays and the co-play graph of the roster, with the lineup search"""
+
+    def __init__(self, players: List[Dict], role_games: Dict[str, Dict[str, int]],
+                 role_pools: Dict[str, Dict[str, int]], coplay: Dict[str, Dict[str, int]]):
+        """
+        Args:
+            players: Roster rows with puuid, summoner_name, tier, rank, lp, main_role
+            role_games: puuid -> role -> games
+            role_pools: puuid -> role -> distinct champions played
+            coplay: puuid -> teammate puuid -> games together (both directions)
+        """
+        self.players = players
+        self.index = {player['puuid']: i for i, player in enumerate(players)}
+        count = len(players)
+
+        ranks = [rank_value(p.get('tier'), p.get('rank'), p.get('lp')) for p in players]
+        known = [value for value in ranks if value is not None]
+        # Unranked players are placed at the roster median
+        median = float(np.median(known)) if known else 0.0
+        self.rank = np.array([median if value is None else value for value in ranks])
+
+        self.role_fit = np.zeros((count, len(ROLES)))
+        self.pool = np.zeros((count, len(ROLES)))
+        for i, player in enumerate(players):
+            games = role_games.get(player['puuid'], {})
+            total = sum(games.values())
+            pools = role_pools.get(player['puuid'], {})
+            for r, role in enumerate(ROLES):
+                if total:
+                    self.role_fit[i, r] = games.get(role, 0) / total
+                self.pool[i, r] = min(pools.get(role, 0), POOL_TARGET) / POOL_TARGET
+            main_role = ROLE_MAPPING.get(player.get('main_role'), player.get('main_role'))
+            if main_role in ROLES:
+                r = ROLES.index(main_role)
+                self.role_fit[i, r] = max(self.role_fit[i, r], MAIN_ROLE_FIT)
+
+        # Per-role candidate lists (fixed for the roster; queries re-rank them)
+        self.candidates = {role: np.flatnonzero(self.role_fit[:, r] >= MIN_ROLE_FIT) for r, role in enumerate(ROLES)}
+
+        # Sparse co-play scores by player index, and each player's best values (for the bound)
+        self.coplay: List[Dict[int, float]] = [{} for _ in range(count)]
+        for puuid, teammates in coplay.items():
+            if puuid not in self.index:
+                continue
+            row = self.coplay[self.index[puuid]]
+            for teammate, games in teammates.items():
+                if teammate in self.index:
+                    row[self.index[teammate]] = min(games, COPLAY_CAP) / COPLAY_CAP
+        # best_coplay[i, k] = sum of player i's k best co-play scores (k = 0..4), for ranking candidates
+        self.best_coplay = np.zeros((count, len(ROLES)))
+        for i, row in enumerate(self.coplay):
+            top = sorted(row.values(), reverse=True)[:OPEN_SLOTS]
+            self.best_coplay[i, 1:len(top) + 1] = np.cumsum(top)
+        self.best_coplay = np.maximum.accumulate(self.best_coplay, axis=1)
+
+    def _unary(self, indices: np.ndarray, role: str, anchor: int) -> np.ndarray:
+        """Per-player score terms (rank proximity, role fit, pool) of candidates for a role"""
+        r = ROLES.index(role)
+        proximity = np.clip(1 - np.abs(self.rank[indices] - self.rank[anchor]) / RANK_SPREAD, 0, 1)
+        return (WEIGHTS['rank'] * proximity + WEIGHTS['role'] * self.role_fit[indices, r]
+                + WEIGHTS['pool'] * self.pool[indices, r])
+
+    def suggest(self, puuid: str, role: Optional[str] = None, top: int = 5) -> List[Dict]:
+        """
+        Best lineups around a player
+
+        Args:
+            puuid: Anchor player
+            role: Anchor player's role (default: their best-fitting role)
+            top: Number of lineups
+
+        Returns:
+            Lineups, best first: {'score', 'members': [{'role', 'puuid', 'summoner_name'}]}
+        """
+        anchor = self.index[puuid]
+        if role is None:
+            role = ROLES[int(np.argmax(self.role_fit[anchor]))]
+        open_roles = [r for r in ROLES if r != role]
+
+        # Candidate lists for this query. A candidate's value holds its exact per-player terms and
+        # its co-play with the anchor; only co-play among the open slots is left to bound.
+        slots = []
+        for open_role in open_roles:
+            indices = self.candidates[open_role]
+            indices = indices[indices != anchor]
+            with_anchor = np.array([self.coplay[i].get(anchor, 0.0) for i in indices])
+            values = self._unary(indices, open_role, anchor) / OPEN_SLOTS + WEIGHTS['coplay'] * with_anchor / PAIRS
+            optimistic = values + WEIGHTS['coplay'] * self.best_coplay[indices, OPEN_SLOTS - 1] / PAIRS
+            keep = np.argsort(-optimistic)[:CANDIDATES_PER_ROLE]
+            slots.append((open_role, indices[keep], values[keep]))
+        if any(len(indices) == 0 for _, indices, _ in slots):
+            return []
+        # Fewest candidates first: the tightest slots prune the most near the root
+        slots.sort(key=lambda slot: len(slot[1]))
+
+        # bounds[depth] = candidates sorted by optimistic value at that depth: their value plus
+        # their best co-play with `depth` candidates of the other slots (pairs are counted at
+        # the later slot); suffix[d] = best optimistic total of slots d..end
+        slot_members = [set(indices.tolist()) for _, indices, _ in slots]
+        bounds = []
+        for depth, (_, indices, values) in enumerate(slots):
+            others = set().union(*(members for d, members in enumerate(slot_members) if d != depth))
+            extra = np.array([
+                sum(sorted((score for teammate, score in self.coplay[i].items() if teammate in others),
+                           reverse=True)[:depth])
+                for i in indices
+            ])
+            slot_bounds = values + WEIGHTS['coplay'] * extra / PAIRS
+            order = np.argsort(-slot_bounds)
+            bounds.append((indices[order].tolist(), values[order].tolist(), slot_bounds[order].tolist()))
+        suffix = [0.0] * (len(slots) + 1)
+        for depth in range(len(slots) - 1, -1, -1):
+            suffix[depth] = suffix[depth + 1] + bounds[depth][2][0]
+
+        best: List[Tuple[float, Tuple[int, ...]]] = []
+        chosen = [anchor]
+        last = len(slots) - 1
+        coplay_weight = WEIGHTS['coplay'] / PAIRS
+
+        def search(depth: int, score: float):
+            indices, values, slot_bounds = bounds[depth]
+            rest = suffix[depth + 1]
+            for candidate, value, bound in zip(indices, values, slot_bounds):
+                threshold = best[0][0] if len(best) == top else -np.inf
+                # Candidates are sorted by bound, so no later one can beat the threshold either
+                if score + bound + rest <= threshold:
+                    return
+                if candidate in chosen:
+                    continue
+                pairs = self.coplay[candidate]
+                total = score + value
+                if pairs:
+                    total += coplay_weight * sum(pairs.get(member, 0.0) for member in chosen[1:])
+                if depth < last:
+                    if total + rest > threshold:
+                        chosen.append(candidate)
+                        search(depth + 1, total)
+                        chosen.pop()
+                elif len(best) < top:
+                    heapq.heappush(best, (total, tuple(chosen) + (candidate,)))
+                elif total > threshold:
+                    heapq.heapreplace(best, (total, tuple(chosen) + (candidate,)))
+
+        search(0, 0.0)
+
+        lineups = []
+        for score, members in sorted(best, reverse=True):
+            roles = [role] + [open_role for open_role, _, _ in slots]
+            lineup = sorted(zip(roles, members), key=lambda member: ROLES.index(member[0]))
+            lineups.append({
+                'score': round(float(score), 4),
+                'members': [{
+                    'role': member_role,
+                    'puuid': self.players[i]['puuid'],
+                    'summoner_name': self.players[i].get('summoner_name'),
+                } for member_role, i in lineup],
+            })
+        return lineups
+
+
+def _fetch_all(query_builder) -> List[Dict]:
+    """All rows of a PostgREST query, PAGE_SIZE at a time"""
+    rows = []
+    start = 0
+    while True:
+        batch = query_builder().range(start, start + PAGE_SIZE - 1).execute().data or []
+        rows.extend(batch)
+        if len(batch) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def load_team_builder() -> TeamBuilder:
+    """TeamBuilder over the current roster, recent match_stats and player_teammates"""
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    supabase = create_client(os.getenv('SUPABASE_URL'),
+                             os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY'))
+
+    players = _fetch_all(lambda: supabase.table('players')
+                         .select('id, puuid, summoner_name, tier, rank, lp, main_role')
+                         .not_.is_('puuid', 'null').order('id'))
+    puuids = {player['id']: player['puuid'] for player in players}
+
+    since = (datetime.now(timezone.utc) - timedelta(days=ROLE_HISTORY_DAYS)).date().isoformat()
+    stats = _fetch_all(lambda: supabase.table('match_stats').select('player_id, role, champion_id')
+                       .gte('match_date', since).order('id'))
+    role_games: Dict[str, Dict[str, int]] = {}
+    champions: Dict[str, Dict[str, set]] = {}
+    for row in stats:
+        puuid = puuids.get(row['player_id'])
+        if not puuid:
+            continue
+        games = role_games.setdefault(puuid, {})
+        games[row['role']] = games.get(row['role'], 0) + 1
+        champions.setdefault(puuid, {}).setdefault(row['role'], set()).add(row['champion_id'])
+    role_pools = {puuid: {role: len(ids) for role, ids in roles.items()} for puuid, roles in champions.items()}
+
+    coplay: Dict[str, Dict[str, int]] = {}
+    for row in _fetch_all(lambda: supabase.table('player_teammates')
+                          .select('puuid, teammate_puuid, games').order('puuid').order('teammate_puuid')):
+        coplay.setdefault(row['puuid'], {})[row['teammate_puuid']] = row['games']
+
+    return TeamBuilder(players, role_games, role_pools, coplay)
+
+
+def synthetic_team_builder(count: int, seed: int = 42) -> TeamBuilder:
+    """TeamBuilder over a random roster of count players (for timing the search)"""
+    rng = random.Random(seed)
+    players, role_games, role_pools, coplay = [], {}, {}, {}
+    for i in range(count):
+        puuid = f'synthetic-{i}'
+        main_role = rng.choice(ROLES)
+        players.append({
+            'puuid': puuid,
+            'summoner_name': f'Player {i}',
+            'tier': rng.choice(TIERS[:7]),
+            'rank': rng.choice(list(DIVISIONS)),
+            'lp': rng.randint(0, 99),
+            'main_role': main_role,
+        })
+        role_games[puuid] = {role: rng.randint(0, 10) + (40 if role == main_role else 0) for role in ROLES}
+        role_pools[puuid] = {role: rng.randint(1, 8) for role in ROLES}
+    for i in range(count):
+        for j in rng.sample(range(count), 5):
+            if i != j:
+                games = rng.randint(1, 15)
+                coplay.setdefault(f'synthetic-{i}', {})[f'synthetic-{j}'] = games
+                coplay.setdefault(f'synthetic-{j}', {})[f'synthetic-{i}'] = games
+    return TeamBuilder(players, role_games, role_pools, coplay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Propose five-role lineups around a player')
+    parser.add_argument('player', nargs='?', help='Summoner name of the anchor player')
+    parser.add_argument('--role', choices=ROLES, help="Anchor player's role (default: best fit)")
+    parser.add_argument('--top', type=int, default=5, help='Number of lineups')
+    parser.add_argument('--synthetic', type=int, metavar='N', help='Time the search on N random players')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        started = time.perf_counter()
+        builder = synthetic_team_builder(args.synthetic)
+        print(f"[OK] Built {args.synthetic} player index in {time.perf_counter() - started:.2f}s")
+        anchors = [player['puuid'] for player in builder.players[:50]]
+        started = time.perf_counter()
+        for puuid in anchors:
+            builder.suggest(puuid, top=args.top)
+        elapsed = (time.perf_counter() - started) / len(anchors)
+        print(f"[OK] {elapsed * 1000:.1f} ms per query (top {args.top}, {len(anchors)} anchors)")
+        return
+
+    if not args.player:
+        parser.error('player is required unless --synthetic is given')
+
+    builder = load_team_builder()
+    anchor = next((p for p in builder.players if p.get('summoner_name') == args.player), None)
+    if not anchor:
+        print(f"[ERROR] {args.player} is not on the roster")
+        return
+
+    lineups = builder.suggest(anchor['puuid'], args.role, args.top)
+    if not lineups:
+        print(f"[WARN] No full lineup found for {args.player}")
+    for rank, lineup in enumerate(lineups, 1):
+        members = ', '.join(f"{m['role']}: {m['summoner_name']}" for m in lineup['members'])
+        print(f"{rank}. [{lineup['score']:.3f}] {members}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,7 @@
 Test fetching top 3 champions for a player
 """
 
-import os
-import requests
-import time
-from dotenv import load_dotenv
-
-load_dotenv()
-
-API_KEY = os.getenv('RIOT_API_KEY')
-REGION = "euw1"
+from riot_api import REGION, riot_get
 
 def get_top_champions(puuid: str, count: int = 3):
     """
@@ -23,24 +15,10 @@ def get_top_champions(puuid: str, count: int = 3):
     Returns:
         List of champion mastery data
     """
-    url = f"https://{REGION}.api.riotgames.com/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}/top"
-    headers = {"X-Riot-Token": API_KEY}
     params = {"count": count}
 
     print(f"Fetching top {count} champions for PUUID: {puuid[:20]}...")
-
-    try:
-        time.sleep(1.2)  # Rate limit protection
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Error {response.status_code}: {response.text}")
-            return None
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        return None
+    return riot_get(REGION, f"/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}/top", params=params)
 
 
 # Test with petRoXD's PUUID (from earlier test)
@@ -0,0 +1,103 @@
+"""
+Projected match-v5 timeline decoding
+Decodes timeline JSON bytes straight into the few fields the extractors read, instead of
+building the full ~1.2 MB object graph with response.json(). The result has the same
+dictionary shape as the API response, so existing code reads it unchanged.
+
+Usage:
+    from timeline_parser import parse_timeline
+    timeline = parse_timeline(response.content)                     # analytics / role metrics
+    timeline = parse_timeline(response.content, include_stats=True)  # + championStats/damageStats
+"""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, TypedDict, Union
+
+import msgspec
+
+# Event types read by match_processing and RoleMetricsCalculator
+DEFAULT_EVENT_TYPES = frozenset({'CHAMPION_KILL', 'BUILDING_KILL', 'ELITE_MONSTER_KILL'})
+
+
+class Position(TypedDict):
+    x: int
+    y: int
+
+
+class ParticipantFrame(TypedDict, total=False):
+    participantId: int
+    position: Position
+    level: int
+    currentGold: int
+    totalGold: int
+    xp: int
+    minionsKilled: int
+    jungleMinionsKilled: int
+    timeEnemySpentControlled: int
+
+
+class ParticipantFrameWithStats(ParticipantFrame, total=False):
+    championStats: Dict[str, int]
+    damageStats: Dict[str, int]
+
+
+class _EventType(msgspec.Struct):
+    """Just enough of an event to decide whether to keep it"""
+    type: str
+
+
+def _timeline_type(frame_type: type) -> type:
+    """Projected timeline TypedDict for a participant frame type (unlisted fields are skipped while decoding)"""
+    frame = TypedDict(f'Frame[{frame_type.__name__}]', {
+        'timestamp': int,
+        'events': List[msgspec.Raw],
+        'participantFrames': Dict[str, frame_type],
+    }, total=False)
+    info = TypedDict(f'Info[{frame_type.__name__}]', {
+        'endOfGameResult': str,
+        'frameInterval': int,
+        'frames': List[frame],
+        'gameId': int,
+        'participants': List[Dict[str, Any]],
+    }, total=False)
+    return TypedDict(f'Timeline[{frame_type.__name__}]', {
+        'metadata': Dict[str, Any],
+        'info': info,
+    }, total=False)
+
+
+_timeline_decoder = msgspec.json.Decoder(_timeline_type(ParticipantFrame))
+_timeline_with_stats_decoder = msgspec.json.Decoder(_timeline_type(ParticipantFrameWithStats))
+_event_type_decoder = msgspec.json.Decoder(_EventType)
+_event_decoder = msgspec.json.Decoder()
+
+
+def parse_timeline(data: Union[bytes, str], event_types: Optional[Iterable[str]] = DEFAULT_EVENT_TYPES,
+                   include_stats: bool = False) -> Dict:
+    """
+    Decode a match-v5 timeline keeping only the projected fields and events
+
+    Args:
+        data: Raw timeline JSON (response.content)
+        event_types: Event types to keep in full (None keeps every event)
+        include_stats: Also keep per-frame championStats and damageStats
+
+    Returns:
+        Timeline dictionary shaped like the API response, with:
+        - metadata and info.participants as-is
+        - per frame: timestamp, filtered events, participantFrames with position, level, gold, xp and CS
+    """
+    decoder = _timeline_with_stats_decoder if include_stats else _timeline_decoder
+    timeline = decoder.decode(data)
+    keep: Optional[FrozenSet[str]] = frozenset(event_types) if event_types is not None else None
+
+    for frame in timeline.get('info', {}).get('frames', []):
+        raw_events = frame.get('events', [])
+        if keep is None:
+            frame['events'] = [_event_decoder.decode(raw) for raw in raw_events]
+        else:
+            frame['events'] = [
+                _event_decoder.decode(raw) for raw in raw_events
+                if _event_type_decoder.decode(raw).type in keep
+            ]
+
+    return timeline
@@ -0,0 +1,585 @@
+"""
+Timeline analysis stages for timeline_engine.run_stages
+Each stage reads only the event types it declares and keeps its own state, so any
+combination of them runs in the same single pass over the timeline.
+
+Usage:
+    from timeline_engine import run_stages
+    from timeline_stages import TeamfightStage, ingest_stages
+    fights = run_stages(match_data, timeline, [TeamfightStage()])['teamfights']
+    results = run_stages(match_data, timeline, ingest_stages())   # everything stored at ingest
+"""
+
+import bisect
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from item_data import completed_items
+from jungle_pathing import paths_for_match
+from timeline_engine import TimelineStage, participant_teams
+
+# Kills belong to the same fight when within FIGHT_GAP_MS of the fight's previous kill
+# and within FIGHT_RADIUS map units of its centre
+FIGHT_GAP_MS = 15000
+FIGHT_RADIUS = 2500
+
+# A group of kills counts as a teamfight with at least this many kills and participants
+MIN_FIGHT_KILLS = 2
+MIN_FIGHT_PARTICIPANTS = 5
+
+
+class TeamfightStage(TimelineStage):
+    """
+    Group CHAMPION_KILL events into fights by time and position (one sweep over the kills)
+
+    Result: list of fights, each with
+        start_ms, end_ms, x, y: time span and kill centroid
+        kills: [[timestamp, killer_id, victim_id, [assist ids]]]
+        blue, red: participant IDs involved per team (killers, victims, assisters)
+        blue_kills, red_kills: kills scored by each team
+        winner: 100, 200 or 0 for an even trade
+        gold_swing: kill + shutdown bounty gold won by blue minus red
+    """
+    name = 'teamfights'
+    event_types = frozenset({'CHAMPION_KILL'})
+
+    def start(self, match_data: dict, timeline: dict):
+        self.teams = participant_teams(match_data)
+        self.open: List[Dict] = []
+        self.closed: List[Dict] = []
+
+    def _close_stale(self, timestamp: int):
+        """Move fights whose last kill is older than the gap to closed"""
+        still_open = []
+        for fight in self.open:
+            (still_open if timestamp - fight['end_ms'] <= FIGHT_GAP_MS else self.closed).append(fight)
+        self.open = still_open
+
+    def on_event(self, event: dict):
+        timestamp = event.get('timestamp', 0)
+        position = event.get('position') or {}
+        x, y = position.get('x'), position.get('y')
+        if x is None or y is None:
+            return
+        self._close_stale(timestamp)
+
+        fight: Optional[Dict] = None
+        best = FIGHT_RADIUS
+        for candidate in self.open:
+            distance = math.hypot(candidate['x'] - x, candidate['y'] - y)
+            if distance <= best:
+                fight, best = candidate, distance
+        if fight is None:
+            fight = {'start_ms': timestamp, 'end_ms': timestamp, 'x': x, 'y': y, 'kills': []}
+            self.open.append(fight)
+
+        kills = fight['kills']
+        kills.append([timestamp, event.get('killerId', 0), event.get('victimId', 0),
+                      list(event.get('assistingParticipantIds') or []),
+                      event.get('bounty', 0) + event.get('shutdownBounty', 0)])
+        # Running centroid of the fight's kills
+        fight['x'] += (x - fight['x']) / len(kills)
+        fight['y'] += (y - fight['y']) / len(kills)
+        fight['end_ms'] = timestamp
+
+    def result(self) -> List[Dict]:
+        fights = []
+        for fight in sorted(self.closed + self.open, key=lambda f: f['start_ms']):
+            if len(fight['kills']) < MIN_FIGHT_KILLS:
+                continue
+
+            involved = {100: set(), 200: set()}
+            team_kills = {100: 0, 200: 0}
+            team_gold = {100: 0, 200: 0}
+            for _, killer, victim, assists, gold in fight['kills']:
+                victim_team = self.teams.get(victim)
+                scoring_team = 300 - victim_team if victim_team in (100, 200) else self.teams.get(killer)
+                if scoring_team not in team_kills:
+                    continue
+                team_kills[scoring_team] += 1
+                team_gold[scoring_team] += gold
+                for participant_id in [killer, victim] + assists:
+                    team = self.teams.get(participant_id)
+                    if team in involved:
+                        involved[team].add(participant_id)
+
+            if len(involved[100]) + len(involved[200]) < MIN_FIGHT_PARTICIPANTS:
+                continue
+
+            fights.append({
+                'start_ms': fight['start_ms'],
+                'end_ms': fight['end_ms'],
+                'x': int(round(fight['x'])),
+                'y': int(round(fight['y'])),
+                'kills': [kill[:4] for kill in fight['kills']],
+                'blue': sorted(involved[100]),
+                'red': sorted(involved[200]),
+                'blue_kills': team_kills[100],
+                'red_kills': team_kills[200],
+                'winner': 100 if team_kills[100] > team_kills[200] else 200 if team_kills[200] > team_kills[100] else 0,
+                'gold_swing': team_gold[100] - team_gold[200],
+            })
+        return fights
+
+
+def player_teamfight_stats(fights: List[Dict], participant_id: int, team_id: int) -> Dict:
+    """
+    match_stats teamfight columns for one participant
+
+    Args:
+        fights: TeamfightStage result
+        participant_id: Participant (1-10)
+        team_id: Participant's team (100/200)
+
+    Returns:
+        teamfights, teamfights_participated, teamfights_won, teamfight_kills, teamfight_deaths
+    """
+    side = 'blue' if team_id == 100 else 'red'
+    participated = [fight for fight in fights if participant_id in fight[side]]
+    return {
+        'teamfights': len(fights),
+        'teamfights_participated': len(participated),
+        'teamfights_won': sum(1 for fight in participated if fight['winner'] == team_id),
+        'teamfight_kills': sum(1 for fight in participated for kill in fight['kills'] if kill[1] == participant_id),
+        'teamfight_deaths': sum(1 for fight in participated for kill in fight['kills'] if kill[2] == participant_id),
+    }
+
+
+# Minutes at which lane-opponent differences are taken
+LANE_DIFF_MINUTES = (10, 15)
+
+
+class LaneDiffStage(TimelineStage):
+    """
+    Gold, XP and CS (lane + jungle) differences against the direct lane opponent at fixed minutes
+
+    The opponent is the enemy with the same teamPosition. All ten participants are diffed
+    at once per checkpoint as arrays indexed by participant. Participants without a unique
+    opponent (missing/duplicate positions) and checkpoints past the end of the game get None.
+
+    Result: {participant_id: {'gold_diff_at_10': ..., 'xp_diff_at_10': ..., 'cs_diff_at_10': ..., ...}}
+    """
+    name = 'lane_diffs'
+    wants_frames = True
+
+    def start(self, match_data: dict, timeline: dict):
+        participants = match_data['info']['participants']
+        self.participant_ids = [p['participantId'] for p in participants]
+        self.checkpoints: Dict[int, np.ndarray] = {}
+
+        # opponent[i] = index of participant i's lane opponent, -1 if there is none
+        slots: Dict[tuple, List[int]] = {}
+        for index, p in enumerate(participants):
+            if p.get('teamPosition'):
+                slots.setdefault((p['teamId'], p['teamPosition']), []).append(index)
+        self.opponent = np.full(len(participants), -1, dtype=np.int64)
+        for index, p in enumerate(participants):
+            own = slots.get((p['teamId'], p.get('teamPosition')), [])
+            enemy = slots.get((300 - p['teamId'], p.get('teamPosition')), [])
+            if p.get('teamPosition') and len(own) == 1 and len(enemy) == 1:
+                self.opponent[index] = enemy[0]
+
+    def on_frame(self, frame: dict):
+        timestamp = frame['timestamp']
+        minute = round(timestamp / 60000)
+        # The final frame (game end) only counts if it is within 5 s of the minute mark
+        if minute not in LANE_DIFF_MINUTES or minute in self.checkpoints or timestamp < minute * 60000 - 5000:
+            return
+        frames = frame.get('participantFrames', {})
+        values = np.zeros((len(self.participant_ids), 3), dtype=np.int64)
+        for index, participant_id in enumerate(self.participant_ids):
+            pf = frames.get(str(participant_id), {})
+            values[index] = (pf.get('totalGold', 0), pf.get('xp', 0),
+                             pf.get('minionsKilled', 0) + pf.get('jungleMinionsKilled', 0))
+        self.checkpoints[minute] = values
+
+    def result(self) -> Dict[int, Dict]:
+        has_opponent = self.opponent >= 0
+        columns = {participant_id: {} for participant_id in self.participant_ids}
+        for minute in LANE_DIFF_MINUTES:
+            values = self.checkpoints.get(minute)
+            if values is None:
+                diffs = None
+            else:
+                diffs = values - values[np.where(has_opponent, self.opponent, 0)]
+            for index, participant_id in enumerate(self.participant_ids):
+                row = columns[participant_id]
+                for column, metric in (('gold', 0), ('xp', 1), ('cs', 2)):
+                    valid = diffs is not None and has_opponent[index]
+                    row[f'{column}_diff_at_{minute}'] = int(diffs[index, metric]) if valid else None
+        return columns
+
+
+class WardStage(TimelineStage):
+    """
+    Ward placements and ward kills per participant
+
+    Match-v5 WARD_PLACED/WARD_KILL events carry no position, so the placer's (or killer's)
+    position is estimated by interpolating their frame positions around the event time
+    (frames are a minute apart, so this is approximate: good for density maps, not exact spots).
+
+    Result: {participant_id: {'wards_placed': [{timestamp, type, x, y}],
+                              'wards_killed': [{timestamp, type, x, y}]}}
+    """
+    name = 'wards'
+    event_types = frozenset({'WARD_PLACED', 'WARD_KILL'})
+    wants_frames = True
+
+    def start(self, match_data: dict, timeline: dict):
+        self.participant_ids = [p['participantId'] for p in match_data['info']['participants']]
+        # (timestamp, {participant_id: (x, y)}) per frame
+        self.frames: List[tuple] = []
+        # (column, participant_id, entry) awaiting a position
+        self.pending: List[tuple] = []
+
+    def on_frame(self, frame: dict):
+        positions = {}
+        for pid_str, participant_frame in frame.get('participantFrames', {}).items():
+            position = participant_frame.get('position') or {}
+            if position.get('x') is not None and position.get('y') is not None:
+                positions[int(pid_str)] = (position['x'], position['y'])
+        self.frames.append((frame['timestamp'], positions))
+
+    def on_event(self, event: dict):
+        if event['type'] == 'WARD_PLACED':
+            column, participant_id = 'wards_placed', event.get('creatorId', 0)
+        else:
+            column, participant_id = 'wards_killed', event.get('killerId', 0)
+        if participant_id not in self.participant_ids:
+            return
+        entry = {'timestamp': event.get('timestamp', 0), 'type': event.get('wardType', 'UNDEFINED')}
+        self.pending.append((column, participant_id, entry))
+
+    def _estimate_position(self, participant_id: int, timestamp: int) -> tuple:
+        """Participant position at timestamp, interpolated between the frames around it"""
+        after_index = bisect.bisect_left(self.frame_times, timestamp)
+        before = self.frames[after_index - 1] if after_index > 0 else None
+        after = self.frames[after_index] if after_index < len(self.frames) else None
+        start = before[1].get(participant_id) if before else None
+        end = after[1].get(participant_id) if after else None
+        if start is None or end is None:
+            return start or end or (None, None)
+        share = (timestamp - before[0]) / max(after[0] - before[0], 1)
+        return (int(round(start[0] + (end[0] - start[0]) * share)),
+                int(round(start[1] + (end[1] - start[1]) * share)))
+
+    def result(self) -> Dict[int, Dict]:
+        self.frame_times = [timestamp for timestamp, _ in self.frames]
+        wards = {pid: {'wards_placed': [], 'wards_killed': []} for pid in self.participant_ids}
+        for column, participant_id, entry in self.pending:
+            x, y = self._estimate_position(participant_id, entry['timestamp'])
+            wards[participant_id][column].append(dict(entry, x=x, y=y))
+        return wards
+
+
+# Item IDs (current season) left out of build orders: potions, elixirs, control wards
+CONSUMABLE_ITEMS = frozenset({2003, 2010, 2031, 2033, 2055, 2138, 2139, 2140, 2150, 2151, 2152})
+
+# Left out of build paths and first-core timing even when completed: starters, support quest items and boots
+STARTING_ITEMS = frozenset({1054, 1055, 1056, 1082, 1083, 1101, 1102, 1103,
+                            3865, 3866, 3867, 3869, 3870, 3871, 3876, 3877})
+BOOTS = frozenset({1001, 2422, 3006, 3009, 3010, 3013, 3020, 3047, 3111, 3117, 3158})
+
+# Items that appear by transformation (no ITEM_PURCHASED) -> the purchased item they come from
+TRANSFORMED_FROM = {3040: 3003, 3042: 3004, 3121: 3119,
+                    **{item: 3867 for item in (3869, 3870, 3871, 3876, 3877)}}
+
+# Completed items making up a build path
+BUILD_PATH_LENGTH = 3
+
+
+class ItemBuildStage(TimelineStage):
+    """
+    Final build order per participant from ITEM_PURCHASED / ITEM_UNDO
+
+    Undone purchases are dropped before anything else is read. The build is the participant's
+    final inventory (item0-item5, consumables left out) ordered by when each item was last
+    bought, so sold items need no tracking; transformed items take the purchase time of their
+    base item. Build paths only use completed items of the match's patch (item_data), so
+    components left in the inventory are skipped; without item data they stay None.
+
+    Result: {participant_id: {'build_order': [[item_id, timestamp_ms or None], ...],
+                              'build_path': '6610>3121>2502' (first completed non-boot items) or None,
+                              'first_core_ms': purchase time of the first of them or None}}
+    """
+    name = 'item_builds'
+    event_types = frozenset({'ITEM_PURCHASED', 'ITEM_UNDO'})
+
+    def start(self, match_data: dict, timeline: dict):
+        self.completed = completed_items(match_data['info'].get('gameVersion', ''))
+        self.final_items = {
+            p['participantId']: [p.get(f'item{slot}', 0) for slot in range(6)]
+            for p in match_data['info']['participants']
+        }
+        # participant_id -> [[timestamp, item_id], ...] in event order
+        self.purchases: Dict[int, List[List[int]]] = {pid: [] for pid in self.final_items}
+
+    @staticmethod
+    def _drop_last(entries: List[List[int]], item_id: int):
+        """Remove the most recent entry for item_id (the one an ITEM_UNDO reverts)"""
+        for index in range(len(entries) - 1, -1, -1):
+            if entries[index][1] == item_id:
+                del entries[index]
+                return
+
+    def on_event(self, event: dict):
+        participant_id = event.get('participantId')
+        if participant_id not in self.purchases:
+            return
+        timestamp = event.get('timestamp', 0)
+        if event['type'] == 'ITEM_PURCHASED':
+            self.purchases[participant_id].append([timestamp, event.get('itemId', 0)])
+        elif event.get('beforeId') and not event.get('afterId'):
+            # Undone purchase (an undone sale has only afterId and changes nothing here)
+            self._drop_last(self.purchases[participant_id], event['beforeId'])
+
+    def result(self) -> Dict[int, Dict]:
+        builds = {}
+        for participant_id, final_items in self.final_items.items():
+            bought_at: Dict[int, int] = {}
+            for timestamp, item_id in self.purchases[participant_id]:
+                bought_at[item_id] = timestamp
+
+            build = []
+            for item_id in final_items:
+                if not item_id or item_id in CONSUMABLE_ITEMS:
+                    continue
+                build.append([item_id, bought_at.get(item_id, bought_at.get(TRANSFORMED_FROM.get(item_id)))])
+            # Items with an unknown purchase time go last, in slot order
+            build.sort(key=lambda entry: (entry[1] is None, entry[1] or 0))
+
+            core = [entry for entry in build
+                    if entry[1] is not None and entry[0] in (self.completed or ())
+                    and entry[0] not in STARTING_ITEMS and entry[0] not in BOOTS]
+            builds[participant_id] = {
+                'build_order': build,
+                'build_path': '>'.join(str(item_id) for item_id, _ in core[:BUILD_PATH_LENGTH]) or None,
+                'first_core_ms': core[0][1] if core else None,
+            }
+        return builds
+
+
+# SKILL_LEVEL_UP skillSlot -> ability key
+SKILL_KEYS = {1: 'Q', 2: 'W', 3: 'E', 4: 'R'}
+MAX_SKILL_ORDER_LEVEL = 18
+
+# Skill points an ability needs to be maxed, and the levels needed before a max order is reported
+SKILL_MAX_POINTS = 5
+MIN_LEVELS_FOR_MAX_ORDER = 9
+
+
+def skill_max_order(skill_order: str) -> Optional[str]:
+    """
+    Order in which Q, W and E were maxed ('QEW'), from a skill order string
+
+    Abilities that were not maxed are ranked by points, then by when their last point went in.
+    None when the sequence is too short to show the first max.
+    """
+    if len(skill_order) < MIN_LEVELS_FOR_MAX_ORDER:
+        return None
+
+    def rank(key: str) -> tuple:
+        points = [index for index, skill in enumerate(skill_order) if skill == key]
+        maxed_at = points[SKILL_MAX_POINTS - 1] if len(points) >= SKILL_MAX_POINTS else len(skill_order)
+        return (maxed_at, -len(points), points[-1] if points else len(skill_order))
+
+    return ''.join(sorted('QWE', key=rank))
+
+
+class SkillOrderStage(TimelineStage):
+    """
+    Skill order per participant from SKILL_LEVEL_UP (levelUpType NORMAL, evolutions ignored)
+
+    Result: {participant_id: {'skill_order': 'QEWQQRQEQEREEWW' (one character per level, up to 18),
+                              'skill_max_order': 'QEW' or None}}
+    """
+    name = 'skill_orders'
+    event_types = frozenset({'SKILL_LEVEL_UP'})
+
+    def start(self, match_data: dict, timeline: dict):
+        self.orders: Dict[int, List[str]] = {p['participantId']: [] for p in match_data['info']['participants']}
+
+    def on_event(self, event: dict):
+        order = self.orders.get(event.get('participantId'))
+        key = SKILL_KEYS.get(event.get('skillSlot'))
+        if order is None or key is None or event.get('levelUpType', 'NORMAL') != 'NORMAL':
+            return
+        if len(order) < MAX_SKILL_ORDER_LEVEL:
+            order.append(key)
+
+    def result(self) -> Dict[int, Dict]:
+        results = {}
+        for participant_id, order in self.orders.items():
+            skill_order = ''.join(order)
+            results[participant_id] = {
+                'skill_order': skill_order or None,
+                'skill_max_order': skill_max_order(skill_order),
+            }
+        return results
+
+
+# ELITE_MONSTER_KILL monsterType -> ledger kind
+MONSTER_KINDS = {'DRAGON': 'dragon', 'RIFTHERALD': 'herald', 'BARON_NASHOR': 'baron',
+                 'HORDE': 'voidgrub', 'ATAKHAN': 'atakhan'}
+
+
+class ObjectiveStage(TimelineStage):
+    """
+    Objective ledger per team plus objective takedowns per participant
+
+    Monsters are credited to killerTeamId; towers, inhibitors and plates to the team opposite
+    the building's teamId (the team that lost it). DRAGON_SOUL_GIVEN with teamId 0 only names
+    the soul element of the map and is kept as soul_rift.
+
+    Result: {'teams': {100: ledger, 200: ledger}, 'soul_rift': 'Cloud' or None,
+             'participants': {participant_id: {'objective_takedowns', 'objective_participation'}}}
+        ledger: dragons (['WATER', ...] in kill order), dragon_ms, elder_dragons, soul, soul_ms,
+                voidgrubs, heralds, barons, atakhans, plates, towers, inhibitors,
+                first_dragon, first_herald, first_baron, first_tower (bool),
+                events: [[timestamp, kind, detail, killer_id]]
+    """
+    name = 'objectives'
+    event_types = frozenset({'ELITE_MONSTER_KILL', 'BUILDING_KILL', 'TURRET_PLATE_DESTROYED', 'DRAGON_SOUL_GIVEN'})
+
+    def start(self, match_data: dict, timeline: dict):
+        self.teams = participant_teams(match_data)
+        self.ledgers = {team: {
+            'dragons': [], 'dragon_ms': [], 'elder_dragons': 0, 'soul': None, 'soul_ms': None,
+            'voidgrubs': 0, 'heralds': 0, 'barons': 0, 'atakhans': 0,
+            'plates': 0, 'towers': 0, 'inhibitors': 0, 'events': [],
+        } for team in (100, 200)}
+        self.soul_rift: Optional[str] = None
+        self.takedowns = {participant_id: 0 for participant_id in self.teams}
+
+    def _credit(self, event: dict):
+        """Count the objective for the killer and assisters"""
+        for participant_id in [event.get('killerId')] + list(event.get('assistingParticipantIds') or []):
+            if participant_id in self.takedowns:
+                self.takedowns[participant_id] += 1
+
+    def on_event(self, event: dict):
+        timestamp = event.get('timestamp', 0)
+        event_type = event['type']
+
+        if event_type == 'DRAGON_SOUL_GIVEN':
+            ledger = self.ledgers.get(event.get('teamId'))
+            if ledger is None:
+                self.soul_rift = event.get('name')
+            else:
+                ledger['soul'], ledger['soul_ms'] = event.get('name'), timestamp
+            return
+
+        if event_type == 'ELITE_MONSTER_KILL':
+            team = event.get('killerTeamId') or self.teams.get(event.get('killerId'))
+            kind = MONSTER_KINDS.get(event.get('monsterType'))
+            detail = (event.get('monsterSubType') or '').replace('_DRAGON', '') or None
+        else:
+            team = 300 - event['teamId'] if event.get('teamId') in (100, 200) else None
+            if event_type == 'TURRET_PLATE_DESTROYED':
+                kind, detail = 'plate', event.get('laneType')
+            elif event.get('buildingType') == 'INHIBITOR_BUILDING':
+                kind, detail = 'inhibitor', event.get('laneType')
+            else:
+                kind, detail = 'tower', event.get('towerType')
+
+        ledger = self.ledgers.get(team)
+        if ledger is None or kind is None:
+            return
+        ledger['events'].append([timestamp, kind, detail, event.get('killerId', 0)])
+        if kind == 'dragon' and detail == 'ELDER':
+            ledger['elder_dragons'] += 1
+        elif kind == 'dragon':
+            ledger['dragons'].append(detail)
+            ledger['dragon_ms'].append(timestamp)
+        else:
+            ledger[kind + 's'] += 1
+        if kind != 'plate':
+            self._credit(event)
+
+    def result(self) -> Dict:
+        firsts = {}
+        for kind in ('dragon', 'herald', 'baron', 'tower'):
+            times = {team: next((e[0] for e in ledger['events'] if e[1] == kind), None)
+                     for team, ledger in self.ledgers.items()}
+            taken = [team for team, ms in times.items() if ms is not None]
+            firsts[kind] = min(taken, key=lambda team: times[team]) if taken else None
+        for team, ledger in self.ledgers.items():
+            for kind, first_team in firsts.items():
+                ledger[f'first_{kind}'] = first_team == team
+
+        team_objectives = {team: sum(1 for e in ledger['events'] if e[1] != 'plate')
+                           for team, ledger in self.ledgers.items()}
+        participants = {}
+        for participant_id, takedowns in self.takedowns.items():
+            total = team_objectives.get(self.teams[participant_id], 0)
+            participants[participant_id] = {
+                'objective_takedowns': takedowns,
+                'objective_participation': round(takedowns / total, 3) if total else None,
+            }
+        return {'teams': self.ledgers, 'soul_rift': self.soul_rift, 'participants': participants}
+
+
+class JunglePathStage(TimelineStage):
+    """
+    Camp path and gank attempts of both junglers (jungle_pathing.paths_for_match)
+
+    Collects the CHAMPION_KILL events used to judge gank success during the pass; the
+    frame arrays are built from the timeline in one go when the pass ends.
+
+    Result: {participant_id: pathing summary} for participants with teamPosition JUNGLE
+    """
+    name = 'jungle_paths'
+    event_types = frozenset({'CHAMPION_KILL'})
+
+    def start(self, match_data: dict, timeline: dict):
+        self.match_data = match_data
+        self.timeline = timeline
+        self.kills: List[dict] = []
+
+    def on_event(self, event: dict):
+        self.kills.append(event)
+
+    def result(self) -> Dict[int, Dict]:
+        return paths_for_match(self.match_data, self.timeline, self.kills)
+
+
+def ingest_stages() -> List[TimelineStage]:
+    """Fresh instances of the stages run for every ingested match"""
+    return [TeamfightStage(), LaneDiffStage(), WardStage(), ItemBuildStage(), SkillOrderStage(),
+            ObjectiveStage(), JunglePathStage()]
+
+
+def match_stats_timeline_columns(results: Dict[str, Any], participant_id: int, team_id: int) -> Dict:
+    """
+    Timeline-derived match_stats columns for one participant
+
+    Args:
+        results: run_stages output for ingest_stages()
+        participant_id: Participant (1-10)
+        team_id: Participant's team (100/200)
+
+    Returns:
+        Columns to merge into the match_stats row
+    """
+    columns = player_teamfight_stats(results['teamfights'], participant_id, team_id)
+    columns.update(results['lane_diffs'].get(participant_id, {}))
+    columns.update(results['item_builds'].get(participant_id, {}))
+    columns.update(results['skill_orders'].get(participant_id, {}))
+    columns.update(results['objectives']['participants'].get(participant_id, {}))
+    return columns
+
+
+def analytics_timeline_columns(results: Dict[str, Any], participant_id: int) -> Dict:
+    """
+    Timeline-derived match_analytics_summary columns for one participant
+
+    Args:
+        results: run_stages output for ingest_stages()
+        participant_id: Participant (1-10)
+
+    Returns:
+        Columns to merge into the analytics row (wards_placed, wards_killed)
+    """
+    return results['wards'].get(participant_id, {'wards_placed': [], 'wards_killed': []})
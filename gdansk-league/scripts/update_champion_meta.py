@@ -0,0 +1,85 @@
+"""
+Backfill the per-patch champion meta from the local match archive
+Matches ingested before champion_meta existed (or imported straight into the archive) are
+folded in through the same increment_champion_meta function the ingest uses, one match at a
+time; matches already counted are skipped by the database, so the job can be rerun freely.
+Participant tiers come from the rank cache only (no Riot API requests).
+Usage: python update_champion_meta.py [--archive ../data/archive] [--season 15] [--patch 15.20]
+"""
+
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from match_aggregates import meta_increments_from_rows
+from match_archive import DEFAULT_ARCHIVE_DIR, read_archive
+from participant_ranks import load_cached_ranks, supabase
+
+ARCHIVE_COLUMNS = ['match_id', 'participant_id', 'patch', 'game_creation', 'puuid', 'champion_id', 'role', 'win']
+
+# PUUIDs per rank cache query (keeps the PostgREST in.() filter short)
+RANK_BATCH = 200
+
+
+def load_archive_matches(root: str, season: Optional[int] = None, patch: Optional[str] = None) -> Dict[str, List[Dict]]:
+    """
+    Archived participant rows grouped by match
+
+    Args:
+        root: Archive root directory
+        season: Only this season partition
+        patch: Only this patch partition
+
+    Returns:
+        match_id -> participant rows (ARCHIVE_COLUMNS), one per participant even if a match
+        was archived more than once
+    """
+    filters = []
+    if season is not None:
+        filters.append(('season', '=', season))
+    if patch:
+        filters.append(('patch', '=', patch))
+    table = read_archive('participants', columns=ARCHIVE_COLUMNS, filters=filters or None, root=root)
+    matches = defaultdict(dict)
+    for row in table.to_pylist():
+        matches[row['match_id']].setdefault(row['participant_id'], row)
+    return {match_id: list(rows.values()) for match_id, rows in matches.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill champion_meta from the match archive')
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_DIR, help='Archive root directory')
+    parser.add_argument('--season', type=int, help='Only this season')
+    parser.add_argument('--patch', help='Only this patch, e.g. 15.20')
+    args = parser.parse_args()
+
+    matches = load_archive_matches(args.archive, args.season, args.patch)
+    print("=" * 60)
+    print(f"  Champion meta backfill: {len(matches)} archived matches")
+    print("=" * 60)
+
+    puuids = sorted({row['puuid'] for rows in matches.values() for row in rows if row['puuid']})
+    ranks = {}
+    for start in range(0, len(puuids), RANK_BATCH):
+        ranks.update(load_cached_ranks(puuids[start:start + RANK_BATCH]))
+    print(f"[INFO] {len(ranks)}/{len(puuids)} participants have a cached rank")
+
+    counted = skipped = failed = 0
+    for match_id, rows in matches.items():
+        increments = meta_increments_from_rows(match_id, rows[0]['patch'], rows[0]['game_creation'], rows, ranks)
+        try:
+            result = supabase.rpc('increment_champion_meta', increments).execute()
+        except Exception as e:
+            print(f"[ERROR] {match_id}: {e}")
+            failed += 1
+            continue
+        if result.data is False:
+            skipped += 1
+        else:
+            counted += 1
+
+    print(f"\n[OK] {counted} matches counted, {skipped} already counted, {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
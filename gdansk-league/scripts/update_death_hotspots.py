@@ -0,0 +1,233 @@
+"""
+Find recurring death hotspots per player
+Clusters a player's whole ranked death history over map position and game time with a
+grid-based DBSCAN, then stores the top recurring spots (count, games, average time,
+typical killers) in player_death_hotspots. A player is skipped while their latest
+ingested match is the one the cached result was computed from.
+Usage: python update_death_hotspots.py [--player "Name"] [--force]
+"""
+
+import argparse
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import product
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from supabase import create_client, Client
+
+# Load environment variables
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')
+
+# Initialize Supabase client
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Two deaths are neighbours when within EPS_DISTANCE map units and EPS_TIME_MS of game time
+# (both scaled to 1, so the neighbourhood is a unit ball in (x, y, t))
+EPS_DISTANCE = 1000
+EPS_TIME_MS = 4 * 60 * 1000
+MIN_SAMPLES = 3
+
+# A hotspot must recur over at least this many games
+MIN_GAMES = 2
+TOP_HOTSPOTS = 5
+TOP_KILLERS = 3
+
+NOISE = -1
+
+
+def grid_dbscan(points: np.ndarray, min_samples: int = MIN_SAMPLES) -> np.ndarray:
+    """
+    DBSCAN with eps = 1 over pre-scaled points, using a unit grid for neighbour search
+
+    Each point is only compared with the points of its own and the adjacent grid cells,
+    so the cost grows with local density instead of n^2.
+
+    Args:
+        points: (n, d) float array, already divided by the per-axis eps
+        min_samples: Neighbours (including the point) needed for a core point
+
+    Returns:
+        Cluster label per point (NOISE for noise)
+    """
+    count, dimensions = points.shape
+    labels = np.full(count, NOISE, dtype=np.int64)
+    if count == 0:
+        return labels
+
+    cells = np.floor(points).astype(np.int64)
+    cell_members: Dict[tuple, np.ndarray] = {}
+    order = np.lexsort(cells.T[::-1])
+    sorted_cells = cells[order]
+    boundaries = np.flatnonzero(np.any(np.diff(sorted_cells, axis=0) != 0, axis=1)) + 1
+    for group in np.split(order, boundaries):
+        cell_members[tuple(cells[group[0]])] = group
+
+    offsets = list(product((-1, 0, 1), repeat=dimensions))
+    neighbours: List[np.ndarray] = [None] * count
+    for cell, members in cell_members.items():
+        candidates = np.concatenate([
+            cell_members[key] for key in (tuple(c + o for c, o in zip(cell, offset)) for offset in offsets)
+            if key in cell_members
+        ])
+        distances = np.linalg.norm(points[members][:, None, :] - points[candidates][None, :, :], axis=2)
+        for row, member in enumerate(members):
+            neighbours[member] = candidates[distances[row] <= 1.0]
+
+    core = np.array([len(found) >= min_samples for found in neighbours])
+
+    # Expand clusters from core points; border points join the first cluster reaching them
+    cluster = 0
+    for seed in np.flatnonzero(core):
+        if labels[seed] != NOISE:
+            continue
+        labels[seed] = cluster
+        stack = [seed]
+        while stack:
+            point = stack.pop()
+            for neighbour in neighbours[point]:
+                if labels[neighbour] == NOISE:
+                    labels[neighbour] = cluster
+                    if core[neighbour]:
+                        stack.append(neighbour)
+        cluster += 1
+    return labels
+
+
+def find_hotspots(deaths: List[Dict], top: int = TOP_HOTSPOTS) -> List[Dict]:
+    """
+    Top recurring death spots
+
+    Args:
+        deaths: Death events with x, y, timestamp, killer_champion and match_id
+
+    Returns:
+        Hotspots sorted by count, each with center, radius, count, games, share of deaths,
+        average/earliest/latest minute and top killer champions
+    """
+    deaths = [d for d in deaths if d.get('x') is not None and d.get('y') is not None]
+    if not deaths:
+        return []
+
+    xy = np.array([(d['x'], d['y']) for d in deaths], dtype=np.float64)
+    timestamps = np.array([d.get('timestamp', 0) for d in deaths], dtype=np.float64)
+    minutes = timestamps / 60000
+    scaled = np.column_stack([xy / EPS_DISTANCE, timestamps / EPS_TIME_MS])
+    labels = grid_dbscan(scaled)
+
+    hotspots = []
+    for label in np.unique(labels[labels != NOISE]):
+        members = np.flatnonzero(labels == label)
+        games = {deaths[i]['match_id'] for i in members}
+        if len(games) < MIN_GAMES:
+            continue
+        center = xy[members].mean(axis=0)
+        killers = Counter(deaths[i].get('killer_champion') for i in members if deaths[i].get('killer_champion'))
+        hotspots.append({
+            'x': int(round(center[0])),
+            'y': int(round(center[1])),
+            'radius': int(round(np.percentile(np.linalg.norm(xy[members] - center, axis=1), 90))),
+            'count': int(len(members)),
+            'games': len(games),
+            'share': round(len(members) / len(deaths), 3),
+            'avg_minute': round(float(minutes[members].mean()), 1),
+            'min_minute': round(float(minutes[members].min()), 1),
+            'max_minute': round(float(minutes[members].max()), 1),
+            'top_killers': [{'champion': name, 'count': n} for name, n in killers.most_common(TOP_KILLERS)],
+        })
+
+    hotspots.sort(key=lambda spot: (-spot['count'], -spot['games']))
+    return hotspots[:top]
+
+
+def load_deaths(puuid: str) -> List[Dict]:
+    """Every ranked solo/duo death of a player, tagged with its match_id"""
+    deaths = []
+    last_id = 0
+    while True:
+        result = supabase.table('match_analytics_summary').select('id, match_id, deaths') \
+            .eq('player_puuid', puuid).eq('queue_id', 420).gt('id', last_id) \
+            .order('id').limit(1000).execute()
+        rows = result.data or []
+        for row in rows:
+            deaths.extend(dict(death, match_id=row['match_id']) for death in (row['deaths'] or []))
+        if len(rows) < 1000:
+            return deaths
+        last_id = rows[-1]['id']
+
+
+def latest_match_id(puuid: str) -> Optional[str]:
+    """Match of the most recently ingested analytics row"""
+    result = supabase.table('match_analytics_summary').select('match_id') \
+        .eq('player_puuid', puuid).eq('queue_id', 420).order('id', desc=True).limit(1).execute()
+    return result.data[0]['match_id'] if result.data else None
+
+
+def update_player(player: Dict, force: bool = False) -> Optional[int]:
+    """
+    Recompute a player's hotspots if new matches were ingested since the cached result
+
+    Returns:
+        Number of hotspots stored, or None if the cache was still current
+    """
+    latest = latest_match_id(player['puuid'])
+    if latest is None:
+        return None
+
+    if not force:
+        cached = supabase.table('player_death_hotspots').select('latest_match_id') \
+            .eq('player_puuid', player['puuid']).execute()
+        if cached.data and cached.data[0]['latest_match_id'] == latest:
+            return None
+
+    deaths = load_deaths(player['puuid'])
+    hotspots = find_hotspots(deaths)
+    supabase.table('player_death_hotspots').upsert({
+        'player_puuid': player['puuid'],
+        'latest_match_id': latest,
+        'deaths_analyzed': len(deaths),
+        'hotspots': hotspots,
+        'params': {'eps_distance': EPS_DISTANCE, 'eps_time_ms': EPS_TIME_MS,
+                   'min_samples': MIN_SAMPLES, 'min_games': MIN_GAMES},
+        'computed_at': datetime.now(timezone.utc).isoformat(),
+    }, on_conflict='player_puuid').execute()
+    return len(hotspots)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cluster recurring death spots per player')
+    parser.add_argument('--player', help='Only this summoner name')
+    parser.add_argument('--force', action='store_true', help='Recompute even if the cache is current')
+    args = parser.parse_args()
+
+    query = supabase.table('players').select('id, puuid, summoner_name').not_.is_('puuid', 'null')
+    if args.player:
+        query = query.eq('summoner_name', args.player)
+    players = query.execute().data or []
+
+    print("=" * 60)
+    print(f"  Death hotspots for {len(players)} players")
+    print("=" * 60)
+
+    updated = 0
+    for player in players:
+        try:
+            stored = update_player(player, args.force)
+        except Exception as e:
+            print(f"[ERROR] {player['summoner_name']}: {e}")
+            continue
+        if stored is None:
+            continue
+        updated += 1
+        print(f"[OK] {player['summoner_name']}: {stored} hotspots")
+
+    print(f"\n[OK] {updated} players updated, {len(players) - updated} cached or without matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Maintain precomputed death/kill/ward heatmap tiles per player
+Bins the death, kill and ward placement positions of new match_analytics_summary rows into per-player,
+per-role and per-side grids (player_heatmap_tiles) at a few resolutions. Only rows newer
+than each tile's last_analytics_id are added, so the job can run after every ingest. Ward
+tiles follow wards_seq instead of id, which re-ingest advances when it fills the ward
+columns of a stored row.
+Usage: python update_heatmap_tiles.py [--player "Name"] [--rebuild]
+"""
+
+import argparse
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from supabase import create_client, Client
+
+# Load environment variables
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')
+
+# Initialize Supabase client
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Summoner's Rift coordinates run 0-14870 (x) and 0-14980 (y)
+MAP_SIZE = 15000
+
+# Grid sizes kept per tile (cells per side)
+RESOLUTIONS = (16, 32, 64)
+
+# match_analytics_summary columns binned into tiles (the tile kind is the column name)
+KINDS = ('deaths', 'kills', 'wards_placed')
+TILE_COLUMNS = 'id, wards_seq, match_id, team_id, ' + ', '.join(KINDS)
+
+# Column a kind's watermark (last_analytics_id) refers to
+KIND_SEQUENCES = {'deaths': 'id', 'kills': 'id', 'wards_placed': 'wards_seq'}
+SIDES = {100: 'blue', 200: 'red'}
+
+# (player_puuid, kind, role, side, resolution)
+TileKey = Tuple[str, str, str, str, int]
+
+
+def bin_positions(xs: np.ndarray, ys: np.ndarray, resolution: int) -> np.ndarray:
+    """
+    Histogram map positions into a resolution x resolution grid
+
+    Args:
+        xs: X coordinates
+        ys: Y coordinates
+        resolution: Cells per side
+
+    Returns:
+        Flat row-major int64 counts (index = row * resolution + column, row 0 = lowest y)
+    """
+    columns = np.clip(xs * resolution // MAP_SIZE, 0, resolution - 1)
+    rows = np.clip(ys * resolution // MAP_SIZE, 0, resolution - 1)
+    return np.bincount(rows * resolution + columns, minlength=resolution * resolution)
+
+
+def events_to_arrays(analytics_rows: List[Dict], kind: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flatten the kind's events of analytics rows into coordinate arrays
+
+    Returns:
+        (xs, ys, row index into analytics_rows) for every event with a position
+    """
+    xs, ys, owners = [], [], []
+    for index, row in enumerate(analytics_rows):
+        for event in row.get(kind) or []:
+            if event.get('x') is None or event.get('y') is None:
+                continue
+            xs.append(event['x'])
+            ys.append(event['y'])
+            owners.append(index)
+    return (np.array(xs, dtype=np.int64), np.array(ys, dtype=np.int64), np.array(owners, dtype=np.int64))
+
+
+def kind_watermarks(watermarks: Dict[TileKey, int]) -> Dict[str, int]:
+    """
+    Highest last_analytics_id per tile kind (in the kind's KIND_SEQUENCES column)
+
+    A kind's tiles advance together, so every row at or below its highest watermark has been
+    counted for that kind; a kind without tiles yet (e.g. a newly added one) starts from 0.
+    """
+    return {kind: max((mark for key, mark in watermarks.items() if key[1] == kind), default=0) for kind in KINDS}
+
+
+def build_tile_increments(puuid: str, analytics_rows: List[Dict], roles: Dict[str, str],
+                          watermarks: Dict[TileKey, int]) -> Dict[TileKey, Dict]:
+    """
+    Count increments for every tile the new analytics rows touch
+
+    Args:
+        puuid: Player PUUID
+        analytics_rows: match_analytics_summary rows (TILE_COLUMNS)
+        roles: match_id -> role
+        watermarks: Existing tiles' last_analytics_id (rows at or below it in the kind's
+            sequence are skipped per tile; tiles that do not exist yet skip the rows already
+            counted for their kind)
+
+    Returns:
+        TileKey -> {'counts': np.ndarray, 'games': int, 'last_analytics_id': int}
+    """
+    row_roles = np.array([roles.get(row['match_id'], 'UNKNOWN') for row in analytics_rows])
+    row_sides = np.array([SIDES.get(row.get('team_id'), 'unknown') for row in analytics_rows])
+    floors = kind_watermarks(watermarks)
+
+    increments: Dict[TileKey, Dict] = {}
+    for kind in KINDS:
+        marks = np.array([row[KIND_SEQUENCES[kind]] for row in analytics_rows], dtype=np.int64)
+        latest = int(marks.max())
+        xs, ys, owners = events_to_arrays(analytics_rows, kind)
+        for role in ['ALL'] + sorted(str(role) for role in set(row_roles) - {'UNKNOWN'}):
+            for side in ('all', 'blue', 'red'):
+                row_mask = np.ones(len(analytics_rows), dtype=bool)
+                if role != 'ALL':
+                    row_mask &= row_roles == role
+                if side != 'all':
+                    row_mask &= row_sides == side
+                for resolution in RESOLUTIONS:
+                    key = (puuid, kind, role, side, resolution)
+                    selected = row_mask & (marks > watermarks.get(key, floors[kind]))
+                    if not selected.any():
+                        continue
+                    event_mask = selected[owners]
+                    increments[key] = {
+                        'counts': bin_positions(xs[event_mask], ys[event_mask], resolution),
+                        'games': int(selected.sum()),
+                        'last_analytics_id': latest,
+                    }
+    return increments
+
+
+def load_tiles(puuid: str) -> Dict[TileKey, Dict]:
+    """Existing tiles of a player by key"""
+    result = supabase.table('player_heatmap_tiles').select('*').eq('player_puuid', puuid).execute()
+    return {
+        (row['player_puuid'], row['kind'], row['role'], row['side'], row['resolution']): row
+        for row in (result.data or [])
+    }
+
+
+def load_new_analytics(puuid: str, after: int, columns: str = TILE_COLUMNS, sequence: str = 'id') -> List[Dict]:
+    """Ranked solo/duo analytics rows of a player with sequence (id or wards_seq) above after"""
+    rows = []
+    while True:
+        result = supabase.table('match_analytics_summary') \
+            .select(columns) \
+            .eq('player_puuid', puuid).eq('queue_id', 420).gt(sequence, after) \
+            .order(sequence).limit(1000).execute()
+        batch = result.data or []
+        rows.extend(batch)
+        if len(batch) < 1000:
+            return rows
+        after = batch[-1][sequence]
+
+
+def load_roles(player_id: str, match_ids: List[str]) -> Dict[str, str]:
+    """match_id -> role from match_stats"""
+    roles = {}
+    for start in range(0, len(match_ids), 200):
+        result = supabase.table('match_stats').select('match_id, role') \
+            .eq('player_id', player_id).in_('match_id', match_ids[start:start + 200]).execute()
+        roles.update({row['match_id']: row['role'] for row in (result.data or [])})
+    return roles
+
+
+def update_player(player: Dict, rebuild: bool = False) -> int:
+    """
+    Fold a player's new analytics rows into their tiles
+
+    Args:
+        player: players row (id, puuid, summoner_name)
+        rebuild: Ignore existing tiles and recount from scratch
+
+    Returns:
+        Number of tiles written
+    """
+    tiles = {} if rebuild else load_tiles(player['puuid'])
+    watermarks = {key: row['last_analytics_id'] for key, row in tiles.items()}
+    # Per sequence, rows newer than the least advanced kind; each kind then skips what it already counted
+    floors = kind_watermarks(watermarks)
+    new_rows = {}
+    for sequence in sorted(set(KIND_SEQUENCES.values())):
+        after = min(floors[kind] for kind in KINDS if KIND_SEQUENCES[kind] == sequence)
+        for row in load_new_analytics(player['puuid'], after, sequence=sequence):
+            new_rows[row['id']] = row
+    if not new_rows:
+        return 0
+    analytics_rows = [new_rows[row_id] for row_id in sorted(new_rows)]
+
+    roles = load_roles(player['id'], [row['match_id'] for row in analytics_rows])
+    increments = build_tile_increments(player['puuid'], analytics_rows, roles, watermarks)
+
+    upserts = []
+    for key, increment in increments.items():
+        puuid, kind, role, side, resolution = key
+        existing = tiles.get(key)
+        counts = increment['counts']
+        games = increment['games']
+        if existing:
+            counts = counts + np.array(existing['counts'], dtype=np.int64)
+            games += existing['games']
+        upserts.append({
+            'player_puuid': puuid,
+            'kind': kind,
+            'role': role,
+            'side': side,
+            'resolution': resolution,
+            'counts': counts.tolist(),
+            'total': int(counts.sum()),
+            'games': games,
+            'last_analytics_id': increment['last_analytics_id'],
+            'updated_at': datetime.now(timezone.utc).isoformat(),
+        })
+
+    # A single statement: either all tiles advance to the new watermark or none do
+    supabase.table('player_heatmap_tiles').upsert(
+        upserts, on_conflict='player_puuid,kind,role,side,resolution'
+    ).execute()
+    return len(upserts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain per-player heatmap tiles')
+    parser.add_argument('--player', help='Only this summoner name')
+    parser.add_argument('--rebuild', action='store_true', help='Recount tiles from scratch')
+    args = parser.parse_args()
+
+    query = supabase.table('players').select('id, puuid, summoner_name').not_.is_('puuid', 'null')
+    if args.player:
+        query = query.eq('summoner_name', args.player)
+    players = query.execute().data or []
+
+    print("=" * 60)
+    print(f"  Heatmap tiles for {len(players)} players")
+    print("=" * 60)
+
+    updated = 0
+    for player in players:
+        try:
+            written = update_player(player, args.rebuild)
+        except Exception as e:
+            print(f"[ERROR] {player['summoner_name']}: {e}")
+            continue
+        if written:
+            updated += 1
+            print(f"[OK] {player['summoner_name']}: {written} tiles updated")
+
+    print(f"\n[OK] {updated} players updated, {len(players) - updated} unchanged")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Update players with their top 3 champion mastery data
 import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from riot_api import get_champion_mastery
 
 load_dotenv()
 
@@ -17,29 +18,6 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 # Initialize Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-def get_top_champions_for_player(puuid: str, count: int = 3):
-    """Fetch top champions using the existing riot_api module"""
-    import requests
-    import time
-
-    API_KEY = os.getenv('RIOT_API_KEY')
-    REGION = "euw1"
-
-    url = f"https://{REGION}.api.riotgames.com/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}/top"
-    headers = {"X-Riot-Token": API_KEY}
-    params = {"count": count}
-
-    try:
-        time.sleep(1.2)  # Rate limit protection
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
-    except Exception as e:
-        print(f"  [FAIL] Error fetching champions: {str(e)}")
-        return None
-
 print("=" * 60)
 print("  Updating Players with Top 3 Champions")
 print("=" * 60)
@@ -68,8 +46,8 @@ for i, player in enumerate(players, 1):
     print(f"\n[{i}/{len(players)}] {summoner_name}")
     print(f"  Fetching top 3 champions...")
 
-    # Fetch top 3 champions from Riot API
-    top_champions = get_top_champions_for_player(puuid, count=3)
+    # Fetch top 3 champions from Riot API (pacing is handled by the shared quota)
+    top_champions = get_champion_mastery(puuid, count=3)
 
     if not top_champions or len(top_champions) == 0:
         print(f"  [FAIL] No champion data found")
@@ -1,6 +1,8 @@
 """
 Update Profile Icon IDs for all players in database
 Fetches profile icon ID from Riot API and updates Supabase
+Only players without an icon are fetched; icons of summoners that changed since are picked up by
+the rank refresh, which writes profile_icon_id whenever it sees a new summoner revisionDate
 """
 
 import os
@@ -9,7 +11,6 @@ from typing import List, Dict
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from riot_api import get_summoner_by_puuid
-import time
 
 # Load environment variables
 load_dotenv()
@@ -103,7 +104,7 @@ def update_all_profile_icons():
             continue
 
         try:
-            # Fetch summoner data from Riot API
+            # Fetch summoner data from Riot API (pacing is handled by the shared quota)
             summoner_data = get_summoner_by_puuid(puuid)
 
             if not summoner_data:
@@ -121,9 +122,6 @@ def update_all_profile_icons():
                 print(f"  [ERROR] Failed to update database")
                 failed += 1
 
-            # Small delay to respect rate limits
-            time.sleep(0.5)
-
         except Exception as e:
             print(f"  [ERROR] Error: {str(e)}")
             failed += 1
@@ -10,7 +10,6 @@ from datetime import datetime
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from riot_api import get_champion_stats_from_matches
-import time
 
 # Load environment variables
 load_dotenv()
@@ -231,9 +230,6 @@ def update_all_seasonal_stats():
                 players_failed += 1
                 print(f"  ✗ {failed} failed")
 
-            # Small delay to respect rate limits
-            time.sleep(0.5)
-
         except Exception as e:
             print(f"  [ERROR] Failed to process player: {str(e)}")
             players_failed += 1
@@ -0,0 +1,166 @@
+"""
+Maintain ward-timing histograms per player
+Counts when a player places and clears wards (one-minute buckets of game time) per role and
+ward type from the wards_placed/wards_killed columns of match_analytics_summary, into
+player_ward_timing. Like the heatmap ward tiles, only analytics rows with a wards_seq above
+the stored watermark are added (re-ingest advances wards_seq when it fills the ward columns
+of a stored row), so the job can run after every ingest.
+Usage: python update_ward_timing.py [--player "Name"] [--rebuild]
+"""
+
+import argparse
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from update_heatmap_tiles import load_new_analytics, load_roles, supabase
+
+# One bucket per minute of game time; the last bucket also holds everything later
+BUCKET_MS = 60000
+BUCKETS = 45
+
+# Histogram kind -> match_analytics_summary column
+KINDS = {'placed': 'wards_placed', 'killed': 'wards_killed'}
+TIMING_COLUMNS = 'id, wards_seq, match_id, ' + ', '.join(KINDS.values())
+
+# (player_puuid, kind, role, ward_type)
+TimingKey = Tuple[str, str, str, str]
+
+
+def bucket_timestamps(timestamps: np.ndarray) -> np.ndarray:
+    """Histogram event timestamps (ms) into BUCKETS one-minute buckets"""
+    return np.bincount(np.clip(timestamps // BUCKET_MS, 0, BUCKETS - 1), minlength=BUCKETS)
+
+
+def build_timing_increments(puuid: str, analytics_rows: List[Dict], roles: Dict[str, str]) -> Dict[TimingKey, Dict]:
+    """
+    Histogram increments for the new analytics rows
+
+    Args:
+        puuid: Player PUUID
+        analytics_rows: match_analytics_summary rows (TIMING_COLUMNS)
+        roles: match_id -> role
+
+    Returns:
+        TimingKey -> {'counts': np.ndarray, 'games': int} for role/ward type 'ALL' and each seen value
+    """
+    increments: Dict[TimingKey, Dict] = {}
+    for kind, column in KINDS.items():
+        timestamps, row_roles, ward_types, owners = [], [], [], []
+        for index, row in enumerate(analytics_rows):
+            for ward in row.get(column) or []:
+                timestamps.append(ward.get('timestamp', 0))
+                row_roles.append(roles.get(row['match_id'], 'UNKNOWN'))
+                ward_types.append(ward.get('type') or 'UNDEFINED')
+                owners.append(index)
+        if not timestamps:
+            continue
+
+        timestamps = np.array(timestamps, dtype=np.int64)
+        row_roles = np.array(row_roles)
+        ward_types = np.array(ward_types)
+        owners = np.array(owners, dtype=np.int64)
+
+        for role in ['ALL'] + sorted(str(role) for role in set(row_roles) - {'UNKNOWN'}):
+            for ward_type in ['ALL'] + sorted(str(value) for value in set(ward_types)):
+                mask = np.ones(len(timestamps), dtype=bool)
+                if role != 'ALL':
+                    mask &= row_roles == role
+                if ward_type != 'ALL':
+                    mask &= ward_types == ward_type
+                if not mask.any():
+                    continue
+                increments[(puuid, kind, role, ward_type)] = {
+                    'counts': bucket_timestamps(timestamps[mask]),
+                    'games': len(set(owners[mask].tolist())),
+                }
+    return increments
+
+
+def update_player(player: Dict, rebuild: bool = False) -> int:
+    """
+    Fold a player's new analytics rows into their ward-timing histograms
+
+    Args:
+        player: players row (id, puuid, summoner_name)
+        rebuild: Ignore existing histograms and recount from scratch
+
+    Returns:
+        Number of histograms written
+    """
+    existing: Dict[TimingKey, Dict] = {}
+    if not rebuild:
+        result = supabase.table('player_ward_timing').select('*').eq('player_puuid', player['puuid']).execute()
+        existing = {
+            (row['player_puuid'], row['kind'], row['role'], row['ward_type']): row
+            for row in (result.data or [])
+        }
+    after = max((row['last_wards_seq'] for row in existing.values()), default=0)
+
+    analytics_rows = load_new_analytics(player['puuid'], after, TIMING_COLUMNS, 'wards_seq')
+    if not analytics_rows:
+        return 0
+
+    roles = load_roles(player['id'], [row['match_id'] for row in analytics_rows])
+    increments = build_timing_increments(player['puuid'], analytics_rows, roles)
+    latest = max(row['wards_seq'] for row in analytics_rows)
+
+    upserts = []
+    for key, increment in increments.items():
+        puuid, kind, role, ward_type = key
+        counts = increment['counts']
+        games = increment['games']
+        if key in existing:
+            counts = counts + np.array(existing[key]['counts'], dtype=np.int64)
+            games += existing[key]['games']
+        upserts.append({
+            'player_puuid': puuid,
+            'kind': kind,
+            'role': role,
+            'ward_type': ward_type,
+            'counts': counts.tolist(),
+            'total': int(counts.sum()),
+            'games': games,
+            'last_wards_seq': latest,
+            'updated_at': datetime.now(timezone.utc).isoformat(),
+        })
+    # A single statement: either all histograms advance to the new watermark or none do
+    if upserts:
+        supabase.table('player_ward_timing').upsert(
+            upserts, on_conflict='player_puuid,kind,role,ward_type'
+        ).execute()
+    return len(upserts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain per-player ward-timing histograms')
+    parser.add_argument('--player', help='Only this summoner name')
+    parser.add_argument('--rebuild', action='store_true', help='Recount histograms from scratch')
+    args = parser.parse_args()
+
+    query = supabase.table('players').select('id, puuid, summoner_name').not_.is_('puuid', 'null')
+    if args.player:
+        query = query.eq('summoner_name', args.player)
+    players = query.execute().data or []
+
+    print("=" * 60)
+    print(f"  Ward timing for {len(players)} players")
+    print("=" * 60)
+
+    updated = 0
+    for player in players:
+        try:
+            written = update_player(player, args.rebuild)
+        except Exception as e:
+            print(f"[ERROR] {player['summoner_name']}: {e}")
+            continue
+        if written:
+            updated += 1
+            print(f"[OK] {player['summoner_name']}: {written} histograms updated")
+
+    print(f"\n[OK] {updated} players updated, {len(players) - updated} unchanged")
+
+
+if __name__ == "__main__":
+    main()